@@ -13,3 +13,9 @@ class IssuetrackerConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'issuetracker'
+
+    def ready(self):
+        # Importing the modules connects their signal receivers.
+        from . import authentication, changes, conditional, counters, \
+            database, instrumentation, membership, response_cache, \
+            search  # noqa: F401
@@ -0,0 +1,195 @@
+"""
+Native async versions of the read endpoints, mounted under async/ (see
+softdesk/urls.py). Under ASGI, the sync views are each run in a thread.
+These run in the event loop, so one process serves many of them
+concurrently while they wait on the DB.
+
+DRF views are sync-only, so these are Django class-based views returning
+the same JSON as their DRF counterparts. Requests are authenticated with
+the JWT access token only (StatelessJWTAuthentication).
+
+Django 4.0 has no async ORM API yet. Queries run through
+sync_to_async(thread_sensitive=True), which is also how Django 4.1
+implements its async ORM methods. The streamed responses of the sync
+endpoints aren't available here, because Django 4.0 reads streamed
+content synchronously in the event loop.
+"""
+
+import asyncio
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, \
+    NotFound
+from rest_framework.request import Request
+
+from issuetracker.permissions import aonly_project_contributor_permission
+from .authentication import StatelessJWTAuthentication
+from .models import Project, Contributor, Issue, Comment
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .serializers import ContributorSerializer, IssueSerializer, \
+    CommentSerializer, ProjectSerializer, FastReadSerializer, \
+    IssueListQuerySerializer, fast_serializer_for
+
+
+class AsyncAPIView(View):
+    """
+    Authenticates the request, then calls the handler. DRF exceptions
+    raised by the handler, e.g. PermissionDenied, are answered the way DRF
+    would answer them.
+    """
+    http_method_names = ["get"]
+    authenticator: StatelessJWTAuthentication = StatelessJWTAuthentication()
+    renderer: FastJSONRenderer = FastJSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Django 4.0 only recognizes async function views. The marker is
+        # the one asyncio.iscoroutinefunction looks for.
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    async def dispatch(self, request: HttpRequest, *args,
+                       **kwargs) -> HttpResponse:
+        # Request gives the paginator access to query_params.
+        self.request = Request(request)
+        try:
+            request.user = await self.authenticate(self.request)
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return self.handle_exception(NotFound())
+        except APIException as exc:
+            return self.handle_exception(exc)
+
+    async def http_method_not_allowed(self, request, *args,
+                                      **kwargs) -> HttpResponse:
+        return super().http_method_not_allowed(request, *args, **kwargs)
+
+    async def authenticate(self, request: Request):
+        # Checking the token may read the denylist and the token version.
+        result: Optional[tuple] = await sync_to_async(
+            self.authenticator.authenticate
+        )(request)
+        if result is None:
+            raise NotAuthenticated
+        return result[0]
+
+    def handle_exception(self, exc: APIException) -> HttpResponse:
+        detail = exc.detail
+        if not isinstance(detail, (list, dict)):
+            detail = {"detail": detail}
+        response: HttpResponse = self.render(detail, exc.status_code)
+        if isinstance(exc, NotAuthenticated):
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response["WWW-Authenticate"] = \
+                self.authenticator.authenticate_header(self.request)
+        return response
+
+    def render(self, data, status_code: int = status.HTTP_200_OK) \
+            -> HttpResponse:
+        return HttpResponse(self.renderer.render(data),
+                            status=status_code,
+                            content_type=self.renderer.media_type)
+
+
+class AsyncListView(AsyncAPIView):
+    """One page of a list endpoint, as in the sync views."""
+    serializer_class: type = None
+    # Used by the keyset pagination.
+    ordering: tuple[str, ...] = ("created_time", "id")
+
+    async def paginate(self, queryset: QuerySet,
+                       serializer: Optional[FastReadSerializer] = None) \
+            -> HttpResponse:
+        """serializer defaults to the one of serializer_class."""
+        if serializer is None:
+            serializer = fast_serializer_for(self.serializer_class)
+        paginator = KeysetPagination()
+        page: list[dict] = await sync_to_async(paginator.paginate_queryset)(
+            serializer.project(queryset, paginator.get_ordering(self)),
+            self.request, self
+        )
+        return self.render(
+            paginator.get_paginated_response(serializer.serialize(page)).data
+        )
+
+
+class AsyncProjectView(AsyncAPIView):
+    """Async version of ProjectViewSet.retrieve."""
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        pk: int = kwargs["pk"]
+        serializer: FastReadSerializer = fast_serializer_for(
+            ProjectSerializer
+        )
+        row: Optional[dict] = await first(
+            serializer.project(Project.objects.filter(id=pk))
+        )
+        if row is None:
+            raise Http404
+        return self.render(serializer.to_representation(row))
+
+
+class AsyncProjectContributors(AsyncAPIView):
+    """Async version of ListProjectContributors."""
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        pk: int = kwargs["pk"]
+        serializer: FastReadSerializer = fast_serializer_for(
+            ContributorSerializer
+        )
+        rows: list[dict] = await evaluate(
+            serializer.project(Contributor.objects.filter(project_id=pk))
+        )
+        return self.render(serializer.serialize(rows))
+
+
+class AsyncIssueList(AsyncListView):
+    """
+    Async version of IssueViewSet.get, with the same filters, ordering and
+    fields (see IssueListQuerySerializer).
+    """
+    serializer_class: type = IssueSerializer
+
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        pk: int = kwargs["pk"]
+
+        await aonly_project_contributor_permission(request, pk)
+
+        query: IssueListQuerySerializer = IssueListQuerySerializer(
+            data=self.request.query_params
+        )
+        query.is_valid(raise_exception=True)
+        # Read by the pagination. Set on the instance, which only lives
+        # for this request.
+        self.ordering = query.view_ordering()
+        return await self.paginate(query.issues(pk), query.fast_serializer())
+
+
+class AsyncCommentList(AsyncListView):
+    """Async version of CommentViewSet.get."""
+    serializer_class: type = CommentSerializer
+
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        pk: int = kwargs["pk"]
+        project_id: Optional[int] = await first(
+            Issue.objects.filter(id=pk).values_list("project_id", flat=True)
+        )
+        if project_id is None:
+            raise Http404
+
+        await aonly_project_contributor_permission(request, project_id)
+
+        return await self.paginate(Comment.objects.filter(issue_id=pk))
+
+
+async def evaluate(queryset: QuerySet) -> list:
+    return await sync_to_async(list)(queryset)
+
+
+async def first(queryset: QuerySet):
+    return await sync_to_async(queryset.first)()
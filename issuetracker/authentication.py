@@ -0,0 +1,119 @@
+"""
+Stateless JWT authentication. simplejwt's JWTAuthentication loads the User
+row on every request. Instead, the tokens issued by
+utils.get_tokens_for_user carry the claims the views need (user id,
+username, is_active, is_staff and a token version), and the user is built
+from them without a query.
+
+The token version is a keyed hash of the user's password hash and flags.
+Changing the password, deactivating the user or changing their staff
+status thus changes it, which revokes every token issued before. The
+current version of each user is kept in the cache named by
+settings.TOKEN_VERSION_CACHE_ALIAS, refreshed whenever a User is saved, so
+that checking it doesn't need the DB either.
+"""
+
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import BaseCache, caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from .denylist import token_denylist
+
+# Claims added to the tokens, besides simplejwt's user id claim.
+USER_CLAIMS: tuple[str, ...] = ("username", "is_active", "is_staff")
+VERSION_CLAIM = "ver"
+
+
+def token_version(username: str, password: str, is_active: bool,
+                  is_staff: bool) -> str:
+    value: str = f"{username}|{password}|{is_active}|{is_staff}"
+    return salted_hmac("issuetracker.token_version", value).hexdigest()[:16]
+
+
+def get_token_version_cache() -> BaseCache:
+    return caches[getattr(settings, "TOKEN_VERSION_CACHE_ALIAS", "default")]
+
+
+def token_version_key(user_id) -> str:
+    return f"token_version:{user_id}"
+
+
+def current_token_version(user_id) -> Optional[str]:
+    """
+    Returns the version of the user's current tokens, or None when the
+    user doesn't exist. Only a cache miss hits the DB.
+    """
+    cache: BaseCache = get_token_version_cache()
+    key: str = token_version_key(user_id)
+    version: Optional[str] = cache.get(key)
+    if version is None:
+        row: Optional[tuple] = User.objects.filter(id=user_id).values_list(
+            "username", "password", "is_active", "is_staff"
+        ).first()
+        if row is None:
+            return None
+        version = token_version(*row)
+        cache.set(key, version,
+                  getattr(settings, "TOKEN_VERSION_CACHE_TIMEOUT", 60))
+    return version
+
+
+def user_changed(**kwargs):
+    """Drops the cached token version whenever a user changes."""
+    instance: User = kwargs["instance"]
+    get_token_version_cache().delete(token_version_key(instance.id))
+
+
+post_save.connect(user_changed, sender=User)
+post_delete.connect(user_changed, sender=User)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Builds request.user from the token claims. The object is an unsaved
+    User instance with its id set: it compares equal to the user loaded
+    from the DB and can be assigned to foreign keys. Tokens issued before
+    the claims were added are still accepted, through a DB lookup.
+    """
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        validated_token: Token = super().get_validated_token(raw_token)
+        if token_denylist.is_revoked(validated_token["jti"],
+                                     validated_token["exp"]):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token: Token) -> User:
+        if any(claim not in validated_token
+               for claim in (*USER_CLAIMS, VERSION_CLAIM)):
+            return super().get_user(validated_token)
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        version: Optional[str] = current_token_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(_("User not found"),
+                                       code="user_not_found")
+        if validated_token[VERSION_CLAIM] != version:
+            raise AuthenticationFailed(_("Token is no longer valid"),
+                                       code="token_not_valid")
+        if not validated_token["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"),
+                                       code="user_inactive")
+
+        user = User(id=user_id,
+                    username=validated_token["username"],
+                    is_active=validated_token["is_active"],
+                    is_staff=validated_token["is_staff"])
+        user._state.adding = False
+        user._state.db = DEFAULT_DB_ALIAS
+        return user
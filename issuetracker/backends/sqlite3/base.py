@@ -0,0 +1,39 @@
+"""
+Django's SQLite backend with two more OPTIONS, both read by this project:
+
+- "transaction_mode": how transactions begin, e.g. "IMMEDIATE" (as in
+  Django 5.1). SQLite begins transactions as DEFERRED by default: a
+  transaction that reads, then writes, only asks for the write lock at its
+  first write. When another connection wrote in between, SQLite fails it
+  at once with "database is locked", without waiting for the busy timeout,
+  since waiting couldn't help. BEGIN IMMEDIATE takes the write lock first,
+  so concurrent writers queue up on the busy timeout instead.
+- "pragmas": PRAGMAs run on each new connection (see
+  issuetracker/database.py).
+
+The other OPTIONS are passed on to sqlite3.connect() as usual.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES: tuple[str, ...] = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self) -> dict:
+        params: dict = super().get_connection_params()
+        mode = params.pop("transaction_mode", None)
+        params.pop("pragmas", None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"DATABASES[{self.alias!r}]['OPTIONS']['transaction_mode'] "
+                f"must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        # Read at each transaction, so that a change also applies to the
+        # connections already open (see stress_sqlite_writers).
+        mode = self.settings_dict["OPTIONS"].get("transaction_mode")
+        self.cursor().execute(f"BEGIN {mode.upper()}" if mode else "BEGIN")
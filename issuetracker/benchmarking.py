@@ -0,0 +1,142 @@
+"""
+Helpers shared by the benchmark management commands. Benchmarks run
+against a throwaway test database filled with a synthetic dataset, so the
+development DB is never touched.
+"""
+
+import contextlib
+import random
+import time
+from typing import Callable, Iterator, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, connections
+
+from .counters import rebuild_counters
+from .models import Project, Contributor, Issue, Comment
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+@contextlib.contextmanager
+def test_database(name: Optional[str] = None) -> Iterator[None]:
+    """
+    Creates the test database for the duration of the block, in the file
+    name if given (SQLite creates it in memory otherwise). The aliases
+    mirroring the default DB in tests (e.g. the read replica) read it too.
+    """
+    test_settings: dict = connection.settings_dict["TEST"]
+    old_test_name: Optional[str] = test_settings.get("NAME")
+    if name is not None:
+        test_settings["NAME"] = name
+    old_name: str = connection.creation.create_test_db(verbosity=0,
+                                                       autoclobber=True)
+    # Changed in place: the connections of other threads share the dicts.
+    mirrors: dict[str, str] = {
+        alias: connections.databases[alias]["NAME"]
+        for alias in connections
+        if connections.databases[alias].get("TEST", {}).get("MIRROR")
+        == connection.alias
+    }
+    test_name: str = connection.settings_dict["NAME"]
+    for alias in mirrors:
+        connections[alias].close()
+        connections.databases[alias]["NAME"] = test_name
+    try:
+        yield
+    finally:
+        for alias, mirror_name in mirrors.items():
+            connections[alias].close()
+            connections.databases[alias]["NAME"] = mirror_name
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings["NAME"] = old_test_name
+
+
+def build_dataset(users: int = 10, projects: int = 5,
+                  contributors: int = 5, issues: int = 100,
+                  comments: int = 2, seed: int = 0) -> dict[str, list[int]]:
+    """
+    Fills the DB with bulk inserts. Each project gets its author as owner
+    plus contributors - 1 collaborators, issues issues authored by its
+    contributors and comments comments per issue. Returns the created ids.
+    """
+    rng = random.Random(seed)
+    # Hashing is slow on purpose. Every user shares the same hash.
+    password: str = make_password(BENCHMARK_PASSWORD)
+    User.objects.bulk_create(
+        User(username=f"user{index}", password=password)
+        for index in range(users)
+    )
+    user_ids: list[int] = list(User.objects.order_by("id")
+                               .values_list("id", flat=True))
+
+    Project.objects.bulk_create(
+        Project(title=f"project {index}",
+                description="benchmark project",
+                author_user_id_id=rng.choice(user_ids))
+        for index in range(projects)
+    )
+    project_rows: list[tuple[int, int]] = list(
+        Project.objects.order_by("id").values_list("id", "author_user_id")
+    )
+
+    # bulk_create doesn't send post_save, so the owners are added here.
+    members: dict[int, list[int]] = {}
+    memberships: list[Contributor] = []
+    for project_id, owner_id in project_rows:
+        others: list[int] = [user_id for user_id in user_ids
+                             if user_id != owner_id]
+        collaborators: list[int] = rng.sample(
+            others, min(len(others), max(contributors - 1, 0))
+        )
+        members[project_id] = [owner_id, *collaborators]
+        memberships.append(Contributor(permission="owner",
+                                       user_id_id=owner_id,
+                                       project_id_id=project_id))
+        memberships.extend(Contributor(permission="collaborator",
+                                       user_id_id=user_id,
+                                       project_id_id=project_id)
+                           for user_id in collaborators)
+    Contributor.objects.bulk_create(memberships, batch_size=1000)
+
+    Issue.objects.bulk_create(
+        (Issue(title=f"issue {index}",
+               description="benchmark issue",
+               tag=rng.choice(Issue.TAG_CHOICES)[0],
+               priority=rng.choice(Issue.PRIORITY_CHOICES)[0],
+               status=rng.choice(Issue.STATUS_CHOICES)[0],
+               project_id_id=project_id,
+               author_user_id_id=rng.choice(members[project_id]),
+               assignee_user_id_id=rng.choice(members[project_id]))
+         for project_id, _ in project_rows
+         for index in range(issues)),
+        batch_size=1000
+    )
+    issue_rows: list[tuple[int, int]] = list(
+        Issue.objects.order_by("id").values_list("id", "project_id")
+    )
+    Comment.objects.bulk_create(
+        (Comment(description=f"comment {index}",
+                 author_user_id_id=rng.choice(members[project_id]),
+                 issue_id_id=issue_id)
+         for issue_id, project_id in issue_rows
+         for index in range(comments)),
+        batch_size=1000
+    )
+    rebuild_counters()
+    return {
+        "users": user_ids,
+        "projects": [project_id for project_id, _ in project_rows],
+        "issues": [issue_id for issue_id, _ in issue_rows],
+    }
+
+
+def best_time(function: Callable, repeat: int) -> float:
+    """Runs the function repeat times and returns the fastest run."""
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
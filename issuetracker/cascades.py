@@ -0,0 +1,42 @@
+"""
+Tracks the projects and issues being deleted. Deleting a project deletes
+its issues, and deleting an issue its comments, each sending its own
+post_delete. The receivers updating data derived from children, like
+the counters of the parent, skip the work when the parent is going away
+in the same operation.
+"""
+
+import contextvars
+
+from django.core.signals import request_finished
+from django.db.models import Model
+from django.db.models.signals import post_delete, pre_delete
+
+from .models import Project, Issue
+
+# (model, pk) of the rows being deleted. Cleared at the end of each
+# request as well, in case a deletion failed midway.
+deleting: contextvars.ContextVar[frozenset[tuple[type, int]]] = \
+    contextvars.ContextVar("deleting", default=frozenset())
+
+
+def being_deleted(model: type[Model], pk) -> bool:
+    return (model, pk) in deleting.get()
+
+
+def parent_deleting(sender: type[Model], instance: Model, **kwargs):
+    deleting.set(deleting.get() | {(sender, instance.pk)})
+
+
+def parent_deleted(sender: type[Model], instance: Model, **kwargs):
+    deleting.set(deleting.get() - {(sender, instance.pk)})
+
+
+def request_done(**kwargs):
+    deleting.set(frozenset())
+
+
+for parent in (Project, Issue):
+    pre_delete.connect(parent_deleting, sender=parent)
+    post_delete.connect(parent_deleted, sender=parent)
+request_finished.connect(request_done)
@@ -0,0 +1,263 @@
+"""
+Changes feed of a project, for clients keeping an offline copy of it. Every
+issue, comment and contributor created, updated or deleted through the ORM
+is recorded as a Change with the next sequence number of its project.
+Clients send back the sync token of their last response and receive the
+rows changed since then, with their current data, or a tombstone for the
+rows deleted. The work done per sync is proportional to the number of rows
+changed, not to the size of the project.
+
+A deleted issue implies that its comments are deleted too. Their own
+tombstones aren't recorded. A project deleted takes its changes with it.
+
+Changes are recorded in the transaction of the write: the synced models
+save atomically with their receivers (see AtomicSaveModel) and the ORM
+deletes in a transaction. A write is thus never committed without its
+change, which a client syncing from its token would never see.
+
+Writes that don't send signals (bulk_create, QuerySet.update(), raw
+deletions) must pass the ids of the rows written to record_changes, in
+their transaction.
+"""
+
+from typing import Iterable, Optional
+
+from django.db import connections, router, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import F, Model, QuerySet
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .cascades import being_deleted
+from .database import supports_upsert
+from .models import Project, Contributor, Issue, Comment, Change, \
+    ChangeSequence
+from .serializers import ContributorSerializer, IssueSerializer, \
+    CommentSerializer, FastReadSerializer, fast_serializer_for
+
+# Changes written per statement. Keeps the parameters under SQLite's limit.
+UPSERT_BATCH_SIZE: int = 500
+
+# Synced models, by Change.kind, with the serializer of their data and the
+# lookup scoping them to a project.
+SYNCED: dict[str, tuple[type[Model], type, str]] = {
+    "issue": (Issue, IssueSerializer, "project_id"),
+    "comment": (Comment, CommentSerializer, "issue_id__project_id"),
+    "contributor": (Contributor, ContributorSerializer, "project_id"),
+}
+
+
+def next_sequences(project_id: int, count: int) -> range:
+    """
+    Takes the project's next count sequence numbers. Must run in a
+    transaction: the ChangeSequence row stays locked until it ends.
+    """
+    connection: BaseDatabaseWrapper = connections[
+        router.db_for_write(ChangeSequence)
+    ]
+    if supports_upsert(connection):
+        # Creates the row on the project's first change and reads the
+        # last number taken, in one statement.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO issuetracker_changesequence "
+                "(project_id_id, value) VALUES (%s, %s) "
+                "ON CONFLICT (project_id_id) DO UPDATE "
+                "SET value = issuetracker_changesequence.value "
+                "+ excluded.value RETURNING value",
+                [project_id, count]
+            )
+            last: int = cursor.fetchone()[0]
+        return range(last - count + 1, last + 1)
+    sequence: QuerySet = ChangeSequence.objects.filter(project_id=project_id)
+    if not sequence.update(value=F("value") + count):
+        # First change of the project.
+        ChangeSequence.objects.bulk_create(
+            [ChangeSequence(project_id_id=project_id)], ignore_conflicts=True
+        )
+        sequence.update(value=F("value") + count)
+    last = sequence.values_list("value", flat=True).get()
+    return range(last - count + 1, last + 1)
+
+
+def record_changes(project_id: int, kind: str, ids: Iterable[int],
+                   deleted: bool = False):
+    """
+    Records that the rows of the given kind were written or deleted. Joins
+    the transaction of the write, if any, without a savepoint: when it
+    fails, the write must roll back too.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids or being_deleted(Project, project_id):
+        return
+    alias: str = router.db_for_write(Change)
+    with transaction.atomic(using=alias, savepoint=False):
+        sequences: range = next_sequences(project_id, len(ids))
+        rows: list[tuple] = [
+            (project_id, kind, object_id, sequence, deleted)
+            for object_id, sequence in zip(ids, sequences)
+        ]
+        if supports_upsert(connections[alias]):
+            upsert_changes(connections[alias], rows)
+            return
+        existing: dict[int, int] = dict(
+            Change.objects.filter(project_id=project_id, kind=kind,
+                                  object_id__in=ids)
+            .values_list("object_id", "id")
+        )
+        changes: list[Change] = [
+            Change(id=existing.get(object_id), project_id_id=project_id,
+                   kind=kind, object_id=object_id, sequence=sequence,
+                   deleted=deleted)
+            for object_id, sequence in zip(ids, sequences)
+        ]
+        Change.objects.bulk_update(
+            [change for change in changes if change.id is not None],
+            ["sequence", "deleted"]
+        )
+        Change.objects.bulk_create(
+            [change for change in changes if change.id is None]
+        )
+
+
+def upsert_changes(connection: BaseDatabaseWrapper, rows: list[tuple]):
+    """
+    Inserts the (project_id, kind, object_id, sequence, deleted) rows, or
+    moves the existing change of the row to its new sequence, in one
+    statement per UPSERT_BATCH_SIZE rows.
+    """
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch: list[tuple] = rows[start:start + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                "INSERT INTO issuetracker_change "
+                "(project_id_id, kind, object_id, sequence, deleted) "
+                "VALUES " + ", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))
+                + " ON CONFLICT (project_id_id, kind, object_id) DO UPDATE "
+                "SET sequence = excluded.sequence, "
+                "deleted = excluded.deleted",
+                [value for row in batch for value in row]
+            )
+
+
+def changes_since(project_id: int, since: int, limit: int) \
+        -> tuple[list[dict], int, bool]:
+    """
+    Returns the project's changes after the since sequence number, at most
+    limit of them, along with the sequence number to sync from next time
+    and whether more changes are waiting. Rows deleted before the client's
+    first sync (since=0) are left out.
+    """
+    changes: QuerySet = Change.objects.filter(
+        project_id=project_id, sequence__gt=since
+    )
+    if not since:
+        changes = changes.filter(deleted=False)
+    rows: list[tuple] = list(
+        changes.order_by("sequence")
+        .values_list("sequence", "kind", "object_id", "deleted")[:limit + 1]
+    )
+    page: list[tuple] = rows[:limit]
+    data: dict[tuple[str, int], dict] = current_data(
+        project_id,
+        ((kind, object_id) for _, kind, object_id, deleted in page
+         if not deleted)
+    )
+    feed: list[dict] = []
+    for _, kind, object_id, deleted in page:
+        row: Optional[dict] = data.get((kind, object_id))
+        # A row missing from the project was deleted or moved to another
+        # project after its change was read.
+        feed.append({"type": kind, "id": object_id,
+                     "deleted": deleted or row is None,
+                     "data": row})
+    last: int = page[-1][0] if page else since
+    return feed, last, len(rows) > limit
+
+
+def current_data(project_id: int, keys: Iterable[tuple[str, int]]) \
+        -> dict[tuple[str, int], dict]:
+    """Reads the rows changed with one query per kind."""
+    ids: dict[str, list[int]] = {}
+    for kind, object_id in keys:
+        ids.setdefault(kind, []).append(object_id)
+    data: dict[tuple[str, int], dict] = {}
+    for kind, object_ids in ids.items():
+        model, serializer_class, project_lookup = SYNCED[kind]
+        serializer: FastReadSerializer = fast_serializer_for(
+            serializer_class
+        )
+        rows: QuerySet = serializer.project(
+            model.objects.filter(id__in=object_ids,
+                                 **{project_lookup: project_id}),
+            ["id"]
+        )
+        for row in rows:
+            data[(kind, row["id"])] = serializer.to_representation(row)
+    return data
+
+
+def comment_project(comment: Comment) -> Optional[int]:
+    if Comment.issue_id.is_cached(comment):
+        return comment.issue_id.project_id_id
+    return Issue.objects.filter(id=comment.issue_id_id).values_list(
+        "project_id", flat=True
+    ).first()
+
+
+def issue_initialized(sender, instance: Issue, **kwargs):
+    # The project the issue is stored in, to tell when it moves.
+    instance._synced_project_id = instance.__dict__.get("project_id_id")
+
+
+def issue_saved(sender, instance: Issue, raw: bool = False, **kwargs):
+    if raw:
+        return
+    old_project_id: Optional[int] = instance._synced_project_id
+    new_project_id: int = instance.project_id_id
+    record_changes(new_project_id, "issue", [instance.id])
+    if old_project_id is not None and old_project_id != new_project_id:
+        # The issue left the project. Its comments moved along with it.
+        record_changes(old_project_id, "issue", [instance.id], deleted=True)
+        record_changes(new_project_id, "comment",
+                       Comment.objects.filter(issue_id=instance.id)
+                       .values_list("id", flat=True))
+    instance._synced_project_id = new_project_id
+
+
+def issue_deleted(sender, instance: Issue, **kwargs):
+    record_changes(instance.project_id_id, "issue", [instance.id],
+                   deleted=True)
+
+
+def comment_saved(sender, instance: Comment, raw: bool = False, **kwargs):
+    project_id: Optional[int] = None if raw else comment_project(instance)
+    if project_id is not None:
+        record_changes(project_id, "comment", [instance.id])
+
+
+def comment_deleted(sender, instance: Comment, **kwargs):
+    if being_deleted(Issue, instance.issue_id_id):
+        return
+    project_id: Optional[int] = comment_project(instance)
+    if project_id is not None:
+        record_changes(project_id, "comment", [instance.id], deleted=True)
+
+
+def contributor_saved(sender, instance: Contributor, raw: bool = False,
+                      **kwargs):
+    if not raw:
+        record_changes(instance.project_id_id, "contributor", [instance.id])
+
+
+def contributor_deleted(sender, instance: Contributor, **kwargs):
+    record_changes(instance.project_id_id, "contributor", [instance.id],
+                   deleted=True)
+
+
+post_init.connect(issue_initialized, sender=Issue)
+post_save.connect(issue_saved, sender=Issue)
+post_delete.connect(issue_deleted, sender=Issue)
+post_save.connect(comment_saved, sender=Comment)
+post_delete.connect(comment_deleted, sender=Comment)
+post_save.connect(contributor_saved, sender=Contributor)
+post_delete.connect(contributor_deleted, sender=Contributor)
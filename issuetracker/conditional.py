@@ -0,0 +1,169 @@
+"""
+Conditional reads of a project, its issues and an issue's comments. Each
+response carries a strong ETag and a Last-Modified built from a version
+stamp of what it was read from, e.g. for the issue list the number of
+issues of the project and their latest updated_time. The stamp is read with
+a single indexed query, so a client sending If-None-Match or
+If-Modified-Since back gets its 304 without the rows being read or
+serialized. The stamp is read before the rows, so a response never carries
+a stamp newer than its content.
+
+Timestamps alone can't tell that a row was deleted. The number of rows
+changes the ETag then, and deleting an issue or a comment bumps the
+updated_time of its project or issue, so that Last-Modified moves forward
+too. Writes that don't send signals must bump the stamps themselves.
+"""
+
+import datetime
+import hashlib
+from typing import NamedTuple, Optional
+
+from django.db.models import Count, Max, OuterRef, QuerySet, Subquery
+from django.db.models.signals import post_delete
+from django.http.response import HttpResponseBase
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, \
+    patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cascades import being_deleted
+from .models import Project, Issue, Comment
+from .streaming import content_encoding, wants_stream
+
+
+class Stamp(NamedTuple):
+    """
+    Version of the data a response is read from. parent_id is the project
+    of the issue whose comments are listed, checked for permissions.
+    """
+    key: str
+    last_modified: datetime.datetime
+    parent_id: Optional[int] = None
+
+    def etag(self, request) -> str:
+        """
+        The representation also depends on the query parameters (filters,
+        page, fields), on the media type negotiated and on the content
+        coding: a gzipped stream and the identity one are different bytes,
+        which can't share a strong ETag.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.key, request.get_full_path(),
+                     getattr(request, "accepted_media_type", ""),
+                     content_encoding(request)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return quote_etag(digest.hexdigest())
+
+
+def children_stamp(children: QuerySet, parent: str, field: str) -> dict:
+    """
+    Correlated subqueries counting the children and reading their latest
+    field, both served by an index starting with the parent column.
+    """
+    children = children.filter(**{parent: OuterRef("pk")}).order_by() \
+        .values(parent)
+    return {
+        "count": Subquery(children.annotate(count=Count("id"))
+                          .values("count")),
+        "latest": Subquery(children.annotate(latest=Max(field))
+                           .values("latest")),
+    }
+
+
+def project_stamp(pk: int) -> Optional[Stamp]:
+    updated_time: Optional[datetime.datetime] = Project.objects.filter(
+        id=pk
+    ).values_list("updated_time", flat=True).first()
+    if updated_time is None:
+        return None
+    return Stamp(f"project:{pk}:{updated_time.isoformat()}", updated_time)
+
+
+def issues_stamp_query(pk: int) -> QuerySet:
+    return Project.objects.filter(id=pk).annotate(
+        **children_stamp(Issue.objects.all(), "project_id", "updated_time")
+    ).values("updated_time", "count", "latest")
+
+
+def comments_stamp_query(pk: int) -> QuerySet:
+    return Issue.objects.filter(id=pk).annotate(
+        **children_stamp(Comment.objects.all(), "issue_id", "created_time")
+    ).values("project_id", "updated_time", "count", "latest")
+
+
+def issues_stamp(pk: int) -> Optional[Stamp]:
+    """Stamp of the issues of the project pk."""
+    row: Optional[dict] = issues_stamp_query(pk).first()
+    if row is None:
+        return None
+    return stamp_from_row(f"issues:{pk}", row)
+
+
+def comments_stamp(pk: int) -> Optional[Stamp]:
+    """Stamp of the comments of the issue pk."""
+    row: Optional[dict] = comments_stamp_query(pk).first()
+    if row is None:
+        return None
+    return stamp_from_row(f"comments:{pk}", row, row["project_id"])
+
+
+def stamp_from_row(kind: str, row: dict,
+                   parent_id: Optional[int] = None) -> Stamp:
+    """
+    row holds the updated_time of the parent, and the count and latest
+    stamp of its children. latest is None when there are no children.
+    """
+    stamps: list[datetime.datetime] = [row["updated_time"]]
+    if row["latest"] is not None:
+        stamps.append(row["latest"])
+    last_modified: datetime.datetime = max(stamps)
+    key: str = ":".join((kind, str(row["count"] or 0),
+                         *(stamp.isoformat() for stamp in stamps)))
+    return Stamp(key, last_modified, parent_id)
+
+
+def not_modified(request, stamp: Stamp) -> Optional[HttpResponseBase]:
+    """
+    The 304 (or 412) answering the request when the client's copy is still
+    current. None when the response must be sent.
+    """
+    response: Optional[HttpResponseBase] = get_conditional_response(
+        getattr(request, "_request", request),
+        etag=stamp.etag(request),
+        last_modified=int(stamp.last_modified.timestamp())
+    )
+    if response is not None:
+        add_validators(request, response, stamp)
+        if wants_stream(request):
+            # Sent along with the ETag of a stream (see stream_queryset).
+            patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def add_validators(request, response: HttpResponseBase,
+                   stamp: Stamp) -> HttpResponseBase:
+    response["ETag"] = stamp.etag(request)
+    response["Last-Modified"] = http_date(stamp.last_modified.timestamp())
+    # Responses depend on the user's permissions. Shared caches must not
+    # store them and clients must revalidate their copy on each use.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def touch(model, pk: int):
+    model.objects.filter(id=pk).update(updated_time=timezone.now())
+
+
+def issue_deleted(sender, instance: Issue, **kwargs):
+    if not being_deleted(Project, instance.project_id_id):
+        touch(Project, instance.project_id_id)
+
+
+def comment_deleted(sender, instance: Comment, **kwargs):
+    if not being_deleted(Issue, instance.issue_id_id):
+        touch(Issue, instance.issue_id_id)
+
+
+post_delete.connect(issue_deleted, sender=Issue)
+post_delete.connect(comment_deleted, sender=Comment)
@@ -0,0 +1,307 @@
+"""
+Per-project issue counters by status, priority and tag (see IssueCounter).
+Each issue created, updated or deleted through the ORM adjusts the counters
+it moves with UPDATE ... SET count = count + n, so the counts stay exact
+under concurrent writes and reading a project summary is a single query.
+A save reads the values it replaces again, locked, in its transaction
+(see read_counted): those loaded with the instance may be stale. A
+deletion subtracts the values loaded with the instance, so deleting an
+issue that a concurrent request may update takes loading it with
+select_for_update() in the deletion's transaction (see
+IssueViewSet.destroy). The issues deleted with their project need no
+read at all.
+
+Writes that don't send signals must report their changes themselves:
+bulk_create callers pass the new issues to count_created_issues, and
+QuerySet.update() callers pass the deltas to apply_deltas.
+rebuild_issue_counters and check_issue_counters recount everything from
+the issues table.
+"""
+
+import operator
+from collections import Counter
+from functools import reduce
+from typing import Iterable, Optional
+
+from django.db import connections, router
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, \
+    Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_init, post_save, \
+    pre_delete, pre_save
+
+from .cascades import being_deleted
+from .database import supports_upsert
+from .models import Project, Issue, IssueCounter
+
+COUNTED_FIELDS: tuple[str, ...] = tuple(
+    dimension for dimension, _ in IssueCounter.DIMENSION_CHOICES
+)
+CHOICES: dict[str, list[tuple[str, str]]] = {
+    "status": Issue.STATUS_CHOICES,
+    "priority": Issue.PRIORITY_CHOICES,
+    "tag": Issue.TAG_CHOICES,
+}
+
+
+def issue_keys(project_id: int, values: dict) -> Counter:
+    """{(project_id, dimension, value): 1} for each counted field."""
+    return Counter({(project_id, field, values[field]): 1
+                    for field in COUNTED_FIELDS})
+
+
+def apply_deltas(deltas: Counter):
+    """
+    Adds each change to its counter, creating the counters missing, with
+    one statement for the increments and one for the decrements.
+    """
+    increments: dict[tuple, int] = {key: delta
+                                    for key, delta in deltas.items()
+                                    if delta > 0}
+    decrements: dict[tuple, int] = {key: delta
+                                    for key, delta in deltas.items()
+                                    if delta < 0}
+    if decrements:
+        # The issues were counted, so their counters exist.
+        add_to_counters(decrements)
+    if not increments:
+        return
+    connection: BaseDatabaseWrapper = connections[
+        router.db_for_write(IssueCounter)
+    ]
+    if supports_upsert(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO issuetracker_issuecounter "
+                "(project_id_id, dimension, value, count) VALUES "
+                + ", ".join(["(%s, %s, %s, %s)"] * len(increments))
+                + " ON CONFLICT (project_id_id, dimension, value) "
+                "DO UPDATE SET count = issuetracker_issuecounter.count "
+                "+ excluded.count",
+                [value for key, delta in increments.items()
+                 for value in (*key, delta)]
+            )
+        return
+    for (project_id, dimension, value), delta in increments.items():
+        counter = IssueCounter.objects.filter(project_id=project_id,
+                                              dimension=dimension,
+                                              value=value)
+        if counter.update(count=F("count") + delta):
+            continue
+        # First issue with this value in the project. The conflict is
+        # ignored in case a concurrent request inserted it meanwhile.
+        IssueCounter.objects.bulk_create(
+            [IssueCounter(project_id_id=project_id, dimension=dimension,
+                          value=value)],
+            ignore_conflicts=True
+        )
+        counter.update(count=F("count") + delta)
+
+
+def add_to_counters(deltas: dict[tuple, int]):
+    """Adds the deltas to the existing counters in a single UPDATE."""
+    keys: dict[tuple, Q] = {
+        key: Q(project_id=key[0], dimension=key[1], value=key[2])
+        for key in deltas
+    }
+    IssueCounter.objects.filter(reduce(operator.or_, keys.values())).update(
+        count=F("count") + Case(
+            *(When(keys[key], then=Value(delta))
+              for key, delta in deltas.items()),
+            default=Value(0), output_field=IntegerField()
+        )
+    )
+
+
+def count_created_issues(issues: Iterable[Issue]):
+    """For issues inserted without signals, e.g. with bulk_create."""
+    deltas = Counter()
+    for issue in issues:
+        deltas.update(issue_keys(issue.project_id_id, issue.__dict__))
+    apply_deltas(deltas)
+
+
+def project_summary(project_id: int) -> dict:
+    """
+    Counts of the project's issues per status, priority and tag. Every
+    choice is listed, with 0 when no issue has it.
+    """
+    summary: dict[str, dict[str, int]] = {
+        dimension: {value: 0 for value, _ in choices}
+        for dimension, choices in CHOICES.items()
+    }
+    rows = IssueCounter.objects.filter(project_id=project_id).values_list(
+        "dimension", "value", "count"
+    )
+    for dimension, value, count in rows:
+        if count:
+            summary[dimension][value] = count
+    return {"total": sum(summary["status"].values()), **summary}
+
+
+def issue_total(project_ref: str = "pk") -> Coalesce:
+    """
+    Number of issues of the project referenced by the outer query's
+    project_ref column, summed from its status counters (at most three
+    rows read from the counters' unique index).
+    """
+    return Coalesce(Subquery(
+        IssueCounter.objects.filter(project_id=OuterRef(project_ref),
+                                    dimension="status")
+        .order_by().values("project_id")
+        .annotate(total=Sum("count")).values("total")
+    ), 0)
+
+
+def count_issues(project_ids: Optional[Iterable[int]] = None) -> Counter:
+    """Counts the issues from scratch, with one GROUP BY per dimension."""
+    issues = Issue.objects.all()
+    if project_ids is not None:
+        issues = issues.filter(project_id__in=project_ids)
+    counts = Counter()
+    for dimension in COUNTED_FIELDS:
+        rows = (issues.values_list("project_id", dimension)
+                .annotate(count=Count("id")).order_by())
+        for project_id, value, count in rows:
+            counts[(project_id, dimension, value)] = count
+    return counts
+
+
+def stored_counts(project_ids: Optional[Iterable[int]] = None) -> Counter:
+    counters = IssueCounter.objects.exclude(count=0)
+    if project_ids is not None:
+        counters = counters.filter(project_id__in=project_ids)
+    return Counter({
+        (project_id, dimension, value): count
+        for project_id, dimension, value, count in counters.values_list(
+            "project_id", "dimension", "value", "count"
+        )
+    })
+
+
+def find_mismatches(project_ids: Optional[Iterable[int]] = None) \
+        -> dict[tuple, tuple[int, int]]:
+    """Returns {(project_id, dimension, value): (stored, actual)}."""
+    if project_ids is not None:
+        project_ids = list(project_ids)
+    actual: Counter = count_issues(project_ids)
+    stored: Counter = stored_counts(project_ids)
+    return {key: (stored[key], actual[key])
+            for key in sorted(actual.keys() | stored.keys(),
+                              key=lambda key: tuple(map(str, key)))
+            if stored[key] != actual[key]}
+
+
+def rebuild_counters(project_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Replaces the counters with a fresh count. Must run in a transaction so
+    that readers never see the counters half rebuilt. Returns the number
+    of counters written.
+    """
+    if project_ids is not None:
+        project_ids = list(project_ids)
+    counts: Counter = count_issues(project_ids)
+    counters = IssueCounter.objects.all()
+    if project_ids is not None:
+        counters = counters.filter(project_id__in=project_ids)
+    # Nothing refers to the counters and no receiver listens to their
+    # deletion: the collector deletes them in a single DELETE statement.
+    counters.delete()
+    IssueCounter.objects.bulk_create(
+        (IssueCounter(project_id_id=project_id, dimension=dimension,
+                      value=value, count=count)
+         for (project_id, dimension, value), count in counts.items()),
+        batch_size=1000
+    )
+    return len(counts)
+
+
+def snapshot(instance: Issue):
+    """The counted values of the issue as loaded."""
+    # Deferred fields aren't in __dict__ and are left out rather than
+    # loaded. pre_delete then reads them from the DB if needed.
+    instance._counted = {
+        name: instance.__dict__[attname]
+        for name, attname in (("project_id", "project_id_id"),
+                              *((field, field) for field in COUNTED_FIELDS))
+        if attname in instance.__dict__
+    }
+
+
+def issue_initialized(sender, instance: Issue, **kwargs):
+    snapshot(instance)
+
+
+def read_counted(instance: Issue):
+    """
+    Reads the counted values the issue has in the DB, within the
+    transaction of the write, so that the deltas subtract what the write
+    replaces. The values loaded with the instance may be stale: a
+    concurrent write could have changed them since, and both writes would
+    then subtract the same old values. The row stays locked until the
+    transaction ends, by FOR UPDATE on the DBs that have it and by the
+    write lock BEGIN IMMEDIATE takes on SQLite (see DATABASES).
+    """
+    stored: Optional[tuple] = Issue.objects.select_for_update().filter(
+        id=instance.id
+    ).values_list("project_id", *COUNTED_FIELDS).first()
+    # Nothing to subtract when the issue was deleted concurrently.
+    instance._counted = {} if stored is None \
+        else dict(zip(("project_id", *COUNTED_FIELDS), stored))
+
+
+def issue_saving(sender, instance: Issue, raw: bool = False, **kwargs):
+    # Sent within the transaction of AtomicSaveModel.save().
+    if not raw and not instance._state.adding:
+        read_counted(instance)
+
+
+def issue_saved(sender, instance: Issue, created: bool, raw: bool = False,
+                update_fields=None, **kwargs):
+    if raw:
+        return
+    new_values: dict = {field: getattr(instance, field)
+                        for field in COUNTED_FIELDS}
+    new_project_id: int = instance.project_id_id
+    deltas: Counter = issue_keys(new_project_id, new_values)
+    if not created:
+        old: dict = instance._counted
+        if not old:
+            # The issue was deleted concurrently.
+            return
+        if update_fields is not None:
+            # Fields left out of update_fields weren't written.
+            for field in COUNTED_FIELDS:
+                if field not in update_fields:
+                    new_values[field] = old[field]
+            if "project_id" not in update_fields:
+                new_project_id = old["project_id"]
+            deltas = issue_keys(new_project_id, new_values)
+        deltas.subtract(issue_keys(old["project_id"], old))
+    apply_deltas(deltas)
+
+
+def issue_deleting(sender, instance: Issue, **kwargs):
+    # Sent within the transaction of the collector, before the project's
+    # pre_delete when the project is deleted too: whether it is can only
+    # be told in post_delete. Fully loaded issues need no read.
+    if len(instance._counted) <= len(COUNTED_FIELDS):
+        read_counted(instance)
+
+
+def issue_deleted(sender, instance: Issue, **kwargs):
+    old: dict = instance._counted
+    # The counters of a project being deleted are deleted along with it.
+    if not old or being_deleted(Project, old["project_id"]):
+        return
+    deltas = Counter()
+    deltas.subtract(issue_keys(old["project_id"], old))
+    apply_deltas(deltas)
+
+
+post_init.connect(issue_initialized, sender=Issue)
+pre_save.connect(issue_saving, sender=Issue)
+post_save.connect(issue_saved, sender=Issue)
+pre_delete.connect(issue_deleting, sender=Issue)
+post_delete.connect(issue_deleted, sender=Issue)
@@ -0,0 +1,159 @@
+"""
+Connection management for the production database profile (see DATABASES
+in settings.py).
+
+PRAGMAs: each new SQLite connection runs the PRAGMAs of its
+OPTIONS["pragmas"], e.g. WAL journaling, so that readers don't block the
+writer nor the other way round, and a busy timeout, so that writers wait
+for the lock instead of failing.
+
+Health checks: connections are kept open across requests (CONN_MAX_AGE).
+Django 4.0 only replaces those that raised an error, so a connection the
+server dropped would fail the next request. When CONN_HEALTH_CHECKS is set
+on an alias, as in Django 4.1, its connection is checked with is_usable()
+when a request starts and closed, to be reopened, if it's not usable.
+
+Read replica: the reads of GET and HEAD requests go to the
+DATABASE_REPLICA_ALIAS database, and everything else to the default one.
+With SQLite, the replica is the same file opened by a second, query_only
+connection: in WAL mode it reads while the default connection writes.
+Reads made in a transaction of the default database stay on it, so that
+they see its writes.
+"""
+
+import asyncio
+import contextlib
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+
+# Methods whose reads go to the replica.
+READ_ONLY_METHODS: frozenset[str] = frozenset({"GET", "HEAD"})
+
+# True while serving a request whose reads go to the replica.
+replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+def replica_alias() -> Optional[str]:
+    """None when no replica is configured."""
+    alias: Optional[str] = getattr(settings, "DATABASE_REPLICA_ALIAS", None)
+    return alias if alias in settings.DATABASES else None
+
+
+def supports_upsert(connection: BaseDatabaseWrapper) -> bool:
+    """
+    True when the DB runs INSERT ... ON CONFLICT ... DO UPDATE and
+    UPDATE ... RETURNING, written the same way by PostgreSQL and SQLite
+    3.35+. Django 4.0's ORM can write neither: the callers fall back to a
+    few more ORM queries on the other DBs.
+    """
+    if connection.vendor == "postgresql":
+        return True
+    return connection.vendor == "sqlite" \
+        and connection.Database.sqlite_version_info >= (3, 35)
+
+
+def apply_pragmas(sender, connection: BaseDatabaseWrapper, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas: dict = connection.settings_dict["OPTIONS"].get("pragmas", {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def check_connections(sender, **kwargs):
+    for connection in connections.all():
+        if connection.settings_dict.get("CONN_HEALTH_CHECKS") \
+                and connection.connection is not None \
+                and not connection.in_atomic_block \
+                and not connection.is_usable():
+            connection.close()
+
+
+@contextlib.contextmanager
+def reading_from_replica() -> Iterator[None]:
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Sends the reads of read-only requests to the replica."""
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if replica_reads.get() \
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return replica_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        # Instances read from the replica are saved to the default DB too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        # The replica holds the same rows as the default DB.
+        aliases: set[Optional[str]] = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name=None,
+                      **hints) -> Optional[bool]:
+        return False if db == replica_alias() else None
+
+
+class ReplicaReadsMiddleware:
+    """
+    Routes the reads of GET and HEAD requests to the replica. Streamed
+    responses read their rows while the content is sent, after this
+    middleware has returned. Supports both WSGI and ASGI, like
+    QueryStatsMiddleware.
+    """
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Marks the instance as a coroutine function for Django.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if request.method not in READ_ONLY_METHODS:
+            return self.get_response(request)
+        with reading_from_replica():
+            response: HttpResponse = self.get_response(request)
+        return self.wrap_stream(response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if request.method not in READ_ONLY_METHODS:
+            return await self.get_response(request)
+        with reading_from_replica():
+            response: HttpResponse = await self.get_response(request)
+        return self.wrap_stream(response)
+
+    def wrap_stream(self, response: HttpResponse) -> HttpResponse:
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content
+            )
+        return response
+
+    @staticmethod
+    def stream(content: Iterator[bytes]) -> Iterator[bytes]:
+        with reading_from_replica():
+            yield from content
+
+
+connection_created.connect(apply_pragmas)
+request_started.connect(check_connections)
@@ -0,0 +1,153 @@
+"""
+Denylist of revoked JWTs. A JWT stays valid until it expires, so logging
+out must record its id (the jti claim) until then. Revoked tokens are
+stored in the RevokedToken table and every process keeps them in memory
+as bloom filters, one per hour of expiry: checking a token is a few hash
+lookups and no DB query. Filters whose hour has passed only hold expired
+tokens and are dropped, so memory stays bounded whatever the number of
+revocations.
+
+A bloom filter answers "maybe" for a few tokens that were never added
+(DENYLIST_ERROR_RATE of them). Only those, and actually revoked tokens,
+are confirmed against the table.
+
+A revocation is seen right away by the process that made it. The other
+processes load new rows of the table every DENYLIST_SYNC_INTERVAL
+seconds, from a background thread.
+"""
+
+import datetime
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed amount of memory, with false positives but
+    no false negatives. Sized for capacity items at the given error rate.
+    """
+    def __init__(self, capacity: int, error_rate: float):
+        self.size: int = max(8, math.ceil(-capacity * math.log(error_rate)
+                                          / math.log(2) ** 2))
+        self.hash_count: int = max(1, round(self.size / capacity
+                                            * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, item: str) -> list[int]:
+        # Double hashing: the k positions are h1 + i * h2.
+        digest: bytes = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first: int = int.from_bytes(digest[:8], "little")
+        second: int = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.size
+                for index in range(self.hash_count)]
+
+    def add(self, item: str):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self.positions(item))
+
+
+class TokenDenylist:
+    BUCKET_SECONDS = 3600
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: dict[int, BloomFilter] = {}
+        self.last_id: int = 0
+        self.loaded: bool = False
+        self.syncer: Optional[threading.Thread] = None
+
+    def revoke(self, jti: str, exp: int):
+        """Revokes the token with the given jti and exp claims."""
+        expires_at = datetime.datetime.fromtimestamp(exp,
+                                                     tz=datetime.timezone.utc)
+        RevokedToken.objects.get_or_create(jti=jti,
+                                           defaults={"expires_at": expires_at})
+        with self.lock:
+            self.add(jti, exp)
+
+    def is_revoked(self, jti: str, exp: int) -> bool:
+        if not self.loaded:
+            self.start()
+        bloom: Optional[BloomFilter] = self.buckets.get(
+            exp // self.BUCKET_SECONDS
+        )
+        if bloom is None or jti not in bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def add(self, jti: str, exp: int):
+        bucket: int = exp // self.BUCKET_SECONDS
+        if bucket not in self.buckets:
+            self.buckets[bucket] = BloomFilter(
+                getattr(settings, "DENYLIST_BUCKET_CAPACITY", 100000),
+                getattr(settings, "DENYLIST_ERROR_RATE", 0.001)
+            )
+        self.buckets[bucket].add(jti)
+
+    def start(self):
+        """
+        Loads the table on the first check of the process, then keeps the
+        filters up to date from a background thread.
+        """
+        with self.lock:
+            if self.loaded:
+                return
+            self.sync()
+            self.loaded = True
+            interval: float = getattr(settings, "DENYLIST_SYNC_INTERVAL", 5)
+            if interval:
+                self.syncer = threading.Thread(target=self.sync_forever,
+                                               args=(interval,),
+                                               name="token-denylist",
+                                               daemon=True)
+                self.syncer.start()
+
+    def sync(self):
+        """Adds the rows created since the last sync and drops old buckets."""
+        rows = RevokedToken.objects.filter(
+            id__gt=self.last_id,
+            expires_at__gte=timezone.now()
+        ).order_by("id").values_list("id", "jti", "expires_at")
+        for row_id, jti, expires_at in rows.iterator():
+            self.add(jti, int(expires_at.timestamp()))
+            self.last_id = row_id
+        current: int = int(time.time()) // self.BUCKET_SECONDS
+        for bucket in [bucket for bucket in self.buckets if bucket < current]:
+            del self.buckets[bucket]
+
+    def sync_forever(self, interval: float):
+        purged_at: float = time.monotonic()
+        while True:
+            time.sleep(interval)
+            try:
+                with self.lock:
+                    self.sync()
+                if time.monotonic() - purged_at > self.BUCKET_SECONDS:
+                    RevokedToken.objects.filter(
+                        expires_at__lt=timezone.now()
+                    ).delete()
+                    purged_at = time.monotonic()
+            except DatabaseError:
+                logger.exception("Couldn't sync the token denylist")
+            finally:
+                # This thread's connections would otherwise stay open.
+                connections.close_all()
+
+
+token_denylist = TokenDenylist()
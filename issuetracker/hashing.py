@@ -0,0 +1,78 @@
+"""
+Password hashing is slow on purpose: checking a password on login or
+hashing it on register takes tens to hundreds of milliseconds of CPU.
+Under a burst of logins, every worker of the server would be busy hashing.
+Those calls thus go through a small pool of threads (hashlib releases the
+GIL while hashing). Only PASSWORD_HASHING_QUEUE calls may wait for a
+thread. Past that, the request is answered with a 429 right away instead
+of piling up.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.exceptions import Throttled
+
+
+class HashingPool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.slots: Optional[threading.BoundedSemaphore] = None
+
+    def run(self, function: Callable, *args, **kwargs):
+        """
+        Calls the function in the pool and returns its result. Raises
+        Throttled when the pool and its queue are full. With
+        PASSWORD_HASHING_WORKERS set to 0, calls the function directly.
+        """
+        if not getattr(settings, "PASSWORD_HASHING_WORKERS", 2):
+            return function(*args, **kwargs)
+        self.start()
+        if not self.slots.acquire(blocking=False):
+            raise Throttled(wait=1, detail="Too many logins in progress.")
+        try:
+            # Runs in a copy of the request's context, so that e.g. its
+            # queries are still counted (see instrumentation.py).
+            context: contextvars.Context = contextvars.copy_context()
+            return self.executor.submit(context.run, self.call, function,
+                                        args, kwargs).result()
+        finally:
+            self.slots.release()
+
+    @staticmethod
+    def call(function: Callable, args: tuple, kwargs: dict):
+        try:
+            return function(*args, **kwargs)
+        finally:
+            # The pool's threads don't get Django's request signals, which
+            # close the connections of request threads.
+            connections.close_all()
+
+    def start(self):
+        with self.lock:
+            if self.executor is not None:
+                return
+            workers: int = getattr(settings, "PASSWORD_HASHING_WORKERS", 2)
+            queue: int = getattr(settings, "PASSWORD_HASHING_QUEUE",
+                                 workers * 4)
+            self.executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="password-hashing"
+            )
+            self.slots = threading.BoundedSemaphore(workers + queue)
+
+    def reset(self):
+        """Stops the threads. The next call starts them with new settings."""
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+            self.executor = None
+            self.slots = None
+
+
+password_hashing_pool = HashingPool()
@@ -0,0 +1,250 @@
+"""
+Per-endpoint instrumentation. QueryStatsMiddleware measures every request:
+number of SQL queries, time spent in the DB, time spent rendering the
+response and wall time. Bodies served from the response cache (see
+response_cache.py) were rendered by an earlier request: their rendering
+time is 0. Measures are grouped by URL pattern and method, and
+the last ENDPOINT_STATS_WINDOW measures of each group are kept in memory.
+Admins read their distribution from the stats/endpoints endpoint. When
+QUERY_BUDGET is set, requests running more queries than that are logged.
+"""
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+METRICS: tuple[str, ...] = ("queries", "db_ms", "serialization_ms", "wall_ms")
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank: int = round(fraction * len(ordered))
+    index: int = min(len(ordered) - 1, max(0, rank - 1))
+    return ordered[index]
+
+
+def summarize(samples: Iterable[float]) -> dict[str, float]:
+    ordered: list[float] = sorted(samples)
+    return {
+        "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50": round(percentile(ordered, 0.50), 3),
+        "p95": round(percentile(ordered, 0.95), 3),
+        "p99": round(percentile(ordered, 0.99), 3),
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+# The recorders of the requests being measured in the current context.
+# Context variables follow the request when sync_to_async runs its queries
+# in another thread, where an execute_wrapper of the request's thread
+# wouldn't see them.
+active_recorders: ContextVar[tuple["QueryRecorder", ...]] = ContextVar(
+    "active_recorders", default=()
+)
+
+
+class QueryRecorder:
+    """
+    Counts the queries run within record() blocks, in the current thread
+    or in the threads sync_to_async delegates to, and the time they took.
+    """
+    def __init__(self):
+        self.count: int = 0
+        self.duration: float = 0.0
+
+    @contextlib.contextmanager
+    def record(self) -> Iterator["QueryRecorder"]:
+        """Records the queries run on every DB alias within the block."""
+        token = active_recorders.set((*active_recorders.get(), self))
+        try:
+            yield self
+        finally:
+            active_recorders.reset(token)
+
+
+def record_query(execute: Callable, sql, params, many, context):
+    """Execute wrapper installed on every connection."""
+    recorders: tuple[QueryRecorder, ...] = active_recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    start: float = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration: float = time.perf_counter() - start
+        for recorder in recorders:
+            recorder.count += 1
+            recorder.duration += duration
+
+
+def install_recorder(sender, connection, **kwargs):
+    # connection_created is sent again when a closed connection reconnects.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class EndpointStats:
+    """Rolling windows of measures, one per endpoint and metric."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows: dict[str, dict[str, deque]] = {}
+        self.totals: dict[str, int] = {}
+
+    def record(self, endpoint: str, measures: dict[str, float]):
+        window_size: int = getattr(settings, "ENDPOINT_STATS_WINDOW", 1000)
+        with self.lock:
+            if endpoint not in self.windows:
+                self.windows[endpoint] = {metric: deque(maxlen=window_size)
+                                          for metric in METRICS}
+                self.totals[endpoint] = 0
+            self.totals[endpoint] += 1
+            for metric, value in measures.items():
+                self.windows[endpoint][metric].append(value)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self.lock:
+            windows = {endpoint: {metric: list(samples)
+                                  for metric, samples in metrics.items()}
+                       for endpoint, metrics in self.windows.items()}
+            totals = dict(self.totals)
+        return {
+            endpoint: {
+                "requests": totals[endpoint],
+                "window": len(metrics["wall_ms"]),
+                **{metric: summarize(samples)
+                   for metric, samples in metrics.items()},
+            }
+            for endpoint, metrics in sorted(windows.items())
+        }
+
+    def reset(self):
+        with self.lock:
+            self.windows.clear()
+            self.totals.clear()
+
+
+endpoint_stats = EndpointStats()
+
+
+@contextlib.contextmanager
+def measuring_serialization(request) -> Iterator[None]:
+    """
+    Counts the time spent in the block as serialization time of the
+    request, for the bodies rendered before the response is returned, e.g.
+    the ones response_cache.py caches: the middleware only times the
+    rendering of DRF's responses. The request may be DRF's or Django's.
+    """
+    django_request: HttpRequest = getattr(request, "_request", request)
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        if hasattr(django_request, "_stats_serialization"):
+            django_request._stats_serialization += \
+                time.perf_counter() - start
+
+
+class QueryStatsMiddleware:
+    """
+    Must come first in MIDDLEWARE, so that the wall time covers the other
+    middlewares as well. Supports both WSGI and ASGI: under ASGI, a
+    sync-only middleware would force every view, async ones included, to
+    run in a thread.
+    """
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Marks the instance as a coroutine function for Django.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        request._stats_serialization = 0.0
+        recorder = QueryRecorder()
+        start: float = time.perf_counter()
+        with recorder.record():
+            response: HttpResponse = self.get_response(request)
+        return self.measure(request, response, recorder, start)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        request._stats_serialization = 0.0
+        recorder = QueryRecorder()
+        start: float = time.perf_counter()
+        with recorder.record():
+            response: HttpResponse = await self.get_response(request)
+        return self.measure(request, response, recorder, start)
+
+    def measure(self, request: HttpRequest, response: HttpResponse,
+                recorder: QueryRecorder, start: float) -> HttpResponse:
+        if response.streaming:
+            # The rows are read and serialized while the content is sent,
+            # after this method has returned.
+            response.streaming_content = self.stream(
+                request, response.streaming_content, recorder, start
+            )
+        else:
+            self.finish(request, recorder, start)
+        return response
+
+    def process_template_response(self, request: HttpRequest,
+                                  response: HttpResponse) -> HttpResponse:
+        """DRF responses are rendered right after this hook."""
+        render_start: float = time.perf_counter()
+
+        def rendered(_response: HttpResponse):
+            request._stats_serialization += time.perf_counter() - render_start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def stream(self, request: HttpRequest, content: Iterator[bytes],
+               recorder: QueryRecorder, start: float) -> Iterator[bytes]:
+        try:
+            with recorder.record():
+                for chunk in content:
+                    yield chunk
+        finally:
+            self.finish(request, recorder, start)
+
+    @staticmethod
+    def finish(request: HttpRequest, recorder: QueryRecorder, start: float):
+        wall: float = time.perf_counter() - start
+        endpoint: str = endpoint_name(request)
+        endpoint_stats.record(endpoint, {
+            "queries": recorder.count,
+            "db_ms": recorder.duration * 1000,
+            "serialization_ms": request._stats_serialization * 1000,
+            "wall_ms": wall * 1000,
+        })
+        budget: Optional[int] = getattr(settings, "QUERY_BUDGET", None)
+        if budget is not None and recorder.count > budget:
+            logger.warning("%s ran %d queries (budget: %d) for %s",
+                           endpoint, recorder.count, budget,
+                           request.get_full_path())
+
+
+def endpoint_name(request: HttpRequest) -> str:
+    """e.g. "GET projects/<int:pk>/issues"."""
+    match = getattr(request, "resolver_match", None)
+    route: str = match.route if match is not None else "<unresolved>"
+    return f"{request.method} {route}"
+
+
+connection_created.connect(install_recorder)
@@ -0,0 +1,249 @@
+"""
+Load benchmark of the 18 endpoints listed in softdesk/urls.py. A synthetic
+dataset is generated in the test database, then every endpoint is called
+through Django's test client. The report gives, per endpoint, the
+throughput, latency percentiles and query counts, in JSON so that two runs
+(e.g. on two commits) can be diffed.
+
+    python manage.py benchmark_api --issues 500 --requests 200 -o bench.json
+"""
+
+import itertools
+import json
+import platform
+import subprocess
+import time
+from typing import Callable, Optional
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import setup_test_environment, \
+    teardown_test_environment
+
+from issuetracker.benchmarking import BENCHMARK_PASSWORD, build_dataset, \
+    test_database
+from issuetracker.instrumentation import QueryRecorder, summarize
+from issuetracker.models import Project, Contributor, Issue, Comment
+from issuetracker.utils import get_tokens_for_user
+
+
+class EndpointCase:
+    """
+    One endpoint to benchmark. prepare is called before each request,
+    outside of the measure, and returns the URL and the JSON payload.
+    """
+    def __init__(self, name: str, method: str,
+                 prepare: Callable[[int], tuple[str, Optional[dict]]],
+                 expected_status: int):
+        self.name = name
+        self.method = method
+        self.prepare = prepare
+        self.expected_status = expected_status
+
+
+class Command(BaseCommand):
+    help = "Benchmarks every API endpoint against a synthetic dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--projects", type=int, default=10)
+        parser.add_argument("--contributors", type=int, default=10,
+                            help="Contributors per project.")
+        parser.add_argument("--issues", type=int, default=100,
+                            help="Issues per project.")
+        parser.add_argument("--comments", type=int, default=3,
+                            help="Comments per issue.")
+        parser.add_argument("--requests", type=int, default=50,
+                            help="Requests per endpoint.")
+        parser.add_argument("--endpoint", action="append", default=[],
+                            help="Only benchmark the endpoints whose name "
+                                 "contains this value. Repeatable.")
+        parser.add_argument("-o", "--output",
+                            help="File to write the JSON report to. "
+                                 "Defaults to stdout.")
+
+    def handle(self, *args, **options):
+        dataset_options: dict[str, int] = {
+            name: options[name] for name in
+            ("users", "projects", "contributors", "issues", "comments")
+        }
+        setup_test_environment()
+        try:
+            with test_database():
+                build_dataset(**dataset_options)
+                results: dict[str, dict] = self.run_cases(options)
+        finally:
+            teardown_test_environment()
+
+        report: dict = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": settings.DATABASES["default"]["ENGINE"],
+            "dataset": dataset_options,
+            "requests_per_endpoint": options["requests"],
+            "endpoints": results,
+        }
+        output: str = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def run_cases(self, options: dict) -> dict[str, dict]:
+        # The first project's author acts on its own project, so that every
+        # permission check passes.
+        project: Project = Project.objects.order_by("id").first()
+        user: User = project.author_user_id
+        client = Client(
+            HTTP_AUTHORIZATION="Bearer "
+                               + get_tokens_for_user(user)["acess"]
+        )
+        results: dict[str, dict] = {}
+        for case in self.cases(project, user):
+            if options["endpoint"] and not any(
+                    wanted in case.name for wanted in options["endpoint"]):
+                continue
+            results[case.name] = self.run_case(client, case,
+                                               options["requests"])
+            self.stderr.write(f"{case.name}: "
+                              f"{results[case.name]['throughput_rps']} req/s")
+        return results
+
+    @staticmethod
+    def run_case(client: Client, case: EndpointCase, requests: int) -> dict:
+        latencies: list[float] = []
+        queries: list[int] = []
+        unexpected: dict[str, int] = {}
+        for index in range(requests):
+            url, data = case.prepare(index)
+            recorder = QueryRecorder()
+            start: float = time.perf_counter()
+            with recorder.record():
+                response = getattr(client, case.method)(
+                    url,
+                    data=json.dumps(data) if data is not None else None,
+                    content_type="application/json"
+                )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(recorder.count)
+            if response.status_code != case.expected_status:
+                status_code: str = str(response.status_code)
+                unexpected[status_code] = unexpected.get(status_code, 0) + 1
+        latency: dict[str, float] = summarize(latencies)
+        return {
+            "method": case.method.upper(),
+            "requests": requests,
+            "throughput_rps": round(requests / (sum(latencies) / 1000), 1),
+            "latency_ms": latency,
+            "queries": summarize(queries),
+            "unexpected_status": unexpected,
+        }
+
+    @staticmethod
+    def cases(project: Project, user: User) -> list[EndpointCase]:
+        """The endpoints, numbered as in softdesk/urls.py."""
+        counter = itertools.count()
+        issue: Issue = Issue.objects.filter(project_id=project).first()
+        comment: Comment = Comment.objects.filter(
+            issue_id=issue, author_user_id=user
+        ).first() or Comment.objects.create(description="benchmark",
+                                            issue_id=issue,
+                                            author_user_id=user)
+        if issue.author_user_id_id != user.id:
+            issue.author_user_id = user
+            issue.save()
+
+        def unique(prefix: str) -> str:
+            return f"{prefix}-{next(counter)}"
+
+        def new_project(_) -> tuple[str, None]:
+            created = Project.objects.create(title=unique("doomed"),
+                                             description="benchmark",
+                                             author_user_id=user)
+            return f"/projects/{created.id}", None
+
+        def new_user(_) -> tuple[str, dict]:
+            created = User.objects.create(username=unique("newcomer"))
+            return "/projects/add_user", {"username": created.username,
+                                          "project_title": project.title}
+
+        def new_contributor(_) -> tuple[str, None]:
+            created = User.objects.create(username=unique("leaving"))
+            Contributor.objects.create(user_id=created, project_id=project)
+            return f"/projects/{project.id}/users/{created.id}", None
+
+        def new_issue(_) -> tuple[str, None]:
+            created = Issue.objects.create(title="doomed",
+                                           description="benchmark",
+                                           project_id=project,
+                                           author_user_id=user,
+                                           assignee_user_id=user)
+            return f"/projects/issues/{created.id}", None
+
+        def new_comment(_) -> tuple[str, None]:
+            created = Comment.objects.create(description="doomed",
+                                             issue_id=issue,
+                                             author_user_id=user)
+            return f"/projects/issues/comments/{created.id}", None
+
+        return [
+            EndpointCase("01 register", "post", lambda _: (
+                "/register", {"username": unique("registered"),
+                              "email": "someone@example.com",
+                              "password": BENCHMARK_PASSWORD}), 201),
+            EndpointCase("02 login", "post", lambda _: (
+                "/login", {"username": user.username,
+                           "password": BENCHMARK_PASSWORD}), 200),
+            EndpointCase("03 list projects", "get", lambda _: (
+                "/projects", None), 200),
+            EndpointCase("04 create project", "post", lambda _: (
+                "/projects/create", {"title": unique("created"),
+                                     "description": "benchmark"}), 201),
+            EndpointCase("05 retrieve project", "get", lambda _: (
+                f"/projects/{project.id}", None), 200),
+            EndpointCase("06 update project", "put", lambda _: (
+                f"/projects/{project.id}", {"description": unique("d")}),
+                200),
+            EndpointCase("07 delete project", "delete", new_project, 204),
+            EndpointCase("08 add contributor", "post", new_user, 201),
+            EndpointCase("09 list contributors", "get", lambda _: (
+                f"/projects/{project.id}/users", None), 200),
+            EndpointCase("10 delete contributor", "delete", new_contributor,
+                         204),
+            EndpointCase("11 list issues", "get", lambda _: (
+                f"/projects/{project.id}/issues", None), 200),
+            EndpointCase("12 create issue", "post", lambda _: (
+                f"/projects/{project.id}/issues",
+                {"title": "created", "description": "benchmark",
+                 "assignee_username": user.username}), 201),
+            EndpointCase("13 update issue", "put", lambda index: (
+                f"/projects/issues/{issue.id}",
+                {"status": Issue.STATUS_CHOICES[index % 3][0]}), 200),
+            EndpointCase("14 delete issue", "delete", new_issue, 204),
+            EndpointCase("15 list comments", "get", lambda _: (
+                f"/projects/issues/{issue.id}/comments", None), 200),
+            EndpointCase("16 create comment", "post", lambda _: (
+                f"/projects/issues/{issue.id}/comments",
+                {"description": "benchmark"}), 201),
+            EndpointCase("17 update comment", "put", lambda _: (
+                f"/projects/issues/comments/{comment.id}",
+                {"description": unique("edited")}), 200),
+            EndpointCase("18 delete comment", "delete", new_comment, 204),
+        ]
+
+
+def git_commit() -> Optional[str]:
+    """The commit benchmarked, when running from a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True,
+                              cwd=settings.BASE_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
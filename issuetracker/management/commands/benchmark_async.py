@@ -0,0 +1,139 @@
+"""
+Compares how the sync read endpoints (WSGI, one thread per in-flight
+request) and their async versions (ASGI, one event loop) scale with the
+number of concurrent requests. Both are called in-process, through Django's
+test clients, on a synthetic dataset in the test database.
+
+    python manage.py benchmark_async --concurrency 1 8 32 --requests 400
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, \
+    teardown_test_environment
+
+from issuetracker.benchmarking import build_dataset, test_database
+from issuetracker.instrumentation import summarize
+from issuetracker.models import Project, Issue
+from issuetracker.utils import get_tokens_for_user
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the sync and async read endpoints under concurrency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, nargs="+",
+                            default=[1, 4, 16, 64],
+                            help="Numbers of concurrent requests to try.")
+        parser.add_argument("--requests", type=int, default=400,
+                            help="Requests per run.")
+        parser.add_argument("--issues", type=int, default=100,
+                            help="Issues per project.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with test_database():
+                build_dataset(issues=options["issues"])
+                results: dict = self.run(options)
+        finally:
+            teardown_test_environment()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run(self, options: dict) -> dict:
+        project: Project = Project.objects.order_by("id").first()
+        issue_id: int = Issue.objects.filter(project_id=project).values_list(
+            "id", flat=True
+        ).first()
+        token: str = get_tokens_for_user(project.author_user_id)["acess"]
+        # The four endpoints that have an async version, in turn.
+        urls: list[str] = [f"/projects/{project.id}",
+                           f"/projects/{project.id}/users",
+                           f"/projects/{project.id}/issues",
+                           f"/projects/issues/{issue_id}/comments"]
+
+        results: dict[str, dict] = {}
+        for concurrency in options["concurrency"]:
+            results[str(concurrency)] = {
+                "wsgi": self.run_sync(urls, token, concurrency,
+                                      options["requests"]),
+                "asgi": asyncio.run(self.run_async(urls, token, concurrency,
+                                                   options["requests"])),
+            }
+            self.stderr.write(
+                f"concurrency {concurrency}: "
+                f"wsgi {results[str(concurrency)]['wsgi']['throughput_rps']}"
+                f" req/s, "
+                f"asgi {results[str(concurrency)]['asgi']['throughput_rps']}"
+                f" req/s"
+            )
+        return results
+
+    @staticmethod
+    def run_sync(urls: list[str], token: str, concurrency: int,
+                 requests: int) -> dict:
+        """Like a threaded WSGI server with concurrency threads."""
+        local = threading.local()
+        url_cycle = itertools.cycle(urls)
+        latencies: list[float] = []
+        statuses: set[int] = set()
+
+        def call(url: str):
+            if not hasattr(local, "client"):
+                local.client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+            client: Client = local.client
+            start: float = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses.add(response.status_code)
+            connections.close_all()
+
+        start: float = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(call, (next(url_cycle)
+                                     for _ in range(requests))))
+        return report(requests, time.perf_counter() - start, latencies,
+                      statuses)
+
+    @staticmethod
+    async def run_async(urls: list[str], token: str, concurrency: int,
+                        requests: int) -> dict:
+        """concurrency tasks sharing one event loop."""
+        client = AsyncClient()
+        remaining = iter(range(requests))
+        latencies: list[float] = []
+        statuses: set[int] = set()
+
+        async def worker(call: Callable):
+            for index in remaining:
+                url: str = "/async" + urls[index % len(urls)]
+                request_start: float = time.perf_counter()
+                # Django 4.0's AsyncClient takes raw header names.
+                response = await call(url, authorization=f"Bearer {token}")
+                latencies.append((time.perf_counter() - request_start)
+                                 * 1000)
+                statuses.add(response.status_code)
+
+        start: float = time.perf_counter()
+        await asyncio.gather(*(worker(client.get)
+                               for _ in range(concurrency)))
+        return report(requests, time.perf_counter() - start, latencies,
+                      statuses)
+
+
+def report(requests: int, elapsed: float, latencies: list[float],
+           statuses: set[int]) -> dict:
+    return {
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": summarize(latencies),
+        "statuses": sorted(statuses),
+    }
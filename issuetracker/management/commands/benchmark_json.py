@@ -0,0 +1,149 @@
+"""
+Compares the encoding and decoding throughput of DRF's JSON renderer and
+parser with the ones of FastJSONRenderer and FastJSONParser, on the payloads
+the API actually sends and receives, and checks that both write the same
+bytes and read the same data. Also measures the streamed export of a
+project's issues, with and without gzip.
+
+    python manage.py benchmark_json --issues 5000
+"""
+
+import io
+import json
+from typing import Callable
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import StreamingHttpResponse
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from issuetracker.benchmarking import best_time, build_dataset, \
+    test_database
+from issuetracker.models import Project, Issue, Comment
+from issuetracker.renderers import JSON_BACKEND, FastJSONParser, \
+    FastJSONRenderer
+from issuetracker.serializers import IssueSerializer, CommentSerializer, \
+    FastReadSerializer, fast_serializer_for
+from issuetracker.snapshot import project_snapshot
+from issuetracker.streaming import stream_queryset
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the JSON renderer and parser on the API payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--issues", type=int, default=2000,
+                            help="Issues of the project benchmarked.")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per case. The best is kept.")
+
+    def handle(self, *args, **options):
+        repeat: int = options["repeat"]
+        with test_database():
+            build_dataset(users=20, projects=1, contributors=10,
+                          issues=options["issues"], comments=3)
+            project: Project = Project.objects.get()
+            payloads: dict[str, object] = self.payloads(project)
+            results: dict[str, dict] = {
+                "backend": JSON_BACKEND,
+                "encode": {name: self.encode(data, repeat)
+                           for name, data in payloads.items()},
+                "decode": {name: self.decode(data, repeat)
+                           for name, data in payloads.items()},
+                "stream": self.stream(project, repeat),
+            }
+        self.stdout.write(json.dumps(results, indent=2))
+
+    @staticmethod
+    def payloads(project: Project) -> dict[str, object]:
+        """The data of the responses, and of a bulk creation request."""
+        issues: FastReadSerializer = fast_serializer_for(IssueSerializer)
+        comments: FastReadSerializer = fast_serializer_for(CommentSerializer)
+        issue_rows: list[dict] = issues.serialize(issues.project(
+            Issue.objects.filter(project_id=project).order_by("id")
+        ))
+        return {
+            "issue list": {"next": None, "results": issue_rows},
+            "comment list": {"next": None, "results": comments.serialize(
+                comments.project(Comment.objects.filter(
+                    issue_id__project_id=project
+                ).order_by("id"))
+            )},
+            "project snapshot": project_snapshot(project.id, 3),
+            "bulk issue creation": [
+                {key: row[key] for key in ("title", "description", "tag",
+                                           "priority", "status")}
+                for row in issue_rows
+            ],
+        }
+
+    @staticmethod
+    def encode(data, repeat: int) -> dict:
+        drf: BaseRenderer = JSONRenderer()
+        fast: BaseRenderer = FastJSONRenderer()
+        content: bytes = drf.render(data)
+        if fast.render(data) != content:
+            raise CommandError("FastJSONRenderer and JSONRenderer wrote "
+                               "different JSON")
+        return throughput(len(content), lambda: drf.render(data),
+                          lambda: fast.render(data), repeat)
+
+    @staticmethod
+    def decode(data, repeat: int) -> dict:
+        content: bytes = JSONRenderer().render(data)
+
+        def parse(parser: BaseParser) -> Callable[[], object]:
+            return lambda: parser.parse(io.BytesIO(content))
+
+        expected = parse(JSONParser())()
+        if parse(FastJSONParser())() != expected:
+            raise CommandError("FastJSONParser and JSONParser read "
+                               "different data")
+        return throughput(len(content), parse(JSONParser()),
+                          parse(FastJSONParser()), repeat)
+
+    @staticmethod
+    def stream(project: Project, repeat: int) -> dict:
+        """Bytes sent and rows per second of the streamed issue export."""
+        factory = APIRequestFactory()
+        rows: int = Issue.objects.filter(project_id=project).count()
+
+        def export(accept_encoding: str) -> Callable[[], int]:
+            def run() -> int:
+                request = Request(factory.get(
+                    "/", HTTP_ACCEPT_ENCODING=accept_encoding
+                ))
+                request.accepted_media_type = "application/json"
+                response: StreamingHttpResponse = stream_queryset(
+                    request,
+                    Issue.objects.filter(project_id=project).order_by("id"),
+                    IssueSerializer
+                )
+                return sum(len(chunk) for chunk in response.streaming_content)
+            return run
+
+        results: dict[str, dict] = {}
+        for name, accept_encoding in (("identity", ""), ("gzip", "gzip")):
+            run: Callable[[], int] = export(accept_encoding)
+            results[name] = {
+                "bytes": run(),
+                "rows_per_sec": round(rows / best_time(run, repeat)),
+            }
+        results["gzip"]["ratio"] = round(
+            results["identity"]["bytes"] / results["gzip"]["bytes"], 2
+        )
+        return results
+
+
+def throughput(size: int, drf: Callable, fast: Callable,
+               repeat: int) -> dict:
+    drf_time: float = best_time(drf, repeat)
+    fast_time: float = best_time(fast, repeat)
+    return {
+        "bytes": size,
+        "drf_mb_per_sec": round(size / drf_time / 1e6, 1),
+        "fast_mb_per_sec": round(size / fast_time / 1e6, 1),
+        "speedup": round(drf_time / fast_time, 2),
+    }
@@ -0,0 +1,97 @@
+"""
+Measures logins per second on one core, through the login endpoint, for
+the former configuration (PBKDF2 hashed in the request thread) and the
+current one (PASSWORD_HASHERS and the hashing pool), plus every other
+hasher whose library is installed.
+
+    python manage.py benchmark_logins --logins 50
+"""
+
+import json
+import time
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, \
+    teardown_test_environment
+from django.conf import settings
+
+from issuetracker.benchmarking import BENCHMARK_PASSWORD, test_database
+from issuetracker.hashing import password_hashing_pool
+
+PBKDF2 = "django.contrib.auth.hashers.PBKDF2PasswordHasher"
+OPTIONAL_HASHERS: dict[str, str] = {
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "bcrypt_sha256": "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmarks logins per second for each password hasher."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=30,
+                            help="Logins per configuration.")
+
+    def handle(self, *args, **options):
+        configurations: dict[str, dict] = {
+            "before (pbkdf2_sha256, request thread)": {
+                "PASSWORD_HASHERS": [PBKDF2],
+                "PASSWORD_HASHING_WORKERS": 0,
+            },
+            "current settings": {
+                "PASSWORD_HASHERS": settings.PASSWORD_HASHERS,
+                "PASSWORD_HASHING_WORKERS":
+                    settings.PASSWORD_HASHING_WORKERS,
+            },
+        }
+        for name, hasher in OPTIONAL_HASHERS.items():
+            configurations[f"{name}, hashing pool"] = {
+                "PASSWORD_HASHERS": [hasher, PBKDF2],
+                "PASSWORD_HASHING_WORKERS":
+                    settings.PASSWORD_HASHING_WORKERS,
+            }
+
+        results: dict[str, dict] = {}
+        setup_test_environment()
+        try:
+            with test_database():
+                for index, (name, overrides) in enumerate(
+                        configurations.items()):
+                    results[name] = self.measure(f"login-{index}", overrides,
+                                                 options["logins"])
+        finally:
+            teardown_test_environment()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    @staticmethod
+    def measure(username: str, overrides: dict, logins: int) -> dict:
+        with override_settings(**overrides):
+            password_hashing_pool.reset()
+            algorithm: str = get_hasher().algorithm
+            try:
+                password: str = make_password(BENCHMARK_PASSWORD)
+            except ValueError as error:
+                # The hasher's library isn't installed.
+                return {"skipped": str(error)}
+            User.objects.create(username=username, password=password)
+            client = Client()
+            payload: str = json.dumps({"username": username,
+                                       "password": BENCHMARK_PASSWORD})
+            statuses: set[int] = set()
+            start: float = time.perf_counter()
+            for _ in range(logins):
+                response = client.post("/login", data=payload,
+                                       content_type="application/json")
+                statuses.add(response.status_code)
+            elapsed: float = time.perf_counter() - start
+            password_hashing_pool.reset()
+        return {
+            "hasher": algorithm,
+            "logins_per_sec_per_core": round(logins / elapsed, 1),
+            "ms_per_login": round(elapsed / logins * 1000, 1),
+            "statuses": sorted(statuses),
+        }
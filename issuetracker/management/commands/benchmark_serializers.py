@@ -0,0 +1,77 @@
+"""
+Compares the list serialization of the DRF serializers with the one of
+FastReadSerializer, and checks that both render the same JSON.
+
+    python manage.py benchmark_serializers --rows 20000
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import QuerySet
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer
+
+from issuetracker.benchmarking import best_time, build_dataset, \
+    test_database
+from issuetracker.models import Project, Contributor, Issue, Comment
+from issuetracker.serializers import IssueSerializer, CommentSerializer, \
+    ContributorSerializer, ProjectSerializer, FastReadSerializer, \
+    fast_serializer_for
+
+
+class Command(BaseCommand):
+    help = "Benchmarks FastReadSerializer against the DRF serializers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000,
+                            help="Number of issues (and comments) to create.")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per serializer. The best is kept.")
+
+    def handle(self, *args, **options):
+        rows: int = options["rows"]
+        with test_database():
+            build_dataset(users=50, projects=max(rows // 100, 1),
+                          contributors=20, issues=100, comments=1)
+            cases: dict[str, tuple[QuerySet, type[ModelSerializer]]] = {
+                "project": (Project.objects.all(), ProjectSerializer),
+                "contributor": (Contributor.objects.all(),
+                                ContributorSerializer),
+                "issue": (Issue.objects.all(), IssueSerializer),
+                "comment": (Comment.objects.all(), CommentSerializer),
+            }
+            results: dict[str, dict] = {
+                name: self.compare(queryset.order_by("id"), serializer_class,
+                                   options["repeat"])
+                for name, (queryset, serializer_class) in cases.items()
+            }
+        self.stdout.write(json.dumps(results, indent=2))
+
+    @staticmethod
+    def compare(queryset: QuerySet,
+                serializer_class: type[ModelSerializer],
+                repeat: int) -> dict:
+        renderer = JSONRenderer()
+        fast: FastReadSerializer = fast_serializer_for(serializer_class)
+
+        def drf() -> bytes:
+            return renderer.render(serializer_class(queryset.all(),
+                                                    many=True).data)
+
+        def fast_path() -> bytes:
+            return renderer.render(fast.serialize(fast.project(queryset)))
+
+        if drf() != fast_path():
+            raise CommandError(f"{serializer_class.__name__} and its fast "
+                               f"path rendered different JSON")
+        count: int = queryset.count()
+        drf_time: float = best_time(drf, repeat)
+        fast_time: float = best_time(fast_path, repeat)
+        return {
+            "rows": count,
+            "identical": True,
+            "drf_rows_per_sec": round(count / drf_time),
+            "fast_rows_per_sec": round(count / fast_time),
+            "speedup": round(drf_time / fast_time, 2),
+        }
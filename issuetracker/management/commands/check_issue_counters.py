@@ -0,0 +1,33 @@
+"""
+Compares the per-project issue counters with a fresh count of the issues
+and fails listing every counter that drifted. Fix them with
+rebuild_issue_counters.
+
+    python manage.py check_issue_counters [--project 1 --project 2]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from issuetracker.counters import find_mismatches
+
+
+class Command(BaseCommand):
+    help = "Checks the issue counters against the issues table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append",
+                            help="Only check this project's counters. "
+                                 "Repeatable.")
+
+    def handle(self, *args, **options):
+        mismatches: dict[tuple, tuple[int, int]] = find_mismatches(
+            options["project"]
+        )
+        for (project_id, dimension, value), (stored, actual) \
+                in mismatches.items():
+            self.stdout.write(f"project {project_id} {dimension}={value!r}: "
+                              f"counter {stored}, issues {actual}")
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} counters are wrong. "
+                               "Run rebuild_issue_counters to fix them.")
+        self.stdout.write(self.style.SUCCESS("Every counter is right."))
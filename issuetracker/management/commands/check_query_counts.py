@@ -0,0 +1,68 @@
+"""
+Runs the read endpoints that must cost a fixed number of queries on a
+large and on a small project and fails when the counts differ or exceed
+their budget, e.g. when an N+1 query pattern sneaks in.
+
+    python manage.py check_query_counts
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_test_environment, \
+    teardown_test_environment
+
+from issuetracker.benchmarking import test_database
+from issuetracker.instrumentation import QueryRecorder
+from issuetracker.models import Project
+from issuetracker.query_checks import BUDGETS, build_count_dataset, \
+    endpoint_url, warm_up
+from issuetracker.utils import get_tokens_for_user
+
+
+class Command(BaseCommand):
+    help = "Checks that the read endpoints run a fixed number of queries."
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with test_database():
+                large, small = build_count_dataset()
+                counts: dict[str, list[int]] = {
+                    name: [self.count(project, url)
+                           for project in (large, small)]
+                    for name, (url, _) in BUDGETS.items()
+                }
+        finally:
+            teardown_test_environment()
+
+        failures: list[str] = []
+        for name, (large_count, small_count) in counts.items():
+            budget: int = BUDGETS[name][1]
+            self.stdout.write(f"{name}: {large_count} queries on the large "
+                              f"project, {small_count} on the small one "
+                              f"(budget {budget})")
+            if large_count != small_count or large_count > budget:
+                failures.append(name)
+        if failures:
+            raise CommandError("Query count regression in: "
+                               + ", ".join(failures))
+        self.stdout.write(self.style.SUCCESS(
+            "Every endpoint runs a fixed number of queries."
+        ))
+
+    @staticmethod
+    def count(project: Project, url: str) -> int:
+        """
+        Queries run by the second call, once the caches are warm, except
+        for the response cache, which would answer without any query.
+        """
+        token: str = get_tokens_for_user(project.author_user_id)["acess"]
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        url = endpoint_url(url, project)
+        warm_up(client, url)
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url} answered {response.status_code}.")
+        return recorder.count
@@ -0,0 +1,30 @@
+"""
+Runs EXPLAIN on the queries behind the hot endpoints and fails when one of
+them scans a whole table or sorts its rows instead of reading an index
+(see query_checks.py).
+
+    python manage.py check_query_plans
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from issuetracker.benchmarking import build_dataset, test_database
+from issuetracker.query_checks import hot_queries, uses_indexes
+
+
+class Command(BaseCommand):
+    help = "Checks that the hot endpoint queries are served by indexes."
+
+    def handle(self, *args, **options):
+        failures: list[str] = []
+        with test_database():
+            build_dataset(users=20, projects=5, contributors=5, issues=50)
+            for name, queryset in hot_queries().items():
+                plan: str = queryset.explain()
+                self.stdout.write(f"{name}\n{plan}\n")
+                if not uses_indexes(plan, connection):
+                    failures.append(name)
+        if failures:
+            raise CommandError("No index used by: " + ", ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Every query uses an index."))
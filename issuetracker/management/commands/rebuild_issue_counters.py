@@ -0,0 +1,25 @@
+"""
+Recounts the issues of every project, or of the given ones, and replaces
+the per-project counters behind the issue summary endpoint.
+
+    python manage.py rebuild_issue_counters [--project 1 --project 2]
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from issuetracker.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the issue counters from the issues table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append",
+                            help="Only rebuild this project's counters. "
+                                 "Repeatable.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written: int = rebuild_counters(options["project"])
+        self.stdout.write(self.style.SUCCESS(f"{written} counters written."))
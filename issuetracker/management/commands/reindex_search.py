@@ -0,0 +1,61 @@
+"""
+Rebuilds the full-text search index from the issues and comments tables.
+Rows are read in batches keyed by id (WHERE id > last id of the previous
+batch) and each batch is indexed in its own transaction, so memory stays
+flat and no write lock is held long, whatever the size of the tables.
+The index isn't emptied first: each batch replaces the rows it indexes
+(SearchBackend.index_issues and index_comments upsert), so searches keep
+finding every row while the command runs. The rows left by the issues
+and comments deleted meanwhile, e.g. after their batch was read, are
+pruned at the end.
+
+    python manage.py reindex_search [--batch-size 1000]
+"""
+
+from typing import Optional
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import QuerySet
+
+from issuetracker.models import Issue, Comment
+from issuetracker.search import SearchBackend, get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend: Optional[SearchBackend] = get_backend()
+        if backend is None:
+            raise CommandError("Search isn't supported by this database.")
+        batch_size: int = options["batch_size"]
+
+        issues: int = self.index(
+            Issue.objects.values_list("id", "title", "description"),
+            backend.index_issues, batch_size
+        )
+        comments: int = self.index(
+            Comment.objects.values_list("id", "description"),
+            backend.index_comments, batch_size
+        )
+        with transaction.atomic():
+            backend.prune()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {issues} issues and {comments} comments."
+        ))
+
+    def index(self, rows: QuerySet, index_batch, batch_size: int) -> int:
+        count: int = 0
+        last_id: int = 0
+        while batch := list(rows.filter(id__gt=last_id)
+                            .order_by("id")[:batch_size]):
+            with transaction.atomic():
+                index_batch(batch)
+            count += len(batch)
+            last_id = batch[-1][0]
+            self.stderr.write(f"{count} {rows.model.__name__.lower()}s")
+        return count
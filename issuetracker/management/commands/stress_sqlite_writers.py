@@ -0,0 +1,136 @@
+"""
+Runs concurrent writers against a SQLite test database, first with SQLite's
+defaults (rollback journal, transactions begun as DEFERRED), then with the
+profile of DATABASES (WAL, busy timeout, BEGIN IMMEDIATE...), and reports
+the transactions committed and the "database is locked" errors of each.
+
+Each writer thread posts comments the way the API does: in a transaction
+that reads the issue, then writes the comment, whose signals update the
+changes feed and the search index.
+
+    python manage.py stress_sqlite_writers --threads 8 --transactions 50
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, \
+    connections, transaction
+
+from issuetracker.benchmarking import build_dataset, test_database
+from issuetracker.models import Issue, Comment
+
+# OPTIONS of the default DB reproducing SQLite's defaults.
+SQLITE_DEFAULTS: dict = {
+    "pragmas": {"journal_mode": "delete", "synchronous": "full"},
+}
+
+
+class Command(BaseCommand):
+    help = "Compares SQLite's defaults and the DB profile under " \
+           "concurrent writers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8,
+                            help="Concurrent writers.")
+        parser.add_argument("--transactions", type=int, default=50,
+                            help="Transactions per writer.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The default database isn't SQLite.")
+        # Also changes the OPTIONS of the other threads' connections.
+        profile_options: dict = connection.settings_dict["OPTIONS"]
+        profile: dict = dict(profile_options)
+        results: dict[str, dict] = {}
+        with tempfile.TemporaryDirectory() as directory:
+            with test_database(os.path.join(directory, "stress.sqlite3")):
+                build_dataset(users=options["threads"], projects=1,
+                              contributors=options["threads"], issues=20,
+                              comments=0)
+                try:
+                    for name, phase_options in (("sqlite defaults",
+                                                 SQLITE_DEFAULTS),
+                                                ("profile", profile)):
+                        profile_options.clear()
+                        profile_options.update(phase_options)
+                        # Reconnects with the PRAGMAs of the phase.
+                        connection.close()
+                        results[name] = self.run(options["threads"],
+                                                 options["transactions"])
+                finally:
+                    profile_options.clear()
+                    profile_options.update(profile)
+                    connection.close()
+        self.stdout.write(json.dumps(results, indent=2))
+        if results["profile"]["locked_errors"]:
+            raise CommandError("Writers still failed with \"database is "
+                               "locked\" under the DB profile.")
+
+    def run(self, threads: int, transactions: int) -> dict:
+        issue_ids: list[int] = list(Issue.objects.values_list("id",
+                                                              flat=True))
+        author_ids: list[int] = list(Issue.objects.values_list(
+            "project_id__author_user_id", flat=True
+        ).distinct())
+        connection.close()
+        committed: list[int] = [0] * threads
+        locked: list[int] = [0] * threads
+        start_barrier = threading.Barrier(threads)
+
+        def write(index: int):
+            start_barrier.wait()
+            try:
+                for number in range(transactions):
+                    issue_id: int = issue_ids[(index + number)
+                                              % len(issue_ids)]
+                    try:
+                        self.post_comment(issue_id, author_ids[0],
+                                          f"writer {index}, #{number}")
+                        committed[index] += 1
+                    except OperationalError as exc:
+                        if "locked" not in str(exc):
+                            raise
+                        locked[index] += 1
+            finally:
+                # Closes this thread's connection, e.g. so that the next
+                # phase can change the journal mode.
+                connections.close_all()
+
+        workers: list[threading.Thread] = [
+            threading.Thread(target=write, args=(index,))
+            for index in range(threads)
+        ]
+        start: float = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        seconds: float = time.perf_counter() - start
+        journal_mode: str = self.journal_mode()
+        return {
+            "journal_mode": journal_mode,
+            "transactions": threads * transactions,
+            "committed": sum(committed),
+            "locked_errors": sum(locked),
+            "seconds": round(seconds, 3),
+            "committed_per_sec": round(sum(committed) / seconds),
+        }
+
+    @staticmethod
+    def post_comment(issue_id: int, author_id: int, description: str):
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            issue: Issue = Issue.objects.only("id").get(id=issue_id)
+            Comment.objects.create(issue_id=issue,
+                                   author_user_id_id=author_id,
+                                   description=description)
+
+    @staticmethod
+    def journal_mode() -> str:
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            return cursor.fetchone()[0]
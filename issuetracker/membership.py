@@ -0,0 +1,105 @@
+"""
+Process-wide cache of project memberships. It maps a (user, project) pair
+to the user's role in the project so that permission checks don't need the
+DB once the cache is warm.
+
+The cache lives in the Django cache named by settings.MEMBERSHIP_CACHE_ALIAS.
+In development it is a LocMemCache, which evicts the least recently used
+entries once MAX_ENTRIES is reached and expires entries after TIMEOUT. In
+production, the alias should point at a backend shared by every worker
+(e.g. Redis or Memcached) so that invalidations are seen everywhere.
+"""
+
+from typing import Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Contributor
+
+# Collaborators have an empty role. Non-contributors are cached as well,
+# so they need a value that can't be mistaken for a role or for a miss.
+NOT_A_CONTRIBUTOR = "-"
+
+
+def get_membership_cache() -> BaseCache:
+    return caches[getattr(settings, "MEMBERSHIP_CACHE_ALIAS", "default")]
+
+
+def membership_key(user_id, project_id) -> str:
+    return f"membership:{int(project_id)}:{int(user_id)}"
+
+
+def get_role(user_id, project_id) -> Optional[str]:
+    """
+    Returns the user's role in the project, or None when the user isn't
+    one of its contributors. Only a cache miss hits the DB.
+    """
+    cache: BaseCache = get_membership_cache()
+    key: str = membership_key(user_id, project_id)
+    role: Optional[str] = cache.get(key)
+    if role is None:
+        role = lookup_role(user_id, project_id)
+        cache.set(key, role)
+    if role == NOT_A_CONTRIBUTOR:
+        return None
+    return role
+
+
+async def aget_role(user_id, project_id) -> Optional[str]:
+    """Async version of get_role, for the async views."""
+    cache: BaseCache = get_membership_cache()
+    key: str = membership_key(user_id, project_id)
+    role: Optional[str] = await cache.aget(key)
+    if role is None:
+        role = await sync_to_async(lookup_role)(user_id, project_id)
+        await cache.aset(key, role)
+    if role == NOT_A_CONTRIBUTOR:
+        return None
+    return role
+
+
+def lookup_role(user_id, project_id) -> str:
+    role: Optional[str] = Contributor.objects.filter(
+        user_id=user_id,
+        project_id=project_id
+    ).values_list("permission", flat=True).first()
+    return NOT_A_CONTRIBUTOR if role is None else role
+
+
+def invalidate_membership(user_id, project_id):
+    """
+    Drops the cached role of the user in the project. The entry is dropped
+    again once the current transaction commits. Otherwise, a concurrent
+    request could cache the old state of the row before the commit.
+    """
+    key: str = membership_key(user_id, project_id)
+    get_membership_cache().delete(key)
+    transaction.on_commit(lambda: get_membership_cache().delete(key))
+
+
+def invalidate_memberships(project_id, user_ids: Iterable[int]):
+    """
+    Same as invalidate_membership for many users of one project, with a
+    single cache round trip. Used by the bulk endpoints, whose statements
+    don't send per-row signals.
+    """
+    keys: list[str] = [membership_key(user_id, project_id)
+                       for user_id in user_ids]
+    if not keys:
+        return
+    get_membership_cache().delete_many(keys)
+    transaction.on_commit(lambda: get_membership_cache().delete_many(keys))
+
+
+def contributor_changed(**kwargs):
+    """Keeps the cache in sync whenever a contributor is saved or deleted."""
+    instance: Contributor = kwargs["instance"]
+    invalidate_membership(instance.user_id_id, instance.project_id_id)
+
+
+post_save.connect(contributor_changed, sender=Contributor)
+post_delete.connect(contributor_changed, sender=Contributor)
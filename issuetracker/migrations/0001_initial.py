@@ -0,0 +1,64 @@
+# Generated by Django 4.0.4 on 2026-10-18 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=128)),
+                ('description', models.CharField(max_length=512)),
+                ('type', models.CharField(blank=True, choices=[('back end', 'back end'), ('front end', 'front end'), ('iOS', 'iOS'), ('Android', 'Android')], default='back end', max_length=32)),
+                ('author_user_id', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Issue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=32)),
+                ('description', models.CharField(max_length=512)),
+                ('tag', models.CharField(blank=True, choices=[('tag', 'tag'), ('enhancement', 'enhancement'), ('task', 'task')], default='tag', max_length=64)),
+                ('priority', models.CharField(blank=True, choices=[('low', 'low'), ('medium', 'medium'), ('high', 'high')], default='medium', max_length=64)),
+                ('status', models.CharField(choices=[('to-do', 'to-do'), ('in progress', 'in progress'), ('completed', 'completed')], default='to-do', max_length=64)),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('assignee_user_id', models.ForeignKey(blank=True, default=models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL), on_delete=django.db.models.deletion.CASCADE, related_name='assignee', to=settings.AUTH_USER_MODEL)),
+                ('author_user_id', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('project_id', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, to='issuetracker.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=512)),
+                ('created_time', models.DateTimeField(auto_now=True)),
+                ('author_user_id', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('issue_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='issuetracker.issue')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Contributor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('permission', models.CharField(blank=True, choices=[('owner', ''), ('collaborator', '')], default='', max_length=32)),
+                ('project_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='issuetracker.project')),
+                ('user_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user_id', 'project_id')},
+            },
+        ),
+    ]
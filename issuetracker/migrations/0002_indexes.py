@@ -0,0 +1,47 @@
+# Generated by Django 4.0.4 on 2026-10-18 03:14
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_titles(apps, schema_editor):
+    """
+    Project titles become unique. Every project sharing its title with an
+    older one gets its id appended, so the unique index can be created.
+    """
+    Project = apps.get_model('issuetracker', 'Project')
+    duplicates = (Project.objects.values('title')
+                  .annotate(count=Count('id'))
+                  .filter(count__gt=1)
+                  .values_list('title', flat=True))
+    for title in list(duplicates):
+        projects = Project.objects.filter(title=title).order_by('id')[1:]
+        for project in projects:
+            suffix = f' ({project.id})'
+            project.title = title[:128 - len(suffix)] + suffix
+            project.save(update_fields=['title'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issuetracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_titles,
+                             migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='project',
+            name='title',
+            field=models.CharField(max_length=128, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['issue_id', 'created_time'], name='comment_issue_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project_id', 'created_time'], name='issue_project_created_idx'),
+        ),
+    ]
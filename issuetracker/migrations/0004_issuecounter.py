@@ -0,0 +1,46 @@
+# Generated by Django 4.0.4 on 2026-10-18 03:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def count_existing_issues(apps, schema_editor):
+    """Fills the counters from the issues created so far."""
+    Issue = apps.get_model('issuetracker', 'Issue')
+    IssueCounter = apps.get_model('issuetracker', 'IssueCounter')
+    counters = []
+    for dimension in ('status', 'priority', 'tag'):
+        rows = (Issue.objects.values_list('project_id', dimension)
+                .annotate(count=Count('id')).order_by())
+        counters.extend(IssueCounter(project_id_id=project_id,
+                                     dimension=dimension,
+                                     value=value,
+                                     count=count)
+                        for project_id, value, count in rows)
+    IssueCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issuetracker', '0003_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('status', 'status'), ('priority', 'priority'), ('tag', 'tag')], max_length=16)),
+                ('value', models.CharField(max_length=64)),
+                ('count', models.IntegerField(default=0)),
+                ('project_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='issuetracker.project')),
+            ],
+            options={
+                'unique_together': {('project_id', 'dimension', 'value')},
+            },
+        ),
+        migrations.RunPython(count_existing_issues,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.0.4 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issuetracker', '0004_issuecounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project_id', 'status', 'created_time'], name='issue_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project_id', 'assignee_user_id', 'created_time'], name='issue_project_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project_id', 'title'], name='issue_project_title_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# The full-text index of each DB vendor (see issuetracker/search.py),
+# filled with the rows existing so far. Other vendors have no search.
+SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE issuetracker_issue_fts USING fts5("
+        "title, description, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')",
+        "CREATE VIRTUAL TABLE issuetracker_comment_fts USING fts5("
+        "description, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')",
+        "INSERT INTO issuetracker_issue_fts (rowid, title, description) "
+        "SELECT id, title, description FROM issuetracker_issue",
+        "INSERT INTO issuetracker_comment_fts (rowid, description) "
+        "SELECT id, description FROM issuetracker_comment",
+    ],
+    'postgresql': [
+        "CREATE TABLE issuetracker_issue_search ("
+        "issue_id bigint PRIMARY KEY REFERENCES issuetracker_issue (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX issuetracker_issue_search_idx "
+        "ON issuetracker_issue_search USING GIN (document)",
+        "CREATE TABLE issuetracker_comment_search ("
+        "comment_id bigint PRIMARY KEY REFERENCES issuetracker_comment (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX issuetracker_comment_search_idx "
+        "ON issuetracker_comment_search USING GIN (document)",
+        "INSERT INTO issuetracker_issue_search (issue_id, document) "
+        "SELECT id, setweight(to_tsvector('english', title), 'A') "
+        "|| setweight(to_tsvector('english', description), 'B') "
+        "FROM issuetracker_issue",
+        "INSERT INTO issuetracker_comment_search (comment_id, document) "
+        "SELECT id, setweight(to_tsvector('english', description), 'B') "
+        "FROM issuetracker_comment",
+    ],
+}
+
+REVERSE_SQL = {
+    'sqlite': [
+        "DROP TABLE issuetracker_issue_fts",
+        "DROP TABLE issuetracker_comment_fts",
+    ],
+    'postgresql': [
+        "DROP TABLE issuetracker_issue_search",
+        "DROP TABLE issuetracker_comment_search",
+    ],
+}
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issuetracker', '0005_issue_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(SQL), run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.0.4 on 2026-10-18 03:36
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def stamp_existing_issues(apps, schema_editor):
+    """Issues created so far were last modified, at best, when created."""
+    Issue = apps.get_model('issuetracker', 'Issue')
+    Issue.objects.update(updated_time=F('created_time'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issuetracker', '0006_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(stamp_existing_issues,
+                             migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='project',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project_id', 'updated_time'], name='issue_project_updated_idx'),
+        ),
+    ]
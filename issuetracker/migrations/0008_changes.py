@@ -0,0 +1,72 @@
+# Generated by Django 4.0.4 on 2026-10-18 03:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def record_existing_rows(apps, schema_editor):
+    """
+    Gives every existing issue, comment and contributor a change, so that
+    a client syncing from scratch receives them.
+    """
+    Issue = apps.get_model('issuetracker', 'Issue')
+    Comment = apps.get_model('issuetracker', 'Comment')
+    Contributor = apps.get_model('issuetracker', 'Contributor')
+    Change = apps.get_model('issuetracker', 'Change')
+    ChangeSequence = apps.get_model('issuetracker', 'ChangeSequence')
+    sequences = {}
+    changes = []
+    for kind, rows in (
+        ('contributor', Contributor.objects.values_list('project_id', 'id')),
+        ('issue', Issue.objects.values_list('project_id', 'id')),
+        ('comment', Comment.objects.values_list('issue_id__project_id',
+                                                'id')),
+    ):
+        for project_id, object_id in rows.order_by('id').iterator():
+            sequences[project_id] = sequences.get(project_id, 0) + 1
+            changes.append(Change(project_id_id=project_id, kind=kind,
+                                  object_id=object_id,
+                                  sequence=sequences[project_id]))
+    Change.objects.bulk_create(changes, batch_size=1000)
+    ChangeSequence.objects.bulk_create(
+        [ChangeSequence(project_id_id=project_id, value=value)
+         for project_id, value in sequences.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issuetracker', '0007_updated_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('project_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='issuetracker.project')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('issue', 'issue'), ('comment', 'comment'), ('contributor', 'contributor')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('sequence', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('project_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='issuetracker.project')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['project_id', 'sequence'], name='change_project_sequence_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='change',
+            unique_together={('project_id', 'kind', 'object_id')},
+        ),
+        migrations.RunPython(record_existing_rows, migrations.RunPython.noop),
+    ]
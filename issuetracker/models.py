@@ -9,12 +9,32 @@ is used throughout the application.
 import datetime
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, router, transaction
 from django.db.models.signals import post_save
 
 
-class Project(models.Model):
-    title: str = models.CharField(blank=False, max_length=128)
+class AtomicSaveModel(models.Model):
+    """
+    Saves the row in a transaction along with the work of its save
+    receivers, e.g. the issue counters or the changes feed: the row and the
+    data derived from it commit or roll back together, within the caller's
+    transaction if there's one. Deletions need nothing more: the ORM's
+    collector already sends the delete signals within its transaction.
+    """
+    class Meta:
+        abstract = True
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(force_insert, force_update, using, update_fields)
+
+
+class Project(AtomicSaveModel):
+    # Contributors are added by project title (see AddContributorProject),
+    # so a title must identify a single project.
+    title: str = models.CharField(blank=False, max_length=128, unique=True)
     description: str = models.CharField(blank=False, max_length=512)
     TYPE_CHOICES = [
         ("back end", "back end"),
@@ -33,9 +53,12 @@ class Project(models.Model):
                                              null=False,
                                              blank=True,
                                              on_delete=models.CASCADE)
+    # Also bumped when one of its issues is deleted (see conditional.py).
+    updated_time: datetime.datetime = models.DateTimeField(blank=True,
+                                                           auto_now=True)
 
 
-class Contributor(models.Model):
+class Contributor(AtomicSaveModel):
     """
     The permission field isn't useful in the current version of the project.
     The idea behind the specification seems to be that permissions should
@@ -63,7 +86,7 @@ class Contributor(models.Model):
         unique_together = ["user_id", "project_id"]
 
 
-class Issue(models.Model):
+class Issue(AtomicSaveModel):
     title: str = models.CharField(blank=False, max_length=32)
     description: str = models.CharField(blank=False, max_length=512)
     TAG_CHOICES = [
@@ -123,9 +146,34 @@ class Issue(models.Model):
     # time-created one.
     created_time: datetime.datetime = models.DateTimeField(blank=True,
                                                            auto_now_add=True)
+    # Validates the cached copies of the issue list (see conditional.py).
+    # Also bumped when one of its comments is deleted.
+    updated_time: datetime.datetime = models.DateTimeField(blank=True,
+                                                           auto_now=True)
+
+    class Meta:
+        """
+        Issues are always listed per project (see IssueViewSet.get), in
+        created_time or title order. Each of the indexes below serves one
+        of the listing's filters or orderings without a sort. The last one
+        serves the latest updated_time of a project (see conditional.py).
+        """
+        indexes = [
+            models.Index(fields=["project_id", "created_time"],
+                         name="issue_project_created_idx"),
+            models.Index(fields=["project_id", "status", "created_time"],
+                         name="issue_project_status_idx"),
+            models.Index(fields=["project_id", "assignee_user_id",
+                                 "created_time"],
+                         name="issue_project_assignee_idx"),
+            models.Index(fields=["project_id", "title"],
+                         name="issue_project_title_idx"),
+            models.Index(fields=["project_id", "updated_time"],
+                         name="issue_project_updated_idx")
+        ]
 
 
-class Comment(models.Model):
+class Comment(AtomicSaveModel):
     description: str = models.CharField(blank=False, max_length=512)
     # A comment is still useful even if the author's account was deleted
     author_user_id: User = models.ForeignKey(User,
@@ -140,13 +188,96 @@ class Comment(models.Model):
     # timestamps is more adapted.
     created_time = models.DateTimeField(blank=True, auto_now=True)
 
+    class Meta:
+        """Comments are always listed per issue in created_time order."""
+        indexes = [
+            models.Index(fields=["issue_id", "created_time"],
+                         name="comment_issue_created_idx")
+        ]
+
+
+class IssueCounter(models.Model):
+    """
+    Number of issues of a project having a given value in one of the
+    counted columns, e.g. (project, "status", "completed"). The project
+    summary is read from this table instead of counting the issues. Rows
+    are kept up to date by counters.py.
+    """
+    DIMENSION_CHOICES = [
+        ("status", "status"),
+        ("priority", "priority"),
+        ("tag", "tag")
+    ]
+    project_id: Project = models.ForeignKey(Project,
+                                            on_delete=models.CASCADE)
+    dimension: str = models.CharField(choices=DIMENSION_CHOICES,
+                                      max_length=16)
+    value: str = models.CharField(max_length=64)
+    count: int = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ["project_id", "dimension", "value"]
+
+
+class ChangeSequence(models.Model):
+    """
+    Last sequence number handed out to a change of the project. Taking the
+    next numbers locks the row until the transaction ends, so the changes
+    of a project are committed in sequence order (see changes.py).
+    """
+    project_id: Project = models.OneToOneField(Project,
+                                               on_delete=models.CASCADE,
+                                               primary_key=True)
+    value: int = models.BigIntegerField(default=0)
+
+
+class Change(models.Model):
+    """
+    Latest change of a row synced by the clients: an issue, a comment or a
+    contributor of the project. Each change of the row moves it to a new
+    sequence number, so the table holds one row per synced row and the
+    rows deleted are kept as tombstones (deleted=True).
+    """
+    KIND_CHOICES = [
+        ("issue", "issue"),
+        ("comment", "comment"),
+        ("contributor", "contributor")
+    ]
+    project_id: Project = models.ForeignKey(Project,
+                                            on_delete=models.CASCADE)
+    kind: str = models.CharField(choices=KIND_CHOICES, max_length=16)
+    object_id: int = models.BigIntegerField()
+    sequence: int = models.BigIntegerField()
+    deleted: bool = models.BooleanField(default=False)
+
+    class Meta:
+        """The feed reads a project's changes in sequence order."""
+        unique_together = ["project_id", "kind", "object_id"]
+        indexes = [
+            models.Index(fields=["project_id", "sequence"],
+                         name="change_project_sequence_idx")
+        ]
+
+
+class RevokedToken(models.Model):
+    """
+    JWTs revoked before they expire, e.g. on logout. Tokens are checked
+    against an in-memory filter built from this table (see denylist.py).
+    Rows past expires_at can't match a valid token anymore and are purged.
+    """
+    jti: str = models.CharField(max_length=255, unique=True)
+    expires_at: datetime.datetime = models.DateTimeField(db_index=True)
+
 
 def model_created(**kwargs):
     """
      Whenever an user creates a project, he becomes the owner of that
      project. We thus create a contributor instance with the permission
-     field set to owner.
+     field set to owner. The membership cache may already hold a
+     negative answer for that pair, so we drop it.
     """
+    from .membership import invalidate_membership
+
     instance: Project = kwargs["instance"]
     if kwargs["created"]:
         owner: Contributor = Contributor(
@@ -155,6 +286,7 @@ def model_created(**kwargs):
             project_id=instance
         )
         owner.save()
+        invalidate_membership(owner.user_id_id, instance.id)
 
 
 post_save.connect(model_created, sender=Project)
@@ -0,0 +1,158 @@
+"""
+Keyset pagination. Instead of counting the rows and skipping the previous
+pages with OFFSET, each page filters on the position of the last row sent,
+e.g. WHERE (created_time, id) > (last_created_time, last_id). With an index
+on the ordering columns, every page costs the same no matter how deep the
+client goes, and rows inserted meanwhile never shift the pages.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+from django.db.models.fields import Field
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Orders the queryset by the view's ordering attribute and returns pages
+    of page_size rows along with an opaque cursor pointing at the next page.
+    The primary key is appended to the ordering when it's missing, so the
+    position of a row is always unique.
+    """
+    page_size: int = api_settings.PAGE_SIZE
+    page_size_query_param: str = "page_size"
+    max_page_size: int = 100
+    cursor_query_param: str = "cursor"
+    invalid_cursor_message: str = "Invalid cursor"
+    ordering: tuple[str, ...] = ("id",)
+
+    def paginate_queryset(self, queryset: QuerySet, request,
+                          view=None) -> list:
+        self.request = request
+        self.model: type[Model] = queryset.model
+        self.fields: list[str] = self.get_ordering(view)
+        page_size: int = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.fields)
+        position: Optional[list] = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        # Fetching one extra row tells whether a next page exists
+        # without running a COUNT.
+        rows: list = list(queryset[:page_size + 1])
+        page: list = rows[:page_size]
+        self.next_position: Optional[list] = None
+        if len(rows) > page_size:
+            self.next_position = [self.row_value(page[-1], field)
+                                  for field in self.fields]
+        return page
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({
+            "next": self.get_next_link(),
+            "results": data
+        })
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_ordering(self, view) -> list[str]:
+        ordering = getattr(view, "ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        fields: list[str] = list(ordering)
+        if fields[-1].lstrip("-") not in ("id", "pk"):
+            # In the same direction as the last field, so that an index on
+            # the ordering columns, which ends with the pk, can be read
+            # backwards for a descending ordering.
+            fields.append("-id" if fields[-1].startswith("-") else "id")
+        return fields
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def after(self, position: list) -> Q:
+        """
+        Builds the row comparison (f1, f2, ...) > (v1, v2, ...) as
+        f1 > v1 OR (f1 = v1 AND f2 > v2) OR ..., with < for descending
+        fields. The redundant f1 >= v1 in front lets the DB seek the index
+        to the position instead of reading it from the start.
+        """
+        condition = Q()
+        equal_so_far = Q()
+        for field, value in zip(self.fields, position):
+            name: str = field.lstrip("-")
+            lookup: str = "lt" if field.startswith("-") else "gt"
+            condition |= equal_so_far & Q(**{f"{name}__{lookup}": value})
+            equal_so_far &= Q(**{name: value})
+        first: str = self.fields[0]
+        lookup = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{lookup}": position[0]}) \
+            & condition
+
+    def row_value(self, row, field: str):
+        name: str = field.lstrip("-")
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, self.model_field(name).attname)
+
+    def model_field(self, name: str) -> Field:
+        if name == "pk":
+            return self.model._meta.pk
+        return self.model._meta.get_field(name)
+
+    def encode_cursor(self, position: list) -> str:
+        values: list = [value.isoformat()
+                        if isinstance(value, datetime.datetime) else value
+                        for value in position]
+        data: bytes = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, request) -> Optional[list]:
+        encoded: Optional[str] = request.query_params.get(
+            self.cursor_query_param
+        )
+        if encoded is None:
+            return None
+        try:
+            values: Any = json.loads(base64.urlsafe_b64decode(
+                encoded.encode()
+            ))
+            if not isinstance(values, list) \
+                    or len(values) != len(self.fields):
+                raise ValueError
+            return [self.model_field(field.lstrip("-")).to_python(value)
+                    for field, value in zip(self.fields, values)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        url: str = self.request.build_absolute_uri()
+        return replace_query_param(url,
+                                   self.cursor_query_param,
+                                   self.encode_cursor(self.next_position))
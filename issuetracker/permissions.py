@@ -7,29 +7,82 @@ to the Project table).
 The two other levels are defined in this module.
 """
 
+from typing import Optional
 
-from rest_framework.exceptions import PermissionDenied
-from issuetracker.models import Contributor
+from django.db.models import Model
+from rest_framework.exceptions import NotFound, PermissionDenied
+from issuetracker.membership import aget_role, get_role
 
 
 def only_obj_author_permission(request, obj):
     """
     Returns None when the user making the request is the author of the
-    given instance model. Otherwise raises PermissionDenied.
+    given instance model. Otherwise raises PermissionDenied. The author's
+    id is compared, so the author isn't loaded from the DB.
     """
-    if obj.author_user_id != request.user:
+    if obj.author_user_id_id != request.user.id:
         raise PermissionDenied
 
 
+def deny_unmatched_write(model: type[Model], pk):
+    """
+    Writes restricted to the user's own rows, e.g.
+    filter(id=pk, author_user_id=user.id).delete(), match nothing both when
+    the row doesn't exist and when someone else wrote it. Raises NotFound
+    in the first case and PermissionDenied in the second.
+    """
+    if model.objects.filter(id=pk).exists():
+        raise PermissionDenied
+    raise NotFound
+
+
 def only_project_contributor_permission(request, project_id):
     """
     Returns None when the user making the request is in the given project's
     list of contributors. Otherwise raises PermissionDenied.
     """
-    contributors = Contributor.objects.filter(
-        project_id=project_id
-    )
-    contributors_user = [contributor.user_id for contributor in
-                         contributors]
-    if request.user not in contributors_user:
+    if not is_project_contributor(request, project_id):
+        raise PermissionDenied
+
+
+async def aonly_project_contributor_permission(request, project_id):
+    """Async version of only_project_contributor_permission."""
+    if not await ais_project_contributor(request, project_id):
         raise PermissionDenied
+
+
+def is_project_contributor(request, project_id) -> bool:
+    """
+    Answers from the shared membership cache, which falls back to a single
+    query on the (user_id, project_id) unique index. The answer is also
+    memoized on the underlying HttpRequest, so checking the same project
+    again later in the request is free.
+    """
+    memo: dict[int, bool] = contributor_memo(request)
+    project_id = int(project_id)
+    if project_id not in memo:
+        memo[project_id] = get_role(request.user.id,
+                                    project_id) is not None
+    return memo[project_id]
+
+
+async def ais_project_contributor(request, project_id) -> bool:
+    """Async version of is_project_contributor."""
+    memo: dict[int, bool] = contributor_memo(request)
+    project_id = int(project_id)
+    if project_id not in memo:
+        memo[project_id] = await aget_role(request.user.id,
+                                           project_id) is not None
+    return memo[project_id]
+
+
+def contributor_memo(request) -> dict[int, bool]:
+    # DRF wraps the HttpRequest. Storing the memo on the wrapped object
+    # shares it between every Request built around the same HttpRequest.
+    http_request = getattr(request, "_request", request)
+    memo: Optional[dict[int, bool]] = getattr(http_request,
+                                              "_contributor_memo", None)
+    if memo is None:
+        memo = {}
+        http_request._contributor_memo = memo
+    return memo
@@ -0,0 +1,155 @@
+"""
+Checks of the queries behind the hot endpoints, shared by the
+check_query_plans and check_query_counts management commands and the test
+suite: each query must be served by an index rather than scan a whole table
+or sort its rows, and each read endpoint must run a fixed number of
+queries, whatever the size of the project.
+"""
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import F, QuerySet, Subquery
+from django.http import HttpResponse
+from django.test import Client
+from django.utils import timezone
+
+from .benchmarking import build_dataset
+from .conditional import comments_stamp_query, issues_stamp_query
+from .counters import issue_total
+from .models import Project, Contributor, Issue, Comment, Change
+from .pagination import KeysetPagination
+from .response_cache import response_cache
+
+# Plan lines revealing that no index was used, per DB vendor.
+NO_INDEX_MARKERS: dict[str, tuple[str, ...]] = {
+    "sqlite": ("SCAN ", "USE TEMP B-TREE"),
+    "postgresql": ("Seq Scan", "Sort"),
+}
+
+# Most queries each endpoint may run once the caches are warm, with the
+# URL built from the project and one of its issues.
+BUDGETS: dict[str, tuple[str, int]] = {
+    "project snapshot": ("/projects/{project}/snapshot?comments=5", 4),
+    "issues page": ("/projects/{project}/issues", 2),
+    "comments page": ("/projects/issues/{issue}/comments", 2),
+}
+
+
+def uses_indexes(plan: str, connection: BaseDatabaseWrapper) -> bool:
+    """False when the EXPLAIN output shows a table scan or a sort."""
+    markers: tuple[str, ...] = NO_INDEX_MARKERS.get(connection.vendor, ())
+    return not any(marker in plan for marker in markers)
+
+
+def keyset_page(queryset: QuerySet, ordering: list[str],
+                position: list) -> QuerySet:
+    """The query KeysetPagination runs for a page after the first."""
+    pagination = KeysetPagination()
+    pagination.fields = ordering
+    return queryset.filter(
+        pagination.after(position)
+    ).order_by(*ordering)[:pagination.page_size + 1]
+
+
+def hot_queries() -> dict[str, QuerySet]:
+    """
+    The queries of the hot endpoints, by name, with the ids of the first
+    user, project and issue of the dataset.
+    """
+    since: datetime.datetime = timezone.now() - datetime.timedelta(days=1)
+    return {
+        # permissions.is_project_contributor, through membership.get_role
+        "membership": Contributor.objects.filter(
+            user_id=1, project_id=1
+        ).values_list("permission", flat=True)[:1],
+        # ListProjectLoggedInUser
+        "projects page": keyset_page(Project.objects.all(), ["id"], [1]),
+        "my projects page": keyset_page(
+            Contributor.objects.filter(user_id=1).annotate(
+                title=F("project_id__title"),
+                issue_count=issue_total("project_id")
+            ),
+            ["project_id", "id"], [1, 1]
+        ),
+        # AddContributorProject
+        "project by title": Project.objects.filter(title="project 1"),
+        # ListProjectContributors
+        "contributors": Contributor.objects.filter(project_id=1),
+        # IssueViewSet.get
+        "issues first page": Issue.objects.filter(
+            project_id=1
+        ).order_by("created_time", "id")[:11],
+        "issues next page": keyset_page(
+            Issue.objects.filter(project_id=1),
+            ["created_time", "id"], [since, 1]
+        ),
+        # IssueViewSet.get with filters and orderings
+        "issues by status": Issue.objects.filter(
+            project_id=1, status__in=["to-do"]
+        ).order_by("created_time", "id")[:11],
+        "issues by assignee": Issue.objects.filter(
+            project_id=1, assignee_user_id=Subquery(User.objects.filter(
+                username="user1"
+            ).values("id"))
+        ).order_by("created_time", "id")[:11],
+        "issues created since": Issue.objects.filter(
+            project_id=1, created_time__gte=since
+        ).order_by("created_time", "id")[:11],
+        "issues newest first": keyset_page(
+            Issue.objects.filter(project_id=1),
+            ["-created_time", "-id"], [since, 1]
+        ),
+        "issues by title": keyset_page(
+            Issue.objects.filter(project_id=1),
+            ["title", "id"], ["issue 1", 1]
+        ),
+        # CommentViewSet.get
+        "comments first page": Comment.objects.filter(
+            issue_id=1
+        ).order_by("created_time", "id")[:11],
+        "comments next page": keyset_page(
+            Comment.objects.filter(issue_id=1),
+            ["created_time", "id"], [since, 1]
+        ),
+        # Validators of the conditional reads (see conditional.py)
+        "issues stamp": issues_stamp_query(1),
+        "comments stamp": comments_stamp_query(1),
+        # ChangesView
+        "changes since": Change.objects.filter(
+            project_id=1, sequence__gt=10
+        ).order_by("sequence")[:501],
+    }
+
+
+def build_count_dataset() -> tuple[Project, Project]:
+    """
+    A large project and a small one, holding a single issue, whose
+    endpoints must run the same number of queries.
+    """
+    build_dataset(projects=2, issues=40, comments=6)
+    large, small = Project.objects.order_by("id")[:2]
+    Issue.objects.filter(project_id=small).exclude(
+        id=Issue.objects.filter(project_id=small).values("id")[:1]
+    ).delete()
+    return large, small
+
+
+def endpoint_url(url: str, project: Project) -> str:
+    """The URL of BUDGETS for the project and its first issue."""
+    issue_id: int = Issue.objects.filter(project_id=project).values_list(
+        "id", flat=True
+    ).first()
+    return url.format(project=project.id, issue=issue_id)
+
+
+def warm_up(client: Client, url: str) -> HttpResponse:
+    """
+    Requests the URL once so that the caches are warm, except for the
+    response cache, which would answer the next request without any query.
+    """
+    response: HttpResponse = client.get(url)
+    response_cache.reset()
+    response_cache.shared.clear()
+    return response
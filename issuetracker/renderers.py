@@ -0,0 +1,129 @@
+"""
+Renderers turn the data returned by the views into the bytes of the
+response body, and parsers turn request bodies into data.
+
+FastJSONRenderer and FastJSONParser replace DRF's JSON classes (see
+REST_FRAMEWORK in settings.py). They use orjson when it's installed, which
+encodes dicts, lists, strings and datetimes natively, and fall back to the
+stdlib json module, through DRF's own classes, when it isn't. The JSON
+written is the same either way, byte for byte, so switching backends
+doesn't change the ETags or the cached bodies.
+"""
+
+import json
+from typing import Any, Callable
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Name of the JSON library in use, e.g. for the benchmarks.
+JSON_BACKEND: str = "json" if orjson is None else "orjson"
+
+# DRF writes datetimes in UTC with a Z suffix. Keys that aren't strings
+# (e.g. ids) are turned into strings, like json.dumps does.
+ORJSON_OPTIONS: int = 0 if orjson is None \
+    else orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# The types orjson doesn't know (Decimal, lazy translations, querysets...)
+# are converted by the encoder DRF uses with the stdlib.
+encode_default: Callable[[Any], Any] = encoders.JSONEncoder().default
+
+
+def _stdlib_dumps(data) -> bytes:
+    return json.dumps(data, cls=encoders.JSONEncoder, ensure_ascii=False,
+                      separators=(",", ":")).encode()
+
+
+def dumps(data) -> bytes:
+    """
+    Compact UTF-8 JSON, as written by DRF's JSONRenderer with its default
+    settings, except for the escaping of U+2028 and U+2029 (see
+    FastJSONRenderer).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=encode_default,
+                                option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers over 64 bits. The stdlib tells the rest apart.
+            pass
+    return _stdlib_dumps(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson. Indented output, ASCII-only output
+    (UNICODE_JSON = False) and non-compact output (COMPACT_JSON = False),
+    e.g. for the browsable API, are left to JSONRenderer. Unlike it, NaN
+    and infinite floats are written as null, but no field of the API is a
+    float.
+    """
+    def render(self, data, accepted_media_type=None,
+               renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        if orjson is None or self.ensure_ascii or not self.compact \
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        # JSONRenderer escapes these to keep the output a subset of
+        # JavaScript.
+        return dumps(data).replace("\u2028".encode(), b"\\u2028") \
+            .replace("\u2029".encode(), b"\\u2029")
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser decoding with orjson, from the bytes of the body: there's no
+    text decoding step. Bodies in another charset than UTF-8 are left to
+    JSONParser.
+    """
+    renderer_class: type[BaseRenderer] = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding: str = parser_context.get("encoding",
+                                           settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("_", "-") \
+                not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        content: bytes = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as exc:
+            if self.strict:
+                raise ParseError(f"JSON parse error - {exc}")
+        # orjson rejects NaN and Infinity, which JSONParser accepts unless
+        # STRICT_JSON is set.
+        try:
+            return json.loads(content)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline delimited JSON: one JSON document per line. Clients asking for
+    that media type get the list endpoints as a stream (see streaming.py).
+    This renderer only handles the other responses of those endpoints,
+    e.g. errors.
+    """
+    media_type: str = "application/x-ndjson"
+    format: str = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None,
+               renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(dumps(row) + b"\n" for row in rows)
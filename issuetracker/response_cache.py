@@ -0,0 +1,288 @@
+"""
+Cache of the rendered bodies of the read endpoints. Bodies are keyed by
+the version of the resource they were read from, e.g. the issues of
+project 3, rather than by user. The permission check still runs on each
+request, before the cache is read, so one cached body serves every
+contributor.
+
+Versions are counters stored in the Django cache named by
+settings.RESPONSE_CACHE_ALIAS, shared by every worker. Writes bump the
+version of what they change, which makes the bodies cached for the old
+version unreachable; they then age out of the cache. A missing counter is
+initialized with the current time in nanoseconds, so a counter lost to
+eviction or a restart never comes back to a value bodies were cached for.
+
+Bodies are read from a size-bounded LRU tier in the process first
+(RESPONSE_CACHE_LOCAL_MAX_BYTES), then from the shared cache. Only the
+version is read from the shared cache on a local hit.
+
+The save and delete signals bump the versions. Writes that don't send
+signals must call bump themselves.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
+from rest_framework.response import Response
+
+from .cascades import being_deleted
+from .instrumentation import measuring_serialization
+from .models import Project, Contributor, Issue, Comment
+
+
+class LocalTier:
+    """
+    Least recently used entries of at most max_bytes of content. Shared by
+    the threads of the process.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self.entries: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[bytes, str]]:
+        with self.lock:
+            entry: Optional[tuple[bytes, str]] = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: tuple[bytes, str]) -> int:
+        """Returns the number of entries evicted to make room."""
+        size: int = len(entry[0])
+        if size > self.max_bytes:
+            return 0
+        evicted: int = 0
+        with self.lock:
+            old: Optional[tuple[bytes, str]] = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self.entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (content, _) = self.entries.popitem(last=False)
+                self.size -= len(content)
+                evicted += 1
+        return evicted
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class ResponseCache:
+    """The process-wide cache of rendered bodies (see the module docs)."""
+    STATS: tuple[str, ...] = ("local_hits", "shared_hits", "misses",
+                              "evictions", "bypasses", "bumps")
+
+    def __init__(self):
+        self.local: Optional[LocalTier] = None
+        self.counts: dict[str, int] = dict.fromkeys(self.STATS, 0)
+        self.lock = threading.Lock()
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+    def get_local(self) -> LocalTier:
+        # Built on first use, once the settings are loaded.
+        if self.local is None:
+            self.local = LocalTier(getattr(
+                settings, "RESPONSE_CACHE_LOCAL_MAX_BYTES", 32 * 1024 * 1024
+            ))
+        return self.local
+
+    def count(self, stat: str, increment: int = 1):
+        with self.lock:
+            self.counts[stat] += increment
+
+    @staticmethod
+    def version_key(kind: str, pk) -> str:
+        """
+        kind is "project", "contributors", "issues" (pk of the project) or
+        "comments" (pk of the issue).
+        """
+        return f"response-version:{kind}:{int(pk)}"
+
+    def version(self, kind: str, pk) -> int:
+        key: str = self.version_key(kind, pk)
+        version: Optional[int] = self.shared.get(key)
+        if version is None:
+            # add() keeps the counter of a concurrent request, if any.
+            self.shared.add(key, time.time_ns(), timeout=None)
+            version = self.shared.get(key, time.time_ns())
+        return version
+
+    def bump(self, kind: str, pk):
+        """
+        Moves the resource to a new version. Within a transaction, done
+        again once it commits: a concurrent request could otherwise cache
+        the old state of the rows under the new version.
+        """
+        key: str = self.version_key(kind, pk)
+        self._bump(key)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._bump(key))
+
+    def _bump(self, key: str):
+        self.count("bumps")
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            # No counter yet, or evicted.
+            self.shared.set(key, time.time_ns(), timeout=None)
+
+    def get(self, key: str) -> Optional[tuple[bytes, str]]:
+        entry: Optional[tuple[bytes, str]] = self.get_local().get(key)
+        if entry is not None:
+            self.count("local_hits")
+            return entry
+        entry = self.shared.get(key)
+        if entry is not None:
+            self.count("shared_hits")
+            self.count("evictions", self.get_local().set(key, entry))
+            return entry
+        self.count("misses")
+        return None
+
+    def set(self, key: str, entry: tuple[bytes, str]):
+        self.shared.set(key, entry)
+        self.count("evictions", self.get_local().set(key, entry))
+
+    def snapshot(self) -> dict:
+        local: LocalTier = self.get_local()
+        with self.lock:
+            counts: dict[str, int] = dict(self.counts)
+        lookups: int = counts["local_hits"] + counts["shared_hits"] \
+            + counts["misses"]
+        return {
+            **counts,
+            "hit_rate": round((lookups - counts["misses"]) / lookups, 3)
+            if lookups else None,
+            "local_entries": len(local.entries),
+            "local_bytes": local.size,
+            "local_max_bytes": local.max_bytes,
+        }
+
+    def reset(self):
+        """Drops the local tier and the stats, e.g. between benchmarks."""
+        self.get_local().clear()
+        with self.lock:
+            self.counts = dict.fromkeys(self.STATS, 0)
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(request, view, kind: str, pk,
+                    build: Callable[[], Response]) -> HttpResponseBase:
+    """
+    The body cached for the current version of the resource, or the one
+    build returns, rendered and cached. Only JSON bodies are cached: the
+    other renderers (e.g. the browsable API) depend on the user. The
+    rendering of a miss counts as the request's serialization time; a hit
+    renders nothing.
+    """
+    if getattr(request, "accepted_renderer", None) is None \
+            or request.accepted_renderer.format != "json":
+        response_cache.count("bypasses")
+        return build()
+    version: int = response_cache.version(kind, pk)
+    digest = hashlib.blake2b(digest_size=16)
+    # The host is part of the links to the next page.
+    digest.update(f"{request.build_absolute_uri()}\0"
+                  f"{request.accepted_media_type}".encode())
+    key: str = f"response:{kind}:{int(pk)}:{version}:{digest.hexdigest()}"
+
+    entry: Optional[tuple[bytes, str]] = response_cache.get(key)
+    if entry is None:
+        response: Response = build()
+        if response.status_code != 200:
+            return response
+        with measuring_serialization(request):
+            content: bytes = request.accepted_renderer.render(
+                response.data, request.accepted_media_type,
+                view.get_renderer_context()
+            )
+        entry = (content, request.accepted_media_type)
+        response_cache.set(key, entry)
+    content, content_type = entry
+    return HttpResponse(content, content_type=content_type)
+
+
+def project_saved(sender, instance: Project, created: bool,
+                  raw: bool = False, **kwargs):
+    if not created and not raw:
+        response_cache.bump("project", instance.id)
+
+
+def project_deleted(sender, instance: Project, **kwargs):
+    # The bodies of its issues' comments are unreachable: the comments
+    # endpoint answers 404 before reading the cache.
+    for kind in ("project", "contributors", "issues"):
+        response_cache.bump(kind, instance.id)
+
+
+def contributor_changed(sender, instance: Contributor, **kwargs):
+    if not being_deleted(Project, instance.project_id_id):
+        response_cache.bump("contributors", instance.project_id_id)
+
+
+def issue_initialized(sender, instance: Issue, **kwargs):
+    # The project the issue is stored in, to tell when it moves.
+    instance._cached_project_id = instance.__dict__.get("project_id_id")
+
+
+def issue_saved(sender, instance: Issue, **kwargs):
+    old_project_id: Optional[int] = instance._cached_project_id
+    if old_project_id is not None \
+            and old_project_id != instance.project_id_id:
+        response_cache.bump("issues", old_project_id)
+    instance._cached_project_id = instance.project_id_id
+    response_cache.bump("issues", instance.project_id_id)
+
+
+def issue_deleted(sender, instance: Issue, **kwargs):
+    if not being_deleted(Project, instance.project_id_id):
+        response_cache.bump("issues", instance.project_id_id)
+
+
+def comment_initialized(sender, instance: Comment, **kwargs):
+    # The issue the comment is stored under, to tell when it moves.
+    instance._cached_issue_id = instance.__dict__.get("issue_id_id")
+
+
+def comment_saved(sender, instance: Comment, **kwargs):
+    old_issue_id: Optional[int] = instance._cached_issue_id
+    if old_issue_id is not None and old_issue_id != instance.issue_id_id:
+        response_cache.bump("comments", old_issue_id)
+    instance._cached_issue_id = instance.issue_id_id
+    response_cache.bump("comments", instance.issue_id_id)
+
+
+def comment_deleted(sender, instance: Comment, **kwargs):
+    if not being_deleted(Issue, instance.issue_id_id):
+        response_cache.bump("comments", instance.issue_id_id)
+
+
+post_save.connect(project_saved, sender=Project)
+post_delete.connect(project_deleted, sender=Project)
+post_save.connect(contributor_changed, sender=Contributor)
+post_delete.connect(contributor_changed, sender=Contributor)
+post_init.connect(issue_initialized, sender=Issue)
+post_save.connect(issue_saved, sender=Issue)
+post_delete.connect(issue_deleted, sender=Issue)
+post_init.connect(comment_initialized, sender=Comment)
+post_save.connect(comment_saved, sender=Comment)
+post_delete.connect(comment_deleted, sender=Comment)
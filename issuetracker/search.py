@@ -0,0 +1,385 @@
+"""
+Full-text search over issue titles and descriptions and comment
+descriptions. The words are indexed by the DB itself: an FTS5 table per
+model on SQLite, a table of tsvector documents with a GIN index per model
+on PostgreSQL. Both backends have the same interface and rank matches
+with a higher score for better ones, with the issue title weighing more
+than the descriptions. Other databases have no backend: a system check
+warns at startup and the search endpoint answers 501.
+
+The index is kept up to date by the save and delete signals of Issue and
+Comment. Writes that don't send signals (bulk_create, QuerySet.update())
+must call index_issues themselves. reindex_search rebuilds the whole index
+in place.
+The rows deleted along with their issue or project are removed from the
+index together, once the parent is deleted, rather than one by one.
+Searches join the indexed rows back to their issue, so results are always
+scoped to the current project of the issue.
+"""
+
+import re
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from django.core import checks
+from django.core.signals import request_finished
+from django.db import connections, router
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models.signals import post_delete, post_save
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .cascades import being_deleted
+from .models import Project, Issue, Comment
+
+TYPES: tuple[str, ...] = ("issue", "comment")
+
+# (type, id) of the deleted rows waiting for their parent's deletion to be
+# removed from the index. Cleared at the end of each request as well, in
+# case a deletion failed midway.
+pending_removals: ContextVar[frozenset[tuple[str, int]]] = \
+    ContextVar("pending_removals", default=frozenset())
+
+
+class SearchBackend:
+    """
+    rows passed to index_issues are (id, title, description) tuples and
+    those passed to index_comments (id, description) tuples.
+    """
+    def __init__(self, connection: BaseDatabaseWrapper):
+        self.connection = connection
+
+    def index_issues(self, rows: Iterable[tuple[int, str, str]]):
+        raise NotImplementedError
+
+    def index_comments(self, rows: Iterable[tuple[int, str]]):
+        raise NotImplementedError
+
+    def remove(self, type_: str, ids: Iterable[int]):
+        raise NotImplementedError
+
+    def prune(self):
+        """Removes the rows whose issue or comment no longer exists."""
+        raise NotImplementedError
+
+    def search(self, query: str, user_id: int, types: Iterable[str],
+               limit: int) -> list[dict]:
+        """
+        Returns the best matches among the issues and comments of the
+        projects the user contributes to, best first.
+        """
+        raise NotImplementedError
+
+    def execute(self, sql: str, params: Iterable = ()) -> list[dict]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            if cursor.description is None:
+                return []
+            columns: list[str] = [column[0]
+                                  for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def terms(query: str) -> list[str]:
+        """The words of the query. Every one of them must match."""
+        return re.findall(r"\w+", query)[:32]
+
+
+# Restricts the results to the projects the user contributes to.
+MEMBER_PROJECTS = """
+    SELECT project_id_id FROM issuetracker_contributor WHERE user_id_id = %s
+"""
+
+
+class SQLiteBackend(SearchBackend):
+    """
+    FTS5 tables whose rowid is the id of the indexed row. Indexing a row
+    again replaces it (INSERT OR REPLACE).
+    """
+    TABLES: dict[str, str] = {"issue": "issuetracker_issue_fts",
+                              "comment": "issuetracker_comment_fts"}
+    # Ids removed per DELETE. Keeps the parameters under SQLite's limit.
+    REMOVE_BATCH_SIZE: int = 500
+    SELECTS: dict[str, str] = {
+        "issue": """
+            SELECT 'issue' AS type, issue.id AS id,
+                   issue.project_id_id AS project_id, issue.id AS issue_id,
+                   issue.title AS title,
+                   snippet(issuetracker_issue_fts, -1, '[', ']', '…', 12)
+                       AS snippet,
+                   -bm25(issuetracker_issue_fts, 5.0, 1.0) AS score
+            FROM issuetracker_issue_fts
+            JOIN issuetracker_issue issue
+                ON issue.id = issuetracker_issue_fts.rowid
+            WHERE issuetracker_issue_fts MATCH %s
+                AND issue.project_id_id IN ({members})
+        """,
+        "comment": """
+            SELECT 'comment' AS type, comment.id AS id,
+                   issue.project_id_id AS project_id, issue.id AS issue_id,
+                   issue.title AS title,
+                   snippet(issuetracker_comment_fts, 0, '[', ']', '…', 12)
+                       AS snippet,
+                   -bm25(issuetracker_comment_fts) AS score
+            FROM issuetracker_comment_fts
+            JOIN issuetracker_comment comment
+                ON comment.id = issuetracker_comment_fts.rowid
+            JOIN issuetracker_issue issue ON issue.id = comment.issue_id_id
+            WHERE issuetracker_comment_fts MATCH %s
+                AND issue.project_id_id IN ({members})
+        """,
+    }
+
+    def index_issues(self, rows: Iterable[tuple[int, str, str]]):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO issuetracker_issue_fts (rowid, "
+                "title, description) VALUES (%s, %s, %s)", list(rows)
+            )
+
+    def index_comments(self, rows: Iterable[tuple[int, str]]):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO issuetracker_comment_fts (rowid, "
+                "description) VALUES (%s, %s)", list(rows)
+            )
+
+    def remove(self, type_: str, ids: Iterable[int]):
+        ids = list(ids)
+        for start in range(0, len(ids), self.REMOVE_BATCH_SIZE):
+            batch: list[int] = ids[start:start + self.REMOVE_BATCH_SIZE]
+            self.execute(
+                f"DELETE FROM {self.TABLES[type_]} WHERE rowid IN "
+                f"({', '.join(['%s'] * len(batch))})", batch
+            )
+
+    def prune(self):
+        for type_, model in (("issue", Issue), ("comment", Comment)):
+            self.execute(
+                f"DELETE FROM {self.TABLES[type_]} WHERE rowid NOT IN "
+                f"(SELECT id FROM {model._meta.db_table})"
+            )
+
+    def search(self, query: str, user_id: int, types: Iterable[str],
+               limit: int) -> list[dict]:
+        terms: list[str] = self.terms(query)
+        if not terms:
+            return []
+        # Each term is quoted, so that FTS5 operators typed by the user
+        # are searched as plain words.
+        match: str = " ".join(f'"{term}"' for term in terms)
+        selects: list[str] = []
+        params: list = []
+        for type_ in types:
+            selects.append(
+                self.SELECTS[type_].format(members=MEMBER_PROJECTS)
+            )
+            params.extend([match, user_id])
+        sql: str = " UNION ALL ".join(selects) \
+            + " ORDER BY score DESC LIMIT %s"
+        return self.execute(sql, [*params, limit])
+
+
+class PostgreSQLBackend(SearchBackend):
+    """
+    One row per indexed row, holding its tsvector document, in a table
+    with a GIN index. The title has weight A and the descriptions B.
+    """
+    TABLES: dict[str, tuple[str, str]] = {
+        "issue": ("issuetracker_issue_search", "issue_id"),
+        "comment": ("issuetracker_comment_search", "comment_id"),
+    }
+    # Snippets mark the matches like FTS5's snippet() does.
+    HEADLINE_OPTIONS = "'StartSel=[, StopSel=], MinWords=5, MaxWords=12'"
+    SELECTS: dict[str, str] = {
+        "issue": """
+            SELECT 'issue' AS type, issue.id AS id,
+                   issue.project_id_id AS project_id, issue.id AS issue_id,
+                   issue.title AS title,
+                   ts_headline('english',
+                               issue.title || ' ' || issue.description,
+                               query, {headline})
+                       AS snippet,
+                   ts_rank(search.document, query) AS score
+            FROM issuetracker_issue_search search
+            JOIN issuetracker_issue issue ON issue.id = search.issue_id,
+                plainto_tsquery('english', %s) query
+            WHERE search.document @@ query
+                AND issue.project_id_id IN ({members})
+        """,
+        "comment": """
+            SELECT 'comment' AS type, comment.id AS id,
+                   issue.project_id_id AS project_id, issue.id AS issue_id,
+                   issue.title AS title,
+                   ts_headline('english', comment.description, query,
+                               {headline})
+                       AS snippet,
+                   ts_rank(search.document, query) AS score
+            FROM issuetracker_comment_search search
+            JOIN issuetracker_comment comment
+                ON comment.id = search.comment_id
+            JOIN issuetracker_issue issue ON issue.id = comment.issue_id_id,
+                plainto_tsquery('english', %s) query
+            WHERE search.document @@ query
+                AND issue.project_id_id IN ({members})
+        """,
+    }
+
+    def index_issues(self, rows: Iterable[tuple[int, str, str]]):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO issuetracker_issue_search (issue_id, document) "
+                "VALUES (%s, setweight(to_tsvector('english', %s), 'A') "
+                "|| setweight(to_tsvector('english', %s), 'B')) "
+                "ON CONFLICT (issue_id) DO UPDATE "
+                "SET document = EXCLUDED.document",
+                list(rows)
+            )
+
+    def index_comments(self, rows: Iterable[tuple[int, str]]):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO issuetracker_comment_search "
+                "(comment_id, document) "
+                "VALUES (%s, setweight(to_tsvector('english', %s), 'B')) "
+                "ON CONFLICT (comment_id) DO UPDATE "
+                "SET document = EXCLUDED.document",
+                list(rows)
+            )
+
+    def remove(self, type_: str, ids: Iterable[int]):
+        table, column = self.TABLES[type_]
+        self.execute(f"DELETE FROM {table} WHERE {column} = ANY(%s)",
+                     [list(ids)])
+
+    def prune(self):
+        # The foreign keys delete the rows along with their issue or
+        # comment (ON DELETE CASCADE).
+        pass
+
+    def search(self, query: str, user_id: int, types: Iterable[str],
+               limit: int) -> list[dict]:
+        terms: list[str] = self.terms(query)
+        if not terms:
+            return []
+        selects: list[str] = []
+        params: list = []
+        for type_ in types:
+            selects.append(self.SELECTS[type_].format(
+                members=MEMBER_PROJECTS, headline=self.HEADLINE_OPTIONS
+            ))
+            params.extend([" ".join(terms), user_id])
+        sql: str = " UNION ALL ".join(selects) \
+            + " ORDER BY score DESC LIMIT %s"
+        return self.execute(sql, [*params, limit])
+
+
+BACKENDS: dict[str, type[SearchBackend]] = {
+    "sqlite": SQLiteBackend,
+    "postgresql": PostgreSQLBackend,
+}
+
+
+def get_backend(model: type = Issue) -> Optional[SearchBackend]:
+    """None when the DB has no supported full-text search."""
+    connection = connections[router.db_for_write(model)]
+    backend_class: Optional[type[SearchBackend]] = BACKENDS.get(
+        connection.vendor
+    )
+    return backend_class(connection) if backend_class else None
+
+
+class SearchUnavailable(APIException):
+    status_code: int = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail: str = "Search isn't supported by this database."
+    default_code: str = "search_unavailable"
+
+
+def check_backend(app_configs=None, **kwargs) -> list[checks.CheckMessage]:
+    """
+    System check telling at startup, rather than on the first search, that
+    the DB of the issues has no supported full-text search.
+    """
+    connection = connections[router.db_for_write(Issue)]
+    if connection.vendor in BACKENDS:
+        return []
+    return [checks.Warning(
+        f"Full-text search isn't supported on {connection.vendor}: the "
+        f"search endpoint answers 501 and nothing is indexed.",
+        hint=f"Store the issues on one of: {', '.join(BACKENDS)}.",
+        id="issuetracker.W001",
+    )]
+
+
+def index_issues(issues: Iterable[Issue]):
+    backend: Optional[SearchBackend] = get_backend(Issue)
+    if backend is not None:
+        backend.index_issues((issue.id, issue.title, issue.description)
+                             for issue in issues)
+
+
+def issue_saved(sender, instance: Issue, raw: bool = False,
+                update_fields=None, **kwargs):
+    if raw or (update_fields is not None
+               and not {"title", "description"} & set(update_fields)):
+        return
+    index_issues([instance])
+
+
+def comment_saved(sender, instance: Comment, raw: bool = False,
+                  update_fields=None, **kwargs):
+    if raw or (update_fields is not None
+               and "description" not in update_fields):
+        return
+    backend: Optional[SearchBackend] = get_backend(Comment)
+    if backend is not None:
+        backend.index_comments([(instance.id, instance.description)])
+
+
+def defer_removal(type_: str, id_: int):
+    pending_removals.set(pending_removals.get() | {(type_, id_)})
+
+
+def remove_pending():
+    """Removes the pending rows from the index, with one query per type."""
+    pending: frozenset[tuple[str, int]] = pending_removals.get()
+    pending_removals.set(frozenset())
+    backend: Optional[SearchBackend] = get_backend(Issue)
+    if backend is None:
+        return
+    for type_ in TYPES:
+        ids: list[int] = sorted(id_ for kind, id_ in pending
+                                if kind == type_)
+        if ids:
+            backend.remove(type_, ids)
+
+
+def issue_deleted(sender, instance: Issue, **kwargs):
+    # The collector sends post_delete to the children before their parent:
+    # the rows of a project being deleted are removed once it's gone.
+    defer_removal("issue", instance.id)
+    if not being_deleted(Project, instance.project_id_id):
+        remove_pending()
+
+
+def comment_deleted(sender, instance: Comment, **kwargs):
+    defer_removal("comment", instance.id)
+    if not being_deleted(Issue, instance.issue_id_id):
+        remove_pending()
+
+
+def project_deleted(sender, instance: Project, **kwargs):
+    remove_pending()
+
+
+def request_done(**kwargs):
+    pending_removals.set(frozenset())
+
+
+post_save.connect(issue_saved, sender=Issue)
+post_save.connect(comment_saved, sender=Comment)
+post_delete.connect(issue_deleted, sender=Issue)
+post_delete.connect(comment_deleted, sender=Comment)
+post_delete.connect(project_deleted, sender=Project)
+request_finished.connect(request_done)
+checks.register(check_backend)
@@ -4,12 +4,21 @@ from the DB in order to send it through the internet. The second is to
 deserialize JSON data received from the user.
 """
 
+import functools
+from typing import Callable, Iterable, Optional
 
+from django.conf import settings
 from django.contrib.auth import password_validation
 from django.contrib.auth.models import User
-from django.db.models import Model
-from rest_framework import serializers
+from django.db.models import Model, QuerySet, Subquery
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from .denylist import token_denylist
 from .models import Project, Issue, Comment, Contributor
 
 
@@ -41,6 +50,39 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return value
 
 
+class UsernameListSerializer(serializers.Serializer):
+    """Payload of the bulk contributor endpoints."""
+    usernames: list[str] = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        allow_empty=False,
+        max_length=1000
+    )
+
+
+class LogoutSerializer(serializers.Serializer):
+    """
+    The access token used to log out is always revoked. The refresh token
+    is optional: when given, it is revoked as well.
+    """
+    refresh: str = serializers.CharField(required=False)
+
+    @staticmethod
+    def validate_refresh(value) -> RefreshToken:
+        try:
+            return RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(str(error))
+
+
+class DenylistTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses to refresh a revoked refresh token (see denylist.py)."""
+    def validate(self, attrs) -> dict[str, str]:
+        refresh = RefreshToken(attrs["refresh"])
+        if token_denylist.is_revoked(refresh["jti"], refresh["exp"]):
+            raise InvalidToken("Token has been revoked")
+        return super().validate(attrs)
+
+
 class EmptySerializer(serializers.Serializer):
     """
     Used in views.AuthViewSet. The view inherits GenericViewSet, a class that
@@ -81,6 +123,23 @@ class IssueSerializer(serializers.ModelSerializer):
         ]
 
 
+class BulkIssueSerializer(IssueSerializer):
+    """
+    Validates the items of a bulk issue creation (see
+    IssueViewSet.bulk_create). The project and author are the same for
+    every item and the assignees are resolved by the view in one query.
+    Thus, the related fields are read-only here. Otherwise, validating them
+    would cost one query per item and per field. The assignee is given by
+    username, which is only checked to be a string here.
+    """
+    assignee_username = serializers.CharField(max_length=150, required=False,
+                                              write_only=True)
+
+    class Meta(IssueSerializer.Meta):
+        fields = IssueSerializer.Meta.fields + ["assignee_username"]
+        read_only_fields = ["project_id", "author_user_id", "assignee_user_id"]
+
+
 class CommentSerializer(serializers.ModelSerializer):
     """
     The only field that doesn't need JSON serialization is created_time
@@ -89,3 +148,204 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ["description", "author_user_id", "issue_id"]
+
+
+class FastReadSerializer:
+    """
+    Read-only counterpart of a ModelSerializer for list responses.
+    ModelSerializer builds model instances and walks its fields for every
+    row. This class reads plain .values() rows instead and turns them into
+    the same representation with a field map compiled once. The JSON
+    rendered from both is identical.
+    Fields whose DB value already is their JSON representation (strings,
+    integers, related pks) are copied as is. So are the datetimes the JSON
+    renderers encode to the same string as the DRF field (see
+    native_datetime). The others go through the to_representation of the
+    original DRF field.
+    """
+    # Representations equal to the value read by .values().
+    PASSTHROUGH_FIELDS = (serializers.CharField,
+                          serializers.ChoiceField,
+                          serializers.IntegerField,
+                          serializers.PrimaryKeyRelatedField)
+
+    def __init__(self, serializer_class: type[serializers.ModelSerializer],
+                 fields: Optional[Iterable[str]] = None):
+        """fields restricts the representation to these fields."""
+        self.model: type[Model] = serializer_class.Meta.model
+        self.field_map: list[tuple[str, str, Optional[Callable]]] = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (fields is not None
+                                    and name not in fields):
+                continue
+            convert: Optional[Callable] = None
+            if not isinstance(field, self.PASSTHROUGH_FIELDS) \
+                    and not self.native_datetime(field):
+                convert = field.to_representation
+            self.field_map.append((name, field.source, convert))
+        self.sources: tuple[str, ...] = tuple(
+            source for _, source, _ in self.field_map
+        )
+
+    @staticmethod
+    def native_datetime(field: serializers.Field) -> bool:
+        """
+        True for a DateTimeField written in ISO 8601 in UTC, the way the
+        JSON renderers write a datetime (e.g. created_time). The datetime
+        read from the DB is then left as is, for the renderer to encode.
+        """
+        if not isinstance(field, serializers.DateTimeField):
+            return False
+        output_format = getattr(field, "format", empty)
+        if output_format is empty:
+            output_format = api_settings.DATETIME_FORMAT
+        return output_format == ISO_8601 and settings.USE_TZ \
+            and settings.TIME_ZONE == "UTC" \
+            and getattr(field, "timezone", None) is None
+
+    def project(self, queryset: QuerySet,
+                extra: Iterable[str] = ()) -> QuerySet:
+        """
+        Restricts the queryset to the columns needed by the representation,
+        plus the extra ones (e.g. the ordering used by the pagination).
+        """
+        extra = [name.lstrip("-") for name in extra
+                 if name.lstrip("-") not in self.sources]
+        return queryset.values(*self.sources, *extra)
+
+    def to_representation(self, row: dict) -> dict:
+        return {
+            name: row[source] if convert is None or row[source] is None
+            else convert(row[source])
+            for name, source, convert in self.field_map
+        }
+
+    def serialize(self, rows: Iterable[dict]) -> list[dict]:
+        return [self.to_representation(row) for row in rows]
+
+
+@functools.lru_cache(maxsize=None)
+def fast_serializer_for(serializer_class: type[serializers.ModelSerializer],
+                        fields: Optional[frozenset[str]] = None) \
+        -> FastReadSerializer:
+    """
+    Compiles the field map of a serializer class, or of a subset of its
+    fields, once per process.
+    """
+    return FastReadSerializer(serializer_class, fields)
+
+
+def readable_fields(serializer_class: type[serializers.ModelSerializer]) \
+        -> list[str]:
+    return [name for name, field in serializer_class().fields.items()
+            if not field.write_only]
+
+
+class IssueListQuerySerializer(serializers.Serializer):
+    """
+    Validates the query parameters of the issue list (IssueViewSet.get):
+    filters, ordering and sparse fieldset, e.g.
+    ?status=to-do&status=in progress&assignee=bob&ordering=-created_time
+    &fields=title,status
+    Each filter compiles to a condition served by an index of Issue.
+    """
+    ORDERINGS: list[str] = ["created_time", "-created_time",
+                            "title", "-title"]
+
+    status: list[str] = serializers.ListField(
+        child=serializers.ChoiceField(choices=Issue.STATUS_CHOICES),
+        required=False
+    )
+    priority: list[str] = serializers.ListField(
+        child=serializers.ChoiceField(choices=Issue.PRIORITY_CHOICES),
+        required=False
+    )
+    tag: list[str] = serializers.ListField(
+        child=serializers.ChoiceField(choices=Issue.TAG_CHOICES),
+        required=False
+    )
+    # Username of the assignee.
+    assignee: str = serializers.CharField(max_length=150, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    ordering: str = serializers.ChoiceField(choices=ORDERINGS,
+                                            default="created_time")
+    # Comma-separated names of the fields to return.
+    fields: str = serializers.CharField(required=False)
+
+    def validate_fields(self, value: str) -> frozenset[str]:
+        names: set[str] = {name.strip() for name in value.split(",")
+                           if name.strip()}
+        unknown: set[str] = names - set(readable_fields(IssueSerializer))
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(sorted(unknown))}."
+            )
+        return frozenset(names)
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        """Applies the validated filters to the queryset."""
+        data: dict = self.validated_data
+        for name in ("status", "priority", "tag"):
+            if data.get(name):
+                queryset = queryset.filter(**{f"{name}__in": data[name]})
+        if "assignee" in data:
+            # A single-row subquery, compared with =, so that the
+            # (project_id, assignee_user_id, created_time) index is used.
+            queryset = queryset.filter(
+                assignee_user_id=Subquery(User.objects.filter(
+                    username=data["assignee"]
+                ).values("id"))
+            )
+        if "created_after" in data:
+            queryset = queryset.filter(
+                created_time__gte=data["created_after"]
+            )
+        if "created_before" in data:
+            queryset = queryset.filter(
+                created_time__lt=data["created_before"]
+            )
+        return queryset
+
+    def issues(self, project_id: int) -> QuerySet:
+        """The project's issues matching the validated filters."""
+        return self.filter_queryset(
+            Issue.objects.filter(project_id=project_id)
+        )
+
+    def fast_serializer(self) -> FastReadSerializer:
+        """Serializes the fields asked for, or all of them."""
+        return fast_serializer_for(IssueSerializer,
+                                   self.validated_data.get("fields"))
+
+    def view_ordering(self) -> tuple[str, ...]:
+        """
+        The ordering asked for, to set on the view: the pagination reads it
+        from there and appends the pk (see KeysetPagination.get_ordering).
+        """
+        return (self.validated_data["ordering"],)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the search endpoint, e.g. ?q=login crash."""
+    q: str = serializers.CharField(max_length=256)
+    # Restricts the results to issues or to comments.
+    type: str = serializers.ChoiceField(choices=["issue", "comment"],
+                                        required=False)
+    limit: int = serializers.IntegerField(min_value=1, max_value=100,
+                                          default=20)
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """Query parameters of the changes feed, e.g. ?since=1042."""
+    # sync_token of the previous response. 0 syncs from scratch.
+    since: int = serializers.IntegerField(min_value=0, default=0)
+    limit: int = serializers.IntegerField(min_value=1, max_value=1000,
+                                          default=500)
+
+
+class SnapshotQuerySerializer(serializers.Serializer):
+    """Query parameters of the project snapshot, e.g. ?comments=5."""
+    # Latest comments returned per issue.
+    comments: int = serializers.IntegerField(min_value=0, max_value=20,
+                                             default=3)
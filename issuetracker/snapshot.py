@@ -0,0 +1,104 @@
+"""
+Whole-project snapshot for boards: the project, its contributors, its
+issues and the latest comments of each issue, in one response. It replaces
+the 1 + N + N x M calls of reading the project, its issue list, then the
+comments of each issue, and it reads the same data with a fixed number of
+queries whatever the number of issues: one per level, plus one for the
+comments of every issue at once.
+
+Django 4.0 can neither slice a Prefetch queryset nor filter on a window
+function, so the latest comments per issue are picked by a ROW_NUMBER()
+subquery in raw SQL. Rows are read with .values() and grouped by their
+parent here, like prefetch_related would, without building model
+instances (see FastReadSerializer).
+"""
+
+from typing import Optional
+
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+from .models import Project, Contributor, Issue, Comment
+from .serializers import ContributorSerializer, IssueSerializer, \
+    CommentSerializer, ProjectSerializer, FastReadSerializer, \
+    fast_serializer_for
+
+# Ids of the latest comments of each issue of a project, at most %s per
+# issue. Served by the (issue_id, created_time) index of Comment.
+LATEST_COMMENTS = """
+    SELECT id FROM (
+        SELECT comment.id AS id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY comment.issue_id_id
+                   ORDER BY comment.created_time DESC, comment.id DESC
+               ) AS position
+        FROM issuetracker_comment comment
+        JOIN issuetracker_issue issue ON issue.id = comment.issue_id_id
+        WHERE issue.project_id_id = %s
+    ) ranked
+    WHERE position <= %s
+"""
+
+
+def project_snapshot(pk: int, comments_per_issue: int) -> Optional[dict]:
+    """
+    None when there's no such project. Issues come in created_time order
+    and their comments newest first.
+    """
+    project_serializer: FastReadSerializer = fast_serializer_for(
+        ProjectSerializer
+    )
+    project: Optional[dict] = project_serializer.project(
+        Project.objects.filter(id=pk), ["id"]
+    ).first()
+    if project is None:
+        return None
+
+    contributor_serializer: FastReadSerializer = fast_serializer_for(
+        ContributorSerializer
+    )
+    contributors: QuerySet = contributor_serializer.project(
+        Contributor.objects.filter(project_id=pk).order_by("id")
+    )
+
+    issue_serializer: FastReadSerializer = fast_serializer_for(
+        IssueSerializer
+    )
+    issues: list[dict] = []
+    comments_of: dict[int, list[dict]] = {}
+    for row in issue_serializer.project(
+        Issue.objects.filter(project_id=pk).order_by("created_time", "id"),
+        ["id"]
+    ):
+        comments_of[row["id"]] = []
+        issues.append({"id": row["id"],
+                       **issue_serializer.to_representation(row),
+                       "comments": comments_of[row["id"]]})
+
+    if comments_per_issue and issues:
+        comment_serializer: FastReadSerializer = fast_serializer_for(
+            CommentSerializer
+        )
+        comments: QuerySet = comment_serializer.project(
+            Comment.objects.filter(
+                id__in=RawSQL(LATEST_COMMENTS, [pk, comments_per_issue])
+            ).order_by("-created_time", "-id"),
+            ["id"]
+        )
+        for row in comments:
+            # None for an issue created after the issues were read.
+            issue_comments: Optional[list[dict]] = comments_of.get(
+                row["issue_id"]
+            )
+            if issue_comments is not None:
+                issue_comments.append({
+                    "id": row["id"],
+                    **comment_serializer.to_representation(row)
+                })
+
+    return {
+        "project": {"id": project["id"],
+                    **project_serializer.to_representation(project)},
+        "contributors": contributor_serializer.serialize(contributors),
+        "issues": issues,
+    }
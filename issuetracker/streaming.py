@@ -0,0 +1,119 @@
+"""
+Streaming of whole collections. The list endpoints normally return one
+page at a time. Tools exporting a whole project can instead pass ?stream=1
+(JSON array) or send "Accept: application/x-ndjson" (one JSON object per
+line). The rows are then read from the DB in chunks with .iterator() and
+serialized one at a time while the response is being sent, so the memory
+used doesn't grow with the number of rows.
+
+Exports are large and compress well. When the client accepts gzip, the
+stream is compressed on the fly. Rows are gathered into chunks of about
+STREAM_BUFFER_SIZE bytes first: sending each row on its own would cost a
+write to the socket, and a compressor call, per row.
+"""
+
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from rest_framework.serializers import ModelSerializer
+
+from .renderers import NDJSONRenderer, dumps
+from .serializers import FastReadSerializer, fast_serializer_for
+
+STREAM_QUERY_PARAM = "stream"
+
+# Bytes of rows sent at once.
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def wants_stream(request) -> bool:
+    """True when the client opted in to a streamed response."""
+    if getattr(request, "accepted_media_type", None) \
+            == NDJSONRenderer.media_type:
+        return True
+    return request.query_params.get(STREAM_QUERY_PARAM) in ("1", "true")
+
+
+def stream_queryset(request, queryset: QuerySet,
+                    serializer_class: type[ModelSerializer],
+                    fields: Optional[frozenset[str]] = None) \
+        -> StreamingHttpResponse:
+    """
+    Returns a response that serializes the queryset row by row. The JSON
+    written is the same as the one DRF's JSONRenderer would have produced
+    for the whole list. fields restricts the rows to these fields.
+    """
+    ndjson: bool = request.accepted_media_type == NDJSONRenderer.media_type
+    rows: Iterator[bytes] = _serialize_rows(queryset, serializer_class,
+                                            fields)
+    if ndjson:
+        content: Iterator[bytes] = (row + b"\n" for row in rows)
+        content_type: str = NDJSONRenderer.media_type
+    else:
+        content = _json_array(rows)
+        content_type = "application/json"
+    content = _buffered(content, getattr(settings, "STREAM_BUFFER_SIZE",
+                                         STREAM_BUFFER_SIZE))
+    gzipped: bool = content_encoding(request) == "gzip"
+    if gzipped:
+        content = compress_sequence(content)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    # Caches must not serve the gzipped stream to clients that didn't ask
+    # for it, or the other way round.
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def content_encoding(request) -> str:
+    """
+    The content coding of the response to the request: streams are gzipped
+    for the clients accepting it, other responses are sent as they are.
+    """
+    if wants_stream(request) and accepts_gzip(request):
+        return "gzip"
+    return "identity"
+
+
+def accepts_gzip(request) -> bool:
+    return bool(re_accepts_gzip.search(
+        request.META.get("HTTP_ACCEPT_ENCODING", "")
+    ))
+
+
+def _serialize_rows(queryset: QuerySet,
+                    serializer_class: type[ModelSerializer],
+                    fields: Optional[frozenset[str]]) -> Iterator[bytes]:
+    serializer: FastReadSerializer = fast_serializer_for(serializer_class,
+                                                         fields)
+    chunk_size: int = getattr(settings, "STREAM_CHUNK_SIZE", 2000)
+    rows: QuerySet = serializer.project(queryset)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield dumps(serializer.to_representation(row))
+
+
+def _json_array(rows: Iterator[bytes]) -> Iterator[bytes]:
+    yield b"["
+    for index, row in enumerate(rows):
+        yield row if index == 0 else b"," + row
+    yield b"]"
+
+
+def _buffered(chunks: Iterator[bytes], size: int) -> Iterator[bytes]:
+    """Joins the chunks into chunks of at least size bytes, but the last."""
+    buffer: list[bytes] = []
+    buffered: int = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
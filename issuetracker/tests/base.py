@@ -0,0 +1,32 @@
+"""Helpers shared by the test cases of the API."""
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import Client, TestCase, override_settings
+
+from issuetracker.response_cache import response_cache
+from issuetracker.utils import get_tokens_for_user
+
+
+@override_settings(DENYLIST_SYNC_INTERVAL=0)
+class APITestCase(TestCase):
+    """
+    The requests only use the default DB: within the test's transaction,
+    ReplicaRouter keeps their reads on it. The process-wide caches
+    (memberships, token versions, response bodies) outlive the rows rolled
+    back after each test, whose ids are then reused: they're cleared before
+    each test. The token denylist isn't synced from a background thread,
+    whose connection wouldn't see the test's transaction.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for cache in caches.all():
+            cache.clear()
+        response_cache.reset()
+
+    @staticmethod
+    def client_for(user: User) -> Client:
+        """A client sending a fresh access token of the user."""
+        token: str = get_tokens_for_user(user)["acess"]
+        return Client(HTTP_AUTHORIZATION=f"Bearer {token}")
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.test import Client
+
+from issuetracker.utils import get_tokens_for_user
+
+from .base import APITestCase
+
+
+class TokenRevocationTests(APITestCase):
+    """Logging out revokes the tokens it's given, and only those."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", "alice@example.com",
+                                            "alice-password")
+
+    def setUp(self):
+        super().setUp()
+        self.tokens: dict[str, str] = get_tokens_for_user(self.user)
+        self.client = Client(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['acess']}"
+        )
+
+    def test_logout_revokes_the_access_token(self):
+        other: Client = self.client_for(self.user)
+        self.assertEqual(self.client.get("/projects").status_code, 200)
+        response = self.client.post("/logout")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/projects")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Token has been revoked",
+                      response.content.decode())
+        # The other tokens of the user still work.
+        self.assertEqual(other.get("/projects").status_code, 200)
+
+    def test_logout_revokes_the_refresh_token(self):
+        response = self.client.post("/logout",
+                                    {"refresh": self.tokens["refresh"]})
+        self.assertEqual(response.status_code, 200)
+        response = Client().post("/api/token/refresh",
+                                 {"refresh": self.tokens["refresh"]})
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_token_not_revoked(self):
+        self.client.post("/logout")
+        response = Client().post("/api/token/refresh",
+                                 {"refresh": self.tokens["refresh"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.json())
+
+    def test_invalid_refresh_token(self):
+        response = self.client.post("/logout", {"refresh": "not a token"})
+        self.assertEqual(response.status_code, 400)
+        # Nothing was revoked.
+        self.assertEqual(self.client.get("/projects").status_code, 200)
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import Client
+
+from issuetracker.models import Project, Issue, Comment
+
+from .base import APITestCase
+
+
+class ChangesFeedTests(APITestCase):
+    """
+    The changes feed returns what changed since the client's sync token,
+    with the current data of the rows or a tombstone for the deleted ones.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("alice", "alice@example.com",
+                                              "alice-password")
+        cls.outsider = User.objects.create_user("bob", "bob@example.com",
+                                                "bob-password")
+
+    def setUp(self):
+        super().setUp()
+        self.client: Client = self.client_for(self.author)
+        response = self.client.post(
+            "/projects/create",
+            {"title": "project", "description": "description",
+             "type": "back end"},
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.project: Project = Project.objects.get(title="project")
+        self.issue: Issue = Issue.objects.create(
+            title="issue", description="description",
+            project_id=self.project, author_user_id=self.author,
+            assignee_user_id=self.author
+        )
+        self.comment: Comment = Comment.objects.create(
+            description="comment", issue_id=self.issue,
+            author_user_id=self.author
+        )
+
+    def sync(self, since: int = 0, **params) -> dict:
+        response = self.client.get(f"/projects/{self.project.id}/changes",
+                                   {"since": since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync(self):
+        feed: dict = self.sync()
+        self.assertEqual(
+            [(change["type"], change["id"]) for change in feed["changes"]],
+            [("contributor", self.project.contributor_set.get().id),
+             ("issue", self.issue.id), ("comment", self.comment.id)]
+        )
+        self.assertEqual(feed["changes"][1]["data"]["title"], "issue")
+        self.assertFalse(feed["more"])
+        # Nothing changed since.
+        self.assertEqual(self.sync(feed["sync_token"])["changes"], [])
+
+    def test_update(self):
+        token: int = self.sync()["sync_token"]
+        self.issue.title = "renamed"
+        self.issue.save()
+        feed: dict = self.sync(token)
+        self.assertEqual(len(feed["changes"]), 1)
+        change: dict = feed["changes"][0]
+        self.assertEqual((change["type"], change["id"], change["deleted"]),
+                         ("issue", self.issue.id, False))
+        self.assertEqual(change["data"]["title"], "renamed")
+        self.assertGreater(feed["sync_token"], token)
+
+    def test_delete(self):
+        token: int = self.sync()["sync_token"]
+        comment_id: int = self.comment.id
+        self.comment.delete()
+        self.assertEqual(self.sync(token)["changes"], [
+            {"type": "comment", "id": comment_id, "deleted": True,
+             "data": None}
+        ])
+        # A first sync leaves the deleted rows out.
+        self.assertNotIn(("comment", comment_id), [
+            (change["type"], change["id"])
+            for change in self.sync()["changes"]
+        ])
+
+    def test_pages(self):
+        first: dict = self.sync(limit=2)
+        self.assertEqual(len(first["changes"]), 2)
+        self.assertTrue(first["more"])
+        second: dict = self.sync(first["sync_token"], limit=2)
+        self.assertEqual(len(second["changes"]), 1)
+        self.assertFalse(second["more"])
+        self.assertEqual(second["changes"][0]["id"], self.comment.id)
+
+    def test_contributors_only(self):
+        response = self.client_for(self.outsider).get(
+            f"/projects/{self.project.id}/changes"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ChangesFeedFallbackTests(ChangesFeedTests):
+    """The same, recorded without INSERT ... ON CONFLICT (see changes.py)."""
+
+    def setUp(self):
+        patcher = mock.patch("issuetracker.changes.supports_upsert",
+                             return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
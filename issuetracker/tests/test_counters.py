@@ -0,0 +1,96 @@
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from issuetracker.counters import find_mismatches, project_summary
+from issuetracker.models import Project, Issue
+
+
+class IssueCounterTests(TestCase):
+    """
+    The counters stay exact when two requests write the same issue from
+    instances loaded before either write.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", "alice@example.com",
+                                            "alice-password")
+        cls.project = Project.objects.create(
+            title="project", description="description",
+            author_user_id=cls.user
+        )
+        cls.issue = Issue.objects.create(
+            title="issue", description="description", status="to-do",
+            project_id=cls.project, author_user_id=cls.user,
+            assignee_user_id=cls.user
+        )
+
+    def load_twice(self) -> tuple[Issue, Issue]:
+        return (Issue.objects.get(id=self.issue.id),
+                Issue.objects.get(id=self.issue.id))
+
+    def assertStatuses(self, **counts: int):
+        self.assertEqual(find_mismatches(), {})
+        statuses: dict[str, int] = project_summary(self.project.id)["status"]
+        self.assertEqual({status: count for status, count in statuses.items()
+                          if count}, counts)
+
+    def test_interleaved_saves(self):
+        first, second = self.load_twice()
+        first.status = "in progress"
+        first.save()
+        second.status = "completed"
+        second.save()
+        self.assertStatuses(completed=1)
+
+    def test_interleaved_partial_saves(self):
+        first, second = self.load_twice()
+        first.status = "in progress"
+        first.save(update_fields=["status"])
+        second.priority = "high"
+        second.save(update_fields=["priority"])
+        self.assertStatuses(**{"in progress": 1})
+
+    def test_save_then_delete(self):
+        first, _ = self.load_twice()
+        first.status = "in progress"
+        first.save()
+        # As IssueViewSet.destroy does.
+        with transaction.atomic():
+            Issue.objects.select_for_update().get(id=self.issue.id).delete()
+        self.assertStatuses()
+
+    def test_project_deletion_leaves_the_counters_alone(self):
+        for status in ("in progress", "completed"):
+            Issue.objects.create(
+                title="issue", description="description", status=status,
+                project_id=self.project, author_user_id=self.user,
+                assignee_user_id=self.user
+            )
+        with CaptureQueriesContext(connection) as queries:
+            Project.objects.get(id=self.project.id).delete()
+        # Only the cascade deletes them.
+        self.assertEqual(
+            [query["sql"] for query in queries.captured_queries
+             if "issuetracker_issuecounter" in query["sql"]
+             and "issuetracker_issue." not in query["sql"]],
+            [query["sql"] for query in queries.captured_queries
+             if query["sql"].startswith("DELETE FROM "
+                                        '"issuetracker_issuecounter"')]
+        )
+        self.assertEqual(find_mismatches(), {})
+
+    def test_project_moved_meanwhile(self):
+        other: Project = Project.objects.create(
+            title="other", description="description",
+            author_user_id=self.user
+        )
+        first, second = self.load_twice()
+        first.project_id = other
+        first.save()
+        second.status = "completed"
+        second.save()
+        self.assertStatuses(completed=1)
+        self.assertEqual(project_summary(other.id)["total"], 0)
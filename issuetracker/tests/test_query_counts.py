@@ -0,0 +1,28 @@
+from django.test import Client
+
+from issuetracker.query_checks import BUDGETS, build_count_dataset, \
+    endpoint_url, warm_up
+
+from .base import APITestCase
+
+
+class QueryCountTests(APITestCase):
+    """
+    The read endpoints run the same number of queries on a large and on a
+    small project, e.g. no N+1 query pattern.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.large, cls.small = build_count_dataset()
+
+    def test_budgets(self):
+        for name, (url, budget) in BUDGETS.items():
+            for project in (self.large, self.small):
+                with self.subTest(name, project=project.title):
+                    client: Client = self.client_for(project.author_user_id)
+                    project_url: str = endpoint_url(url, project)
+                    warm_up(client, project_url)
+                    with self.assertNumQueries(budget):
+                        response = client.get(project_url)
+                    self.assertEqual(response.status_code, 200)
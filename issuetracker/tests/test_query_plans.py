@@ -0,0 +1,25 @@
+from django.db import connection
+from django.test import TestCase
+
+from issuetracker.benchmarking import build_dataset
+from issuetracker.models import Issue
+from issuetracker.query_checks import hot_queries, uses_indexes
+
+
+class QueryPlanTests(TestCase):
+    """The queries of the hot endpoints are served by indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Enough rows for the planner to prefer the indexes.
+        build_dataset(users=20, projects=5, contributors=5, issues=50)
+
+    def test_hot_queries_use_indexes(self):
+        for name, queryset in hot_queries().items():
+            with self.subTest(name):
+                plan: str = queryset.explain()
+                self.assertTrue(uses_indexes(plan, connection), plan)
+
+    def test_scan_detected(self):
+        plan: str = Issue.objects.filter(description="x").explain()
+        self.assertFalse(uses_indexes(plan, connection), plan)
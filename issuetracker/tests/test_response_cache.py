@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.test import Client
+
+from issuetracker.benchmarking import build_dataset
+from issuetracker.models import Project, Issue, Comment
+from issuetracker.response_cache import response_cache
+
+from .base import APITestCase
+
+
+class ResponseCacheTests(APITestCase):
+    """
+    The cached bodies of the read endpoints are replaced as soon as a
+    write changes what they were read from.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        build_dataset(users=4, projects=2, contributors=2, issues=3,
+                      comments=2)
+        cls.project = Project.objects.order_by("id").first()
+        cls.issue = Issue.objects.filter(project_id=cls.project).first()
+        cls.outsider = User.objects.exclude(
+            contributor__project_id=cls.project
+        ).first()
+
+    def setUp(self):
+        super().setUp()
+        self.client: Client = self.client_for(self.project.author_user_id)
+
+    def counts(self) -> tuple[int, int]:
+        stats: dict = response_cache.snapshot()
+        return stats["local_hits"] + stats["shared_hits"], stats["misses"]
+
+    def issue_titles(self) -> list[str]:
+        response = self.client.get(f"/projects/{self.project.id}/issues")
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()["results"]]
+
+    def test_hit(self):
+        first: list[str] = self.issue_titles()
+        self.assertEqual(self.counts(), (0, 1))
+        self.assertEqual(self.issue_titles(), first)
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_created_issue_listed(self):
+        titles: list[str] = self.issue_titles()
+        response = self.client.post(
+            f"/projects/{self.project.id}/issues",
+            {"title": "new issue", "description": "description",
+             "tag": "task", "priority": "low", "status": "to-do",
+             "assignee_username": self.project.author_user_id.username},
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.issue_titles(), titles + ["new issue"])
+        self.assertEqual(self.counts(), (0, 2))
+
+    def test_updated_comment_listed(self):
+        url: str = f"/projects/issues/{self.issue.id}/comments"
+        self.client.get(url)
+        comment: Comment = Comment.objects.filter(issue_id=self.issue).first()
+        comment.description = "edited"
+        comment.save()
+        response = self.client.get(url)
+        self.assertIn("edited", [row["description"]
+                                 for row in response.json()["results"]])
+        self.assertEqual(self.counts(), (0, 2))
+
+    def test_other_projects_still_cached(self):
+        other: Project = Project.objects.exclude(id=self.project.id).get()
+        client: Client = self.client_for(other.author_user_id)
+        client.get(f"/projects/{other.id}/issues")
+        Issue.objects.create(title="new issue", description="description",
+                             project_id=self.project,
+                             author_user_id=self.project.author_user_id,
+                             assignee_user_id=self.project.author_user_id)
+        client.get(f"/projects/{other.id}/issues")
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_permission_checked_before_cache(self):
+        self.issue_titles()
+        response = self.client_for(self.outsider).get(
+            f"/projects/{self.project.id}/issues"
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.counts(), (0, 1))
@@ -0,0 +1,193 @@
+import re
+import unittest
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from issuetracker.models import Project, Issue, Comment
+from issuetracker.search import PostgreSQLBackend, SearchBackend, \
+    check_backend, get_backend
+
+from .base import APITestCase
+
+
+class SearchTests(APITestCase):
+    """
+    The search endpoint, on the backend of the test DB: the same cases
+    run on SQLite and on PostgreSQL.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice", "alice@example.com",
+                                             "alice-password")
+        cls.bob = User.objects.create_user("bob", "bob@example.com",
+                                           "bob-password")
+        cls.project = cls.create_project("project", cls.alice)
+        other: Project = cls.create_project("other project", cls.bob)
+        cls.issue = cls.create_issue(cls.project, "Login crash",
+                                     "The app closes on the login screen")
+        cls.create_issue(cls.project, "Slow start",
+                         "Also a crash when the network is down")
+        cls.create_issue(other, "Login page", "Bob's project only")
+        cls.comment = Comment.objects.create(
+            description="Reproduced the login crash", issue_id=cls.issue,
+            author_user_id=cls.alice
+        )
+
+    @staticmethod
+    def create_project(title: str, author: User) -> Project:
+        # The author is made its owner by models.model_created.
+        return Project.objects.create(title=title,
+                                      description="description",
+                                      author_user_id=author)
+
+    @staticmethod
+    def create_issue(project: Project, title: str,
+                     description: str) -> Issue:
+        return Issue.objects.create(
+            title=title, description=description, project_id=project,
+            author_user_id=project.author_user_id,
+            assignee_user_id=project.author_user_id
+        )
+
+    def search(self, **params) -> list[tuple[str, int]]:
+        response = self.client_for(self.alice).get("/search", params)
+        self.assertEqual(response.status_code, 200)
+        return [(row["type"], row["id"])
+                for row in response.json()["results"]]
+
+    def test_issues_and_comments(self):
+        self.assertCountEqual(self.search(q="login"), [
+            ("issue", self.issue.id), ("comment", self.comment.id)
+        ])
+
+    def test_type(self):
+        self.assertEqual(self.search(q="login", type="comment"),
+                         [("comment", self.comment.id)])
+
+    def test_every_term_matches(self):
+        self.assertEqual(self.search(q="login screen"),
+                         [("issue", self.issue.id)])
+
+    def test_title_ranks_first(self):
+        self.assertEqual(self.search(q="crash", type="issue")[0],
+                         ("issue", self.issue.id))
+
+    def test_operators_searched_as_words(self):
+        self.assertEqual(self.search(q='login OR "NEAR(*'), [])
+
+    def test_reindexed_on_update(self):
+        self.issue.title = "Sign-in crash"
+        self.issue.description = "Fixed"
+        self.issue.save()
+        self.assertEqual(self.search(q="login", type="issue"), [])
+        self.assertEqual(self.search(q="sign", type="issue"),
+                         [("issue", self.issue.id)])
+
+    def test_removed_on_delete(self):
+        self.comment.delete()
+        self.assertEqual(self.search(q="reproduced"), [])
+
+    def index_deletions(self, delete) -> int:
+        """The DELETE statements run on the index by delete()."""
+        with CaptureQueriesContext(connection) as queries:
+            delete()
+        count: int = 0
+        for query in queries.captured_queries:
+            # executemany() is logged once, as "<n> times: <sql>".
+            times, _, sql = query["sql"].rpartition(" times: ")
+            if re.match(r"DELETE FROM issuetracker_\w+_(fts|search) ", sql):
+                count += int(times or 1)
+        return count
+
+    def add_comments(self):
+        for number in range(5):
+            Comment.objects.create(description=f"Login comment {number}",
+                                   issue_id=self.issue,
+                                   author_user_id=self.alice)
+
+    def test_issue_deletion_removes_its_comments_at_once(self):
+        self.add_comments()
+        self.assertEqual(self.index_deletions(self.issue.delete), 2)
+        self.assertEqual(self.search(q="login"), [])
+
+    def test_project_deletion_removes_its_rows_at_once(self):
+        self.add_comments()
+        self.assertEqual(self.index_deletions(self.project.delete), 2)
+        self.assertEqual(self.search(q="crash"), [])
+
+    def reindex(self):
+        call_command("reindex_search", stdout=StringIO(), stderr=StringIO())
+
+    def test_reindex_replaces_the_rows(self):
+        get_backend().index_issues([(self.issue.id, "Stale", "stale")])
+        self.reindex()
+        self.assertEqual(self.search(q="stale"), [])
+        self.assertIn(("issue", self.issue.id), self.search(q="login"))
+
+    def test_reindex_keeps_serving_searches(self):
+        backend_class: type[SearchBackend] = type(get_backend())
+        index_comments = backend_class.index_comments
+        found: list[list[tuple[str, int]]] = []
+
+        def index_and_search(backend: SearchBackend, rows):
+            # The comments are indexed after the issues.
+            found.append(self.search(q="reproduced"))
+            index_comments(backend, rows)
+
+        with mock.patch.object(backend_class, "index_comments",
+                               index_and_search):
+            self.reindex()
+        self.assertEqual(found, [[("comment", self.comment.id)]])
+
+    @unittest.skipUnless(connection.vendor == "sqlite",
+                         "PostgreSQL deletes the rows with their issue.")
+    def test_reindex_prunes_deleted_rows(self):
+        comments = Comment.objects.filter(id=self.comment.id)
+        # Deleted without the signals, the row stays in the index.
+        comments._raw_delete(comments.db)
+        self.reindex()
+        self.assertEqual(get_backend().execute(
+            "SELECT rowid FROM issuetracker_comment_fts"
+        ), [])
+
+    def test_unsupported_database(self):
+        with mock.patch("issuetracker.views.get_search_backend",
+                        return_value=None):
+            response = self.client_for(self.alice).get("/search",
+                                                       {"q": "login"})
+        self.assertEqual(response.status_code, 501)
+
+    def test_system_check(self):
+        self.assertEqual(check_backend(), [])
+        with mock.patch.dict("issuetracker.search.BACKENDS", clear=True):
+            self.assertEqual([message.id for message in check_backend()],
+                             ["issuetracker.W001"])
+
+
+@unittest.skipUnless(connection.vendor == "postgresql",
+                     "The test DB isn't PostgreSQL.")
+class PostgreSQLBackendTests(SearchTests):
+    """The cases above, plus the specifics of the tsvector index."""
+
+    def test_backend(self):
+        self.assertIsInstance(get_backend(), PostgreSQLBackend)
+
+    def test_reindexing_replaces_the_document(self):
+        backend: SearchBackend = get_backend()
+        backend.index_issues([(self.issue.id, "Login crash", "again")])
+        self.assertEqual(backend.execute(
+            "SELECT COUNT(*) AS count FROM issuetracker_issue_search "
+            "WHERE issue_id = %s", [self.issue.id]
+        ), [{"count": 1}])
+
+    def test_snippet_marks_matches(self):
+        response = self.client_for(self.alice).get(
+            "/search", {"q": "crash", "type": "comment"}
+        )
+        self.assertIn("[crash]", response.json()["results"][0]["snippet"])
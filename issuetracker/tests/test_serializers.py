@@ -0,0 +1,66 @@
+from typing import Optional
+
+from django.db.models import QuerySet
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer
+
+from issuetracker.benchmarking import build_dataset
+from issuetracker.models import Project, Contributor, Issue, Comment
+from issuetracker.renderers import FastJSONRenderer
+from issuetracker.serializers import IssueSerializer, CommentSerializer, \
+    ContributorSerializer, ProjectSerializer, FastReadSerializer, \
+    fast_serializer_for
+
+
+class FastReadSerializerTests(TestCase):
+    """
+    FastReadSerializer must render the same JSON as the DRF serializer it
+    replaces in the list responses, byte for byte.
+    """
+    CASES: dict[str, tuple[type, type[ModelSerializer]]] = {
+        "project": (Project, ProjectSerializer),
+        "contributor": (Contributor, ContributorSerializer),
+        "issue": (Issue, IssueSerializer),
+        "comment": (Comment, CommentSerializer),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        build_dataset(users=6, projects=2, contributors=3, issues=10,
+                      comments=2)
+        # Text the JSON encoders escape differently if they can.
+        Issue.objects.filter(id=Issue.objects.order_by("id")[0].id).update(
+            title="Élève \"quoted\" \\     🐛",
+            description="<script>\n\ttab</script>"
+        )
+
+    def assertSameJSON(self, queryset: QuerySet,
+                       serializer_class: type[ModelSerializer],
+                       fields: Optional[frozenset[str]] = None):
+        data: list[dict] = serializer_class(queryset.all(), many=True).data
+        if fields is not None:
+            data = [{name: value for name, value in row.items()
+                     if name in fields} for row in data]
+        fast: FastReadSerializer = fast_serializer_for(serializer_class,
+                                                       fields)
+        rows: list[dict] = fast.serialize(fast.project(queryset))
+        expected: bytes = JSONRenderer().render(data)
+        self.assertEqual(JSONRenderer().render(rows), expected)
+        self.assertEqual(FastJSONRenderer().render(rows), expected)
+
+    def test_every_serializer(self):
+        for name, (model, serializer_class) in self.CASES.items():
+            with self.subTest(name):
+                self.assertSameJSON(model.objects.order_by("id"),
+                                    serializer_class)
+
+    def test_field_subsets(self):
+        for fields in ({"title"}, {"status", "assignee_user_id"},
+                       {"description", "project_id", "tag", "priority"}):
+            with self.subTest(fields=sorted(fields)):
+                self.assertSameJSON(Issue.objects.order_by("id"),
+                                    IssueSerializer, frozenset(fields))
+
+    def test_empty_queryset(self):
+        self.assertSameJSON(Issue.objects.none(), IssueSerializer)
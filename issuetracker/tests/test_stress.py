@@ -0,0 +1,27 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class SQLiteWritersTests(SimpleTestCase):
+    """
+    Concurrent writers don't fail with "database is locked" under the DB
+    profile. The command creates its own file DB, since an in-memory one
+    can't be shared by the writer threads: it runs in a separate process.
+    """
+
+    def test_no_locked_errors(self):
+        process = subprocess.run(
+            [sys.executable, "manage.py", "stress_sqlite_writers",
+             "--threads", "4", "--transactions", "10"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            timeout=120
+        )
+        self.assertEqual(process.returncode, 0, process.stderr)
+        results: dict = json.loads(process.stdout)
+        self.assertEqual(results["profile"]["locked_errors"], 0)
+        self.assertEqual(results["profile"]["committed"], 40)
+        self.assertEqual(results["profile"]["journal_mode"], "wal")
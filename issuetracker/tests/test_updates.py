@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.test import Client
+
+from issuetracker.counters import find_mismatches, project_summary
+from issuetracker.models import Project, Issue, Comment
+
+from .base import APITestCase
+
+
+class UpdateTests(APITestCase):
+    """
+    Updating an issue or a comment writes a single UPDATE, so the views do
+    the work of the save receivers themselves: counters, changes feed,
+    response cache and search index.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("alice", "alice@example.com",
+                                              "alice-password")
+        cls.outsider = User.objects.create_user("bob", "bob@example.com",
+                                                "bob-password")
+
+    def setUp(self):
+        super().setUp()
+        self.client: Client = self.client_for(self.author)
+        self.project: Project = self.create_project("project")
+        self.issue: Issue = Issue.objects.create(
+            title="issue", description="description", status="to-do",
+            project_id=self.project, author_user_id=self.author,
+            assignee_user_id=self.author
+        )
+        self.comment: Comment = Comment.objects.create(
+            description="comment", issue_id=self.issue,
+            author_user_id=self.author
+        )
+
+    def create_project(self, title: str) -> Project:
+        response = self.client.post(
+            "/projects/create",
+            {"title": title, "description": "description",
+             "type": "back end"},
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        return Project.objects.get(title=title)
+
+    def put(self, url: str, data: dict, client: Client = None):
+        return (client or self.client).put(url, data,
+                                           content_type="application/json")
+
+    def put_issue(self, data: dict, client: Client = None):
+        return self.put(f"/projects/issues/{self.issue.id}", data, client)
+
+    def put_comment(self, data: dict, client: Client = None):
+        return self.put(f"/projects/issues/comments/{self.comment.id}", data,
+                        client)
+
+    def list_issues(self, project: Project) -> list[dict]:
+        response = self.client.get(f"/projects/{project.id}/issues")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def search(self, query: str) -> list[tuple[str, int]]:
+        response = self.client.get("/search", {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [(row["type"], row["id"])
+                for row in response.json()["results"]]
+
+    def sync(self, project: Project, since: int = 0) -> dict:
+        response = self.client.get(f"/projects/{project.id}/changes",
+                                   {"since": since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_update_issue(self):
+        # Cached before the update.
+        self.assertEqual(self.list_issues(self.project)[0]["title"], "issue")
+        token: int = self.sync(self.project)["sync_token"]
+        response = self.put_issue({"title": "crash", "status": "completed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "title": "crash", "description": "description", "tag": "tag",
+            "priority": "medium", "status": "completed",
+            "project_id": self.project.id, "author_user_id": self.author.id,
+            "assignee_user_id": self.author.id
+        })
+        self.assertEqual(find_mismatches(), {})
+        self.assertEqual(project_summary(self.project.id)["status"],
+                         {"to-do": 0, "in progress": 0, "completed": 1})
+        self.assertEqual(self.list_issues(self.project)[0]["title"], "crash")
+        self.assertEqual(
+            [(change["type"], change["id"]) for change
+             in self.sync(self.project, token)["changes"]],
+            [("issue", self.issue.id)]
+        )
+        self.assertEqual(self.search("crash"), [("issue", self.issue.id)])
+
+    def test_move_issue(self):
+        other: Project = self.create_project("other")
+        self.list_issues(self.project)
+        token: int = self.sync(self.project)["sync_token"]
+        response = self.put_issue({"project_id": other.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(find_mismatches(), {})
+        self.assertEqual(project_summary(other.id)["total"], 1)
+        self.assertEqual(self.list_issues(self.project), [])
+        self.assertEqual(
+            [(change["type"], change["id"], change["deleted"]) for change
+             in self.sync(self.project, token)["changes"]],
+            [("issue", self.issue.id, True)]
+        )
+        self.assertEqual(
+            [(change["type"], change["id"]) for change
+             in self.sync(other)["changes"]][-2:],
+            [("issue", self.issue.id), ("comment", self.comment.id)]
+        )
+
+    def test_update_comment(self):
+        self.client.get(f"/projects/issues/{self.issue.id}/comments")
+        response = self.put_comment({"description": "reproduced"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "description": "reproduced", "author_user_id": self.author.id,
+            "issue_id": self.issue.id
+        })
+        response = self.client.get(
+            f"/projects/issues/{self.issue.id}/comments"
+        )
+        self.assertEqual(response.json()["results"][0]["description"],
+                         "reproduced")
+        self.assertEqual(self.search("reproduced"),
+                         [("comment", self.comment.id)])
+
+    def test_update_denied(self):
+        outsider: Client = self.client_for(self.outsider)
+        self.assertEqual(self.put_issue({"title": "mine"}, outsider)
+                         .status_code, 403)
+        self.assertEqual(self.put_issue({"status": "completed"}, outsider)
+                         .status_code, 403)
+        self.assertEqual(self.put_comment({"description": "mine"}, outsider)
+                         .status_code, 403)
+        self.assertEqual(self.put("/projects/issues/0", {"title": "none"})
+                         .status_code, 404)
+        self.issue.refresh_from_db()
+        self.assertEqual((self.issue.title, self.issue.status),
+                         ("issue", "to-do"))
+        self.assertEqual(find_mismatches(), {})
@@ -5,6 +5,8 @@ Two utility functions used in the register and login process.
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .authentication import USER_CLAIMS, VERSION_CLAIM, token_version
+
 
 def create_user_account(username, email, password, first_name="",
                         last_name="") -> User:
@@ -20,8 +22,16 @@ def create_user_account(username, email, password, first_name="",
 
 
 def get_tokens_for_user(user) -> dict[str, str]:
-    """Takes a user instance and returns a refresh and access JWT token."""
+    """
+    Takes a user instance and returns a refresh and access JWT token.
+    The tokens carry the claims StatelessJWTAuthentication builds the user
+    from. Claims of the refresh token are copied to the access token.
+    """
     refresh = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    refresh[VERSION_CLAIM] = token_version(user.username, user.password,
+                                           user.is_active, user.is_staff)
 
     return {
         "refresh": str(refresh),
@@ -4,31 +4,76 @@ serializers will refuse access to unauthenticated users if not explicitly
 stated otherwise.
 """
 
+from collections import Counter
 from typing import Union, Optional
 
-from django.db.models import QuerySet
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Model, QuerySet
 from django.contrib.auth import authenticate, logout
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured
 from django.forms import ValidationError
+from django.utils import timezone
 from rest_framework import generics
 from rest_framework import status
+from rest_framework import serializers
 from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny, BasePermission
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny, BasePermission, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.renderers import BaseRenderer
 from rest_framework.serializers import ModelSerializer, Serializer
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
 from issuetracker.permissions import only_project_contributor_permission, \
-    only_obj_author_permission
+    deny_unmatched_write
+from .changes import changes_since, record_changes
+from .conditional import Stamp, add_validators, comments_stamp, \
+    issues_stamp, not_modified, project_stamp
+from .counters import apply_deltas, count_created_issues, issue_keys, \
+    issue_total, project_summary
+from .denylist import token_denylist
+from .hashing import password_hashing_pool
+from .instrumentation import endpoint_stats
+from .membership import invalidate_memberships
 from .models import Project, Contributor, Issue, Comment
+from .renderers import NDJSONRenderer
+from .response_cache import cached_response, response_cache
+from .search import TYPES as SEARCH_TYPES, SearchBackend, \
+    SearchUnavailable, index_issues, get_backend as get_search_backend
 from .serializers import EmptySerializer, UserLoginSerializer, \
-    UserRegisterSerializer, CommentSerializer
+    LogoutSerializer, \
+    UserRegisterSerializer, CommentSerializer, BulkIssueSerializer, \
+    UsernameListSerializer, SearchQuerySerializer, ChangesQuerySerializer, \
+    SnapshotQuerySerializer
 from .serializers import IssueSerializer, ContributorSerializer, \
-    ProjectSerializer
+    ProjectSerializer, FastReadSerializer, IssueListQuerySerializer, \
+    fast_serializer_for
+from .snapshot import project_snapshot
+from .streaming import stream_queryset, wants_stream
 from .utils import create_user_account, get_tokens_for_user
 
+# Lists only the projects of the user (see ListProjectLoggedInUser).
+MINE_QUERY_PARAM = "mine"
+
+# The list endpoints that can be streamed also accept the NDJSON media type.
+STREAMING_RENDERER_CLASSES: list[BaseRenderer] = [
+    *api_settings.DEFAULT_RENDERER_CLASSES,
+    NDJSONRenderer
+]
+
+
+def sent_values(validated_data: dict) -> dict:
+    """
+    The validated data as .values() reads it back, i.e. with the pk of the
+    related rows.
+    """
+    return {name: value.pk if isinstance(value, Model) else value
+            for name, value in validated_data.items()}
+
 
 class AuthViewSet(GenericViewSet):
     """
@@ -41,7 +86,8 @@ class AuthViewSet(GenericViewSet):
     serializer_class: Serializer = EmptySerializer
     serializer_classes: dict[str, ModelSerializer] = {
         "login": UserLoginSerializer,
-        "register": UserRegisterSerializer
+        "register": UserRegisterSerializer,
+        "logout": LogoutSerializer
     }
 
     @action(methods=['POST'], detail=False)
@@ -53,14 +99,18 @@ class AuthViewSet(GenericViewSet):
         """
         Based on the given request, checks that the data is valid, that the
         password's the right one, and then creates the access and refresh
-        JWT token to authenticate the user.
+        JWT token to authenticate the user. The password is checked in the
+        hashing pool, which answers 429 when it's saturated.
         """
         serializer: ModelSerializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         username, password = request.data["username"], request.data["password"]
-        user: Optional[User] = authenticate(username=username,
-                                            password=password)
+        # Checking the password also upgrades its hash when the preferred
+        # hasher changed (see PASSWORD_HASHERS in settings).
+        user: Optional[User] = password_hashing_pool.run(authenticate,
+                                                         username=username,
+                                                         password=password)
         if user is None:
             raise ValidationError("username/password is false")
 
@@ -77,7 +127,9 @@ class AuthViewSet(GenericViewSet):
         """
         serializer: ModelSerializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user: Optional[User] = create_user_account(**serializer.validated_data)
+        user: Optional[User] = password_hashing_pool.run(
+            create_user_account, **serializer.validated_data
+        )
         tokens: dict[str, str] = get_tokens_for_user(user)
         return Response(data=tokens,
                         status=status.HTTP_201_CREATED)
@@ -85,9 +137,21 @@ class AuthViewSet(GenericViewSet):
     @action(methods=['POST'], detail=False)
     def logout(self, request) -> Response:
         """
-        Might be used in a better version of the project. Should invalidate
-        user's tokens.
+        Revokes the JWT access token the request was authenticated with,
+        and the refresh token when it's given in the request data. Both
+        stay on the denylist until they expire. Session users are logged
+        out of their session.
         """
+        serializer: Serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        tokens: list = [request.auth,
+                        serializer.validated_data.get("refresh")]
+        for token in tokens:
+            # request.auth is a DRF Token instance, or None, for the
+            # other authentication classes.
+            if token is not None and "jti" in getattr(token, "payload", {}):
+                token_denylist.revoke(token["jti"], token["exp"])
         logout(request)
         data = {"success": "successfully logged out"}
         return Response(data=data, status=status.HTTP_200_OK)
@@ -104,10 +168,56 @@ class AuthViewSet(GenericViewSet):
 
 
 class ListProjectLoggedInUser(generics.ListCreateAPIView):
-    """Retrieves and returns all projects from the DB in JSON format."""
+    """
+    Retrieves and returns all projects from the DB in JSON format. Pages
+    are keyed by id (see pagination.py). With ?mine=1, only the projects
+    the user contributes to are listed (see list_memberships).
+    """
     queryset: QuerySet = Project.objects.all()
     serializer_class: ModelSerializer = ProjectSerializer
     http_method_names = ['get']
+    ordering: tuple[str, ...] = ("id",)
+
+    def list(self, request, *args, **kwargs) -> Response:
+        """Serializes the page from .values() rows (see FastReadSerializer)."""
+        if request.query_params.get(MINE_QUERY_PARAM) in ("1", "true"):
+            return self.list_memberships(request)
+        serializer: FastReadSerializer = fast_serializer_for(
+            self.serializer_class
+        )
+        queryset: QuerySet = serializer.project(self.get_queryset(),
+                                                self.ordering)
+        page: list[dict] = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serializer.serialize(page))
+
+    def list_memberships(self, request) -> Response:
+        """
+        Lists the user's Contributor rows joined to their project, along
+        with the project's id, the user's role in it and its number of
+        issues, read from the counters in the same query. Pages are keyed
+        by (project_id, id), the order of the (user_id, project_id) unique
+        index, so a page only reads the user's own memberships.
+        """
+        serializer: FastReadSerializer = fast_serializer_for(
+            self.serializer_class
+        )
+        # Read by the pagination. Set on the instance, which only lives
+        # for this request.
+        self.ordering = ("project_id", "id")
+        memberships: QuerySet = Contributor.objects.filter(
+            user_id=request.user.id
+        ).annotate(
+            **{source: F(f"project_id__{source}")
+               for source in serializer.sources},
+            issue_count=issue_total("project_id")
+        ).values(*serializer.sources, "project_id", "id", "permission",
+                 "issue_count")
+        page: list[dict] = self.paginate_queryset(memberships)
+        return self.get_paginated_response([
+            {"id": row["project_id"], **serializer.to_representation(row),
+             "role": row["permission"], "issue_count": row["issue_count"]}
+            for row in page
+        ])
 
 
 class CreateProject(generics.CreateAPIView):
@@ -141,45 +251,67 @@ class ProjectViewSet(GenericViewSet):
 
     def retrieve(self, request, *args, **kwargs) -> Response:
         """
-        Retrieves requested project from the DB and returns it in JSON format.
+        Retrieves requested project from the DB and returns it in JSON format,
+        or a 304 when the client's copy is current (see conditional.py). The
+        body is cached per version of the project (see response_cache.py).
         """
         pk: int = kwargs["pk"]
-        project: QuerySet = Project.objects.get(id=pk)
-        serializer: ModelSerializer = self.get_serializer(project)
-        return Response(serializer.data)
+        stamp: Optional[Stamp] = project_stamp(pk)
+        if stamp is None:
+            raise NotFound
+        response = not_modified(request, stamp)
+        if response is not None:
+            return response
+
+        def build() -> Response:
+            project: Project = Project.objects.get(id=pk)
+            return Response(self.get_serializer(project).data)
+
+        response = cached_response(request, self, "project", pk, build)
+        return add_validators(request, response, stamp)
 
     def update(self, request, *args, **kwargs) -> Response:
         """
-        Retrieves the requested project from the DB, makes sure the user has
-        update authorization and then use the request data to make the desired
-        update.
+        Validates the request data, then updates the project with a single
+        UPDATE restricted to the projects the user authored. Project has no
+        save signal to honour besides the creation one. The updated project
+        is read back for the response.
         """
         pk: int = kwargs["pk"]
-        project: QuerySet = Project.objects.get(id=pk)
-
-        only_obj_author_permission(request, project)
-
-        serializer: ModelSerializer = self.serializer_class(project, data=request.data,
+        # The unsaved instance only tells the title's unique validator
+        # which row to leave out.
+        serializer: ModelSerializer = self.serializer_class(Project(id=pk),
+                                                            data=request.data,
                                                             partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        if getattr(project, "_prefetched_objects_cache", None):
-            # If 'prefetch_related' has been applied to a queryset, we need to
-            # forcibly invalidate the prefetch cache on the instance.
-            project._prefetched_object_cache = {}
-        return Response(serializer.data)
+        updated: int = Project.objects.filter(
+            id=pk, author_user_id=request.user.id
+        ).update(**serializer.validated_data, updated_time=timezone.now())
+        if not updated:
+            deny_unmatched_write(Project, pk)
+        # QuerySet.update() doesn't send post_save.
+        response_cache.bump("project", pk)
+
+        fast_serializer: FastReadSerializer = fast_serializer_for(
+            self.serializer_class
+        )
+        row: dict = fast_serializer.project(
+            Project.objects.filter(id=pk)
+        ).get()
+        return Response(fast_serializer.to_representation(row))
 
     def destroy(self, request, *args, **kwargs) -> Response:
         """
-        Retrieves the requested project from the DB, makes sure the user has
-        delete authorization and then perform deletion.
+        Deletes the requested project if the user authored it. The delete
+        still goes through the ORM's collector, so the cascades and the
+        delete signals run as before.
         """
         pk: int = kwargs["pk"]
-        project: QuerySet = Project.objects.get(id=pk)
-
-        only_obj_author_permission(request, project)
-
-        project.delete()
+        deleted, _ = Project.objects.filter(
+            id=pk, author_user_id=request.user.id
+        ).delete()
+        if not deleted:
+            deny_unmatched_write(Project, pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -217,15 +349,27 @@ class AddContributorProject(generics.CreateAPIView):
 
 class ListProjectContributors(APIView):
     http_method_names = ["get"]
+    renderer_classes: list[BaseRenderer] = STREAMING_RENDERER_CLASSES
 
     def get(self, request, *args, **kwargs) -> Response:
         """
         Based on the given project pk, retrieves all project's contributors.
+        The body is cached per version of the list (see response_cache.py).
         """
         pk: int = kwargs["pk"]
         queryset: QuerySet = Contributor.objects.filter(project_id=pk)
-        serializer: ModelSerializer = ContributorSerializer(queryset, many=True)
-        return Response(serializer.data)
+        if wants_stream(request):
+            return stream_queryset(request, queryset.order_by("id"),
+                                   ContributorSerializer)
+        serializer: FastReadSerializer = fast_serializer_for(
+            ContributorSerializer
+        )
+        return cached_response(
+            request, self, "contributors", pk,
+            lambda: Response(serializer.serialize(
+                serializer.project(queryset)
+            ))
+        )
 
 
 class DeleteContributorProject(generics.DestroyAPIView):
@@ -244,24 +388,152 @@ class DeleteContributorProject(generics.DestroyAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class BulkContributorProject(APIView):
+    """
+    Adds (POST) or removes (DELETE) many contributors of a project at once.
+    Both take {"usernames": [...]} and report what changed.
+    """
+    http_method_names = ["post", "delete"]
+
+    def get_users(self, request) -> dict[str, int]:
+        """Resolves the payload's usernames in one query."""
+        serializer: Serializer = UsernameListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        usernames: list[str] = serializer.validated_data["usernames"]
+        return dict(User.objects.filter(username__in=usernames)
+                    .values_list("username", "id"))
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        Adds the users as collaborators of the project. Users that already
+        are contributors are left as they are: the (user_id, project_id)
+        unique constraint makes the INSERT skip them.
+        """
+        pk: int = kwargs["pk"]
+
+        only_project_contributor_permission(request, pk)
+
+        users: dict[str, int] = self.get_users(request)
+        existing: set[int] = set(
+            Contributor.objects.filter(project_id=pk,
+                                       user_id__in=users.values())
+            .values_list("user_id", flat=True)
+        )
+        added: dict[str, int] = {username: user_id
+                                 for username, user_id in users.items()
+                                 if user_id not in existing}
+        with transaction.atomic():
+            Contributor.objects.bulk_create(
+                [Contributor(user_id_id=user_id, project_id_id=pk)
+                 for user_id in added.values()],
+                ignore_conflicts=True
+            )
+            # The ids aren't set when conflicts are ignored.
+            record_changes(pk, "contributor", Contributor.objects.filter(
+                project_id=pk, user_id__in=added.values()
+            ).values_list("id", flat=True))
+            response_cache.bump("contributors", pk)
+        invalidate_memberships(pk, added.values())
+        return Response(self.report(request, users, added, "added"))
+
+    def delete(self, request, *args, **kwargs) -> Response:
+        """Removes the users from the project's contributors."""
+        pk: int = kwargs["pk"]
+
+        only_project_contributor_permission(request, pk)
+
+        users: dict[str, int] = self.get_users(request)
+        with transaction.atomic():
+            memberships: QuerySet = Contributor.objects.filter(
+                project_id=pk,
+                user_id__in=users.values()
+            )
+            removed_rows: dict[int, int] = dict(
+                memberships.values_list("id", "user_id")
+            )
+            removed_ids: set[int] = set(removed_rows.values())
+            # A single DELETE statement, through the private _raw_delete():
+            # .delete() can't fast-delete rows that have post_delete
+            # receivers (membership.py, changes.py, response_cache.py). It
+            # would fetch the rows again and run each receiver per row, i.e.
+            # one changes sequence and one cache version bump per removed
+            # user. Their work is done once for the batch here instead, in
+            # the same transaction. Nothing refers to Contributor, so no
+            # cascade is skipped. Keep those calls in sync with the
+            # receivers.
+            memberships._raw_delete(memberships.db)
+            record_changes(pk, "contributor", removed_rows.keys(),
+                           deleted=True)
+            response_cache.bump("contributors", pk)
+        removed: dict[str, int] = {username: user_id
+                                   for username, user_id in users.items()
+                                   if user_id in removed_ids}
+        invalidate_memberships(pk, removed.values())
+        return Response(self.report(request, users, removed, "removed"))
+
+    @staticmethod
+    def report(request, users: dict[str, int], changed: dict[str, int],
+               change: str) -> dict[str, list[str]]:
+        usernames: list[str] = request.data["usernames"]
+        return {
+            change: sorted(changed),
+            "unchanged": sorted(set(users) - set(changed)),
+            "unknown": sorted(set(usernames) - set(users)),
+        }
+
+
 class IssueViewSet(GenericViewSet):
     serializer_class: ModelSerializer = IssueSerializer
     http_method_names = ['get', 'post', 'put', 'delete']
+    renderer_classes: list[BaseRenderer] = STREAMING_RENDERER_CLASSES
+    # Used by the keyset pagination of the issues list.
+    ordering: tuple[str, ...] = ("created_time", "id")
 
     def get(self, request, *args, **kwargs) -> Response:
         """
         Based on the given project pk, checks that the user has read access
-        to the project's issues and if that's the case, returns the project's
-        issues.
+        to the project's issues and if that's the case, returns one page of
+        the project's issues, or all of them when the client asked for a
+        stream. The query parameters filter, order and pick the fields of
+        the issues (see IssueListQuerySerializer). Answers 304 when the
+        client's copy is current (see conditional.py).
         """
         pk: int = kwargs["pk"]
 
         only_project_contributor_permission(request, pk)
 
-        queryset: QuerySet = Issue.objects.filter(project_id=pk)
-        serializer: ModelSerializer = self.serializer_class(queryset,
-                                                            many=True)
-        return Response(serializer.data)
+        query: IssueListQuerySerializer = IssueListQuerySerializer(
+            data=request.query_params
+        )
+        query.is_valid(raise_exception=True)
+        fields: Optional[frozenset[str]] = query.validated_data.get("fields")
+        # Read by the pagination. Set on the instance, which only lives
+        # for this request.
+        self.ordering = query.view_ordering()
+        ordering: list[str] = self.paginator.get_ordering(self)
+
+        stamp: Optional[Stamp] = issues_stamp(pk)
+        if stamp is None:
+            raise NotFound
+        response = not_modified(request, stamp)
+        if response is not None:
+            return response
+
+        queryset: QuerySet = query.issues(pk)
+        if wants_stream(request):
+            response = stream_queryset(request, queryset.order_by(*ordering),
+                                       self.serializer_class, fields)
+            return add_validators(request, response, stamp)
+        serializer: FastReadSerializer = query.fast_serializer()
+
+        def build() -> Response:
+            page: list[dict] = self.paginate_queryset(
+                serializer.project(queryset, ordering)
+            )
+            return self.get_paginated_response(serializer.serialize(page))
+
+        response = cached_response(request, self, "issues", pk, build)
+        return add_validators(request, response, stamp)
 
     def create(self, request, *args, **kwargs) -> Response:
         """
@@ -289,62 +561,209 @@ class IssueViewSet(GenericViewSet):
         return Response(serializer.data,
                         status=status.HTTP_201_CREATED)
 
-    def update(self, request, *args, **kwargs) -> Response:
+    def bulk_create(self, request, *args, **kwargs) -> Response:
         """
-        Based on the given issue pk and request data, checks that the user
-        has update access to the issue and if that's the case, performs update.
+        Creates a list of issues in the given project at once. Permission
+        is checked once, the assignees are resolved in one query and the
+        rows are inserted in batches of settings.ISSUE_BULK_BATCH_SIZE in a
+        single transaction. If any item is invalid, nothing is created and
+        the response lists the errors of each item, in the payload order.
         """
         pk: int = kwargs["pk"]
-        issue: Issue = Issue.objects.get(id=pk)
 
-        only_obj_author_permission(request, issue)
+        only_project_contributor_permission(request, pk)
 
-        serializer: ModelSerializer = self.serializer_class(
-            issue,
-            data=request.data,
-            partial=True
-        )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        if getattr(issue, "_prefetched_objects_cache", None):
-            # If 'prefetch_related' has been applied to a queryset, we need to
-            # forcibly invalidate the prefetch cache on the instance.
-            issue._prefetched_object_cache = {}
-        return Response(serializer.data)
+        items: list = request.data
+        max_items: int = getattr(settings, "ISSUE_BULK_MAX_ITEMS", 10000)
+        if not isinstance(items, list) \
+                or not all(isinstance(item, dict) for item in items):
+            raise serializers.ValidationError(
+                {"non_field_errors": ["Expected a list of issues."]}
+            )
+        if len(items) > max_items:
+            raise serializers.ValidationError(
+                {"non_field_errors": [f"Expected at most {max_items} issues."]}
+            )
+
+        # Each item is validated on its own so that the errors of all the
+        # items are reported, including the unknown assignees of the valid
+        # ones.
+        child: BulkIssueSerializer = BulkIssueSerializer()
+        validated: list[Optional[dict]] = []
+        errors: list[dict] = []
+        for item in items:
+            try:
+                validated.append(child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                validated.append(None)
+                errors.append(dict(exc.detail))
+
+        usernames: set[str] = {data["assignee_username"]
+                               for data in validated
+                               if data and "assignee_username" in data}
+        assignees: dict[str, int] = dict(
+            User.objects.filter(username__in=usernames)
+            .values_list("username", "id")
+        ) if usernames else {}
+        for data, item_errors in zip(validated, errors):
+            if data and "assignee_username" in data \
+                    and data["assignee_username"] not in assignees:
+                item_errors["assignee_username"] = ["This user doesn't exist."]
+        if any(errors):
+            return Response({"errors": errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        issues: list[Issue] = []
+        for data in validated:
+            username: Optional[str] = data.pop("assignee_username", None)
+            issues.append(Issue(
+                **data,
+                project_id_id=pk,
+                author_user_id_id=request.user.id,
+                # When no assignee is given, the author is the assignee.
+                assignee_user_id_id=assignees.get(username, request.user.id)
+            ))
+        with transaction.atomic():
+            Issue.objects.bulk_create(
+                issues,
+                batch_size=getattr(settings, "ISSUE_BULK_BATCH_SIZE", 500)
+            )
+            # bulk_create doesn't send post_save.
+            count_created_issues(issues)
+            index_issues(issues)
+            record_changes(pk, "issue", (issue.id for issue in issues))
+            response_cache.bump("issues", pk)
+        return Response({"created": len(issues)},
+                        status=status.HTTP_201_CREATED)
 
-    def destroy(self, request, *args, **kwargs) -> Response:
+    def summary(self, request, *args, **kwargs) -> Response:
         """
-        Based on the given issue pk and request data, checks that the user
-        has delete access to the issue and if that's the case,
-        performs deletion.
+        Based on the given project pk, checks that the user has read access
+        to the project's issues and if that's the case, returns how many
+        there are per status, priority and tag (see counters.py).
         """
         pk: int = kwargs["pk"]
-        issue: Issue = Issue.objects.get(id=pk)
 
-        only_obj_author_permission(request, issue)
+        only_project_contributor_permission(request, pk)
+
+        return Response(project_summary(pk))
+
+    def update(self, request, *args, **kwargs) -> Response:
+        """
+        Validates the request data, then updates the issue with a single
+        UPDATE restricted to the issues the user authored, writing only the
+        fields sent. The response is built from the issue read beforehand
+        and the values sent.
+        """
+        pk: int = kwargs["pk"]
+        serializer: ModelSerializer = self.serializer_class(data=request.data,
+                                                            partial=True)
+        serializer.is_valid(raise_exception=True)
+        fields: dict = serializer.validated_data
+        mine: QuerySet = Issue.objects.filter(id=pk,
+                                              author_user_id=request.user.id)
+        fast_serializer: FastReadSerializer = fast_serializer_for(
+            self.serializer_class
+        )
+        with transaction.atomic():
+            # Read locked within the transaction: the counters subtract the
+            # values the update replaces (see counters.py).
+            old: Optional[dict] = fast_serializer.project(
+                mine.select_for_update()
+            ).first()
+            if old is None:
+                deny_unmatched_write(Issue, pk)
+            mine.update(**fields, updated_time=timezone.now())
+            row: dict = {**old, **sent_values(fields)}
+            # QuerySet.update() doesn't send post_save. The work of the
+            # receivers is done here instead, in the same transaction. Keep
+            # those calls in sync with the receivers.
+            project_id: int = row["project_id"]
+            deltas: Counter = issue_keys(project_id, row)
+            deltas.subtract(issue_keys(old["project_id"], old))
+            apply_deltas(deltas)
+            record_changes(project_id, "issue", [pk])
+            if old["project_id"] != project_id:
+                # The issue left the project. Its comments moved along with
+                # it.
+                record_changes(old["project_id"], "issue", [pk],
+                               deleted=True)
+                record_changes(project_id, "comment",
+                               Comment.objects.filter(issue_id=pk)
+                               .values_list("id", flat=True))
+                response_cache.bump("issues", old["project_id"])
+            response_cache.bump("issues", project_id)
+            backend: Optional[SearchBackend] = get_search_backend(Issue)
+            if backend is not None and fields.keys() & {"title",
+                                                        "description"}:
+                backend.index_issues([(pk, row["title"], row["description"])])
+        return Response(fast_serializer.to_representation(row))
 
-        issue.delete()
+    def destroy(self, request, *args, **kwargs) -> Response:
+        """
+        Based on the given issue pk, deletes the issue if the user authored
+        it. Otherwise, raises PermissionDenied, or NotFound when there is no
+        such issue.
+        """
+        pk: int = kwargs["pk"]
+        with transaction.atomic():
+            # Loaded locked within the deletion's transaction: the counters
+            # subtract the values the issue is loaded with (see
+            # counters.py).
+            issue: Optional[Issue] = Issue.objects.select_for_update().filter(
+                id=pk, author_user_id=request.user.id
+            ).first()
+            if issue is None:
+                deny_unmatched_write(Issue, pk)
+            issue.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class CommentViewSet(GenericViewSet):
     serializer_class: ModelSerializer = CommentSerializer
     http_method_names = ['get', 'post', 'put', 'delete']
+    renderer_classes: list[BaseRenderer] = STREAMING_RENDERER_CLASSES
+    # Used by the keyset pagination of the comments list.
+    ordering: tuple[str, ...] = ("created_time", "id")
 
     def get(self, request, *args, **kwargs) -> Response:
         """
         Based on the given issue pk and the request data, checks that the
         user has read access to comments and if that's the case, returns
-        all Issue's comment. Otherwise, raise PermissionDenied.
+        one page of the Issue's comments, or all of them when the client
+        asked for a stream. Otherwise, raise PermissionDenied. Answers 304
+        when the client's copy is current (see conditional.py).
         """
         pk: int = kwargs["pk"]
-        issue: Issue = Issue.objects.get(id=pk)
-        project: Project = issue.project_id
-        only_project_contributor_permission(request, project.id)
+        # The stamp query also reads the issue's project.
+        stamp: Optional[Stamp] = comments_stamp(pk)
+        if stamp is None:
+            raise NotFound
+        only_project_contributor_permission(request, stamp.parent_id)
+
+        response = not_modified(request, stamp)
+        if response is not None:
+            return response
 
         queryset: QuerySet = Comment.objects.filter(issue_id=pk)
-        serializer: ModelSerializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        if wants_stream(request):
+            response = stream_queryset(request,
+                                       queryset.order_by(*self.ordering),
+                                       self.serializer_class)
+            return add_validators(request, response, stamp)
+        serializer: FastReadSerializer = fast_serializer_for(
+            self.serializer_class
+        )
+
+        def build() -> Response:
+            page: list[dict] = self.paginate_queryset(
+                serializer.project(queryset, self.ordering)
+            )
+            return self.get_paginated_response(serializer.serialize(page))
+
+        response = cached_response(request, self, "comments", pk, build)
+        return add_validators(request, response, stamp)
 
     def create(self, request, *args, **kwargs) -> Response:
         """
@@ -366,36 +785,150 @@ class CommentViewSet(GenericViewSet):
 
     def update(self, request, *args, **kwargs) -> Response:
         """
-        Based on the given comment pk and the request data, checks that the
-        user has update access to comments and if that's the case, perform
-        update. Otherwise, raise PermissionDenied.
+        Validates the request data, then updates the comment with a single
+        UPDATE restricted to the comments the user authored, writing only
+        the fields sent. The response is built from the comment read
+        beforehand, along with the project of its issue, and the values
+        sent.
         """
         pk: int = kwargs["pk"]
-        comment: Comment = Comment.objects.get(id=pk)
-
-        only_obj_author_permission(request, comment)
-
-        serializer: ModelSerializer = self.serializer_class(comment,
-                                                            data=request.data,
+        serializer: ModelSerializer = self.serializer_class(data=request.data,
                                                             partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        if getattr(comment, "_prefetched_objects_cache", None):
-            # If 'prefetch_related' has been applied to a queryset, we need to
-            # forcibly invalidate the prefetch cache on the instance.
-            comment._prefetched_object_cache = {}
-        return Response(serializer.data)
+        fields: dict = serializer.validated_data
+        mine: QuerySet = Comment.objects.filter(
+            id=pk, author_user_id=request.user.id
+        )
+        fast_serializer: FastReadSerializer = fast_serializer_for(
+            self.serializer_class
+        )
+        with transaction.atomic():
+            old: Optional[dict] = fast_serializer.project(
+                mine, extra=("issue_id__project_id",)
+            ).first()
+            if old is None:
+                deny_unmatched_write(Comment, pk)
+            mine.update(**fields, created_time=timezone.now())
+            row: dict = {**old, **sent_values(fields)}
+            # QuerySet.update() doesn't send post_save. The work of the
+            # receivers is done here instead, in the same transaction. Keep
+            # those calls in sync with the receivers.
+            project_id: int = fields["issue_id"].project_id_id \
+                if "issue_id" in fields else old["issue_id__project_id"]
+            record_changes(project_id, "comment", [pk])
+            if old["issue_id"] != row["issue_id"]:
+                response_cache.bump("comments", old["issue_id"])
+            response_cache.bump("comments", row["issue_id"])
+            backend: Optional[SearchBackend] = get_search_backend(Comment)
+            if backend is not None and "description" in fields:
+                backend.index_comments([(pk, row["description"])])
+        return Response(fast_serializer.to_representation(row))
 
     def destroy(self, request, *args, **kwargs) -> Response:
         """
-        Based on the given comment pk and the request data, checks that the
-        user has delete access to comments and if that's the case, perform
-        deletion. Otherwise, raise PermissionDenied.
+        Based on the given comment pk, deletes the comment if the user
+        authored it. Otherwise, raise PermissionDenied, or NotFound when
+        there is no such comment.
         """
         pk: int = kwargs["pk"]
-        comment: Comment = Comment.objects.get(id=pk)
-
-        only_obj_author_permission(request, comment)
-
+        # Read along with its issue, which tells the changes feed the
+        # comment's project. Nothing refers to comments: deleting the
+        # instance runs a single DELETE.
+        comment: Optional[Comment] = Comment.objects.select_related(
+            "issue_id"
+        ).filter(id=pk, author_user_id=request.user.id).first()
+        if comment is None:
+            deny_unmatched_write(Comment, pk)
         comment.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SearchView(APIView):
+    """
+    Full-text search in the issues and comments of the projects the user
+    contributes to, best matches first (see search.py).
+    """
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        query: Serializer = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        backend: Optional[SearchBackend] = get_search_backend()
+        if backend is None:
+            # The system checks warned at startup (see check_backend).
+            raise SearchUnavailable
+        data: dict = query.validated_data
+        types: tuple[str, ...] = (data["type"],) if "type" in data \
+            else SEARCH_TYPES
+        results: list[dict] = backend.search(data["q"], request.user.id,
+                                             types, data["limit"])
+        return Response({"results": results})
+
+
+class ChangesView(APIView):
+    """
+    Changes feed of a project for offline clients (see changes.py). A first
+    sync without ?since returns every issue, comment and contributor. The
+    next ones pass the sync_token of the previous response as ?since and
+    only receive what changed meanwhile, until more is false.
+    """
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        pk: int = kwargs["pk"]
+
+        only_project_contributor_permission(request, pk)
+
+        query: Serializer = ChangesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        changes, sync_token, more = changes_since(
+            pk, query.validated_data["since"], query.validated_data["limit"]
+        )
+        return Response({"changes": changes, "sync_token": sync_token,
+                         "more": more})
+
+
+class ProjectSnapshotView(APIView):
+    """
+    The project with its contributors, its issues and the latest comments
+    of each issue, read with a fixed number of queries (see snapshot.py).
+    """
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        pk: int = kwargs["pk"]
+
+        only_project_contributor_permission(request, pk)
+
+        query: Serializer = SnapshotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        snapshot: Optional[dict] = project_snapshot(
+            pk, query.validated_data["comments"]
+        )
+        if snapshot is None:
+            raise NotFound
+        return Response(snapshot)
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Returns the hit, miss and eviction counts of the response cache of
+    this process (see response_cache.py).
+    """
+    permission_classes: list[BasePermission] = [IsAdminUser]
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        return Response(response_cache.snapshot())
+
+
+class EndpointStatsView(APIView):
+    """
+    Returns the query count, DB time, serialization time and wall time
+    distributions recorded per endpoint by QueryStatsMiddleware.
+    """
+    permission_classes: list[BasePermission] = [IsAdminUser]
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        return Response(endpoint_stats.snapshot())
@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'issuetracker.instrumentation.QueryStatsMiddleware',
+    'issuetracker.database.ReplicaReadsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,13 +81,124 @@ WSGI_APPLICATION = 'softdesk.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+# Run on each new SQLite connection (see issuetracker/database.py). WAL lets
+# readers and the writer work at the same time. NORMAL skips the sync at
+# each commit: a power loss may lose the last commits, but WAL keeps the
+# file consistent. Writers wait up to
+# busy_timeout ms for the lock. mmap_size (bytes) and cache_size (negative:
+# KiB) let reads be served from memory.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+# Connections are kept for CONN_MAX_AGE seconds and checked at the start of
+# each request (see issuetracker/database.py). Transactions take the write
+# lock when they begin (see issuetracker/backends/sqlite3/base.py).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'issuetracker.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': SQLITE_PRAGMAS,
+        },
+    },
+    # Serves the reads of GET and HEAD requests. The same file, opened
+    # read-only: with a server database, point it at a replica instead.
+    'replica': {
+        'ENGINE': 'issuetracker.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pragmas': {**SQLITE_PRAGMAS, 'query_only': 1},
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_REPLICA_ALIAS = 'replica'
+DATABASE_ROUTERS = ['issuetracker.database.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# LocMemCache evicts the least recently used entries past MAX_ENTRIES and
+# expires them after TIMEOUT seconds. It is per process: production
+# deployments should point "membership" at a shared backend such as Redis
+# or Memcached so that invalidations reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'membership': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'membership',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+MEMBERSHIP_CACHE_ALIAS = 'membership'
+
+# Rendered bodies of the read endpoints and their version counters (see
+# issuetracker/response_cache.py). Like the membership cache, the alias
+# should point at a backend shared by every worker in production. Each
+# process also keeps up to RESPONSE_CACHE_LOCAL_MAX_BYTES of bodies in
+# memory.
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_LOCAL_MAX_BYTES = 32 * 1024 * 1024
+
+# Cache of the current token version of each user, checked by
+# issuetracker.authentication.StatelessJWTAuthentication. With a per-process
+# cache, the timeout bounds how long another process may accept revoked
+# tokens.
+TOKEN_VERSION_CACHE_ALIAS = 'default'
+TOKEN_VERSION_CACHE_TIMEOUT = 60
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.0/topics/auth/passwords/
+# New passwords are hashed with the first hasher. The others only check
+# existing hashes, which are upgraded to the first hasher on login.
+# Scrypt is memory-hard and about half as costly in CPU as Django's
+# PBKDF2 default. Argon2 (pip install argon2-cffi) or bcrypt
+# (pip install bcrypt) can be moved first once installed.
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# Logins and registrations hash passwords in a pool of
+# PASSWORD_HASHING_WORKERS threads per process (0 hashes in the request
+# thread). When PASSWORD_HASHING_QUEUE more are already waiting, requests
+# get a 429 (see issuetracker/hashing.py).
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_QUEUE = 8
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -129,22 +242,56 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': "rest_framework.pagination.PageNumberPagination",
+    'DEFAULT_PAGINATION_CLASS': "issuetracker.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
     'DEFAULT_PERMISSION_CLASSES': [
         "rest_framework.permissions.IsAuthenticated"
     ],
+    # JWT comes first: it's what the clients use, and it doesn't need the
+    # DB (see issuetracker/authentication.py).
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        "issuetracker.authentication.StatelessJWTAuthentication",
         "rest_framework.authentication.BasicAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
         "rest_framework.authentication.TokenAuthentication"
     ],
+    # orjson when installed, else DRF's stdlib JSON (see
+    # issuetracker/renderers.py).
+    'DEFAULT_RENDERER_CLASSES': [
+        "issuetracker.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        "issuetracker.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 
+# Bulk issue creation (projects/<pk>/issues/bulk): largest accepted payload
+# and number of rows per INSERT.
+ISSUE_BULK_MAX_ITEMS = 10000
+ISSUE_BULK_BATCH_SIZE = 500
+
+# Instrumentation (see issuetracker/instrumentation.py): number of requests
+# kept per endpoint and query count above which a request is logged
+# (None disables the logging).
+ENDPOINT_STATS_WINDOW = 1000
+QUERY_BUDGET = None
+
 APPEND_SLASH = False
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": datetime.timedelta(hours=3),
     "REFRESH_TOKEN_LIFETIME": datetime.timedelta(days=1),
+    "TOKEN_REFRESH_SERIALIZER":
+        "issuetracker.serializers.DenylistTokenRefreshSerializer",
 }
+
+# Revoked tokens (see issuetracker/denylist.py). Each hour of token expiry
+# gets a bloom filter sized for DENYLIST_BUCKET_CAPACITY tokens, about
+# 180 kB at a 0.1% error rate. Other processes see a revocation within
+# DENYLIST_SYNC_INTERVAL seconds.
+DENYLIST_BUCKET_CAPACITY = 100000
+DENYLIST_ERROR_RATE = 0.001
+DENYLIST_SYNC_INTERVAL = 5
@@ -6,7 +6,7 @@ from django.urls import path
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenRefreshView
 
-from issuetracker import views
+from issuetracker import async_views, views
 
 app_name = "issuetracker"
 
@@ -42,6 +42,10 @@ urlpatterns: list[path] = [
     path("projects/<int:pk>/users",
          views.ListProjectContributors.as_view()),
 
+    # Adds (POST) or removes (DELETE) many contributors at once.
+    path("projects/<int:pk>/users/bulk",
+         views.BulkContributorProject.as_view()),
+
     # endpoint 10. Deletes one contributor from the project.
     path("projects/<int:project_pk>/users/<int:user_pk>",
          views.DeleteContributorProject.as_view()),
@@ -55,6 +59,26 @@ urlpatterns: list[path] = [
               "post": "create"}
          )),
 
+    # Creates many issues at once, e.g. when importing a backlog.
+    path("projects/<int:pk>/issues/bulk",
+         views.IssueViewSet.as_view(
+             {"post": "bulk_create"}
+         )),
+
+    # Counts of the project's issues per status, priority and tag.
+    path("projects/<int:pk>/issues/summary",
+         views.IssueViewSet.as_view(
+             {"get": "summary"}
+         )),
+
+    # The project with its contributors, issues and latest comments.
+    path("projects/<int:pk>/snapshot",
+         views.ProjectSnapshotView.as_view()),
+
+    # Issues, comments and contributors changed since a sync token.
+    path("projects/<int:pk>/changes",
+         views.ChangesView.as_view()),
+
     # endpoint 13, 14. Respectively updates or deletes one issue.
     path("projects/issues/<int:pk>",
          views.IssueViewSet.as_view(
@@ -78,6 +102,29 @@ urlpatterns: list[path] = [
          ),
          name="update/delete issue in a project"),
 
+    # Full-text search in the issues and comments of the user's projects.
+    path("search",
+         views.SearchView.as_view()),
+
+    # Per-endpoint query count and latency stats. Admins only.
+    path("stats/endpoints",
+         views.EndpointStatsView.as_view()),
+
+    # Hit, miss and eviction counts of the response cache. Admins only.
+    path("stats/cache",
+         views.ResponseCacheStatsView.as_view()),
+
+    # Native async versions of endpoints 5, 9, 11 and 15 (see
+    # issuetracker/async_views.py), for ASGI deployments.
+    path("async/projects/<int:pk>",
+         async_views.AsyncProjectView.as_view()),
+    path("async/projects/<int:pk>/users",
+         async_views.AsyncProjectContributors.as_view()),
+    path("async/projects/<int:pk>/issues",
+         async_views.AsyncIssueList.as_view()),
+    path("async/projects/issues/<int:pk>/comments",
+         async_views.AsyncCommentList.as_view()),
+
     # used for testing purposes.
     path('api/token/refresh', TokenRefreshView.as_view(),
          name='token_refresh'),